@@ -0,0 +1,283 @@
+# 요청 수락 제어 (ASGI 미들웨어)
+# SQLite 쓰기는 커넥션 하나(writer_engin)로 직렬화되므로 요청이 몰리면 쓰레드풀에 쌓였다가 전부 timeout 이 남.
+# 처리할 수 없는 요청은 라우트까지 가기 전에 바로 거절해서 수락된 요청의 지연시간을 일정하게 유지한다.
+# - 경로별 / 사용자별(user_id) token bucket -> 초과하면 429 + Retry-After
+# - 전체 / 경로별 동시 처리 수 제한 + 제한된 크기의 대기열 -> 대기열이 차거나 대기 시간이 지나면 503 + Retry-After
+# - 환경변수
+#     ADMISSION_ENABLED       : 0 이면 사용 안함 (기본 1)
+#     ADMISSION_MAX_INFLIGHT  : 전체 동시 처리 요청 수 (0 이면 제한 없음)
+#     ADMISSION_QUEUE         : 전체 대기열 크기
+#     ADMISSION_QUEUE_TIMEOUT : 대기열에서 기다리는 최대 시간(초)
+#     ADMISSION_EXEMPT        : 제한하지 않는 경로 prefix (SSE 처럼 오래 유지되는 연결 등)
+#     ADMISSION_RULES         : 경로별 설정 (기본값 DEFAULT_RULES 에 덮어씀, off 면 해당 경로 제한 해제)
+#         예) "POST /api/cart=user_rate:20,user_burst:40;POST /api/order=concurrency:2,queue:16;POST /api/products=off"
+#         rate / burst           : 경로 전체 초당 요청 수 / 순간 허용량
+#         user_rate / user_burst : 사용자별 초당 요청 수 / 순간 허용량 (user_id 는 쿼리스트링 또는 JSON body 에서 읽음)
+#         concurrency / queue / timeout : 경로별 동시 처리 수 / 대기열 크기 / 대기 시간(초)
+import asyncio
+import json
+import math
+import os
+import time
+from collections import OrderedDict, deque
+from urllib.parse import parse_qs
+
+ADMISSION_ENABLED = os.getenv('ADMISSION_ENABLED', '1') == '1'
+MAX_INFLIGHT = int(os.getenv('ADMISSION_MAX_INFLIGHT', '256'))
+GLOBAL_QUEUE = int(os.getenv('ADMISSION_QUEUE', '512'))
+GLOBAL_QUEUE_TIMEOUT = float(os.getenv('ADMISSION_QUEUE_TIMEOUT', '2'))
+EXEMPT_PATHS = tuple(filter(None, os.getenv('ADMISSION_EXEMPT', '/metrics,/api/order/events').split(',')))
+MAX_TRACKED_USERS = 10000   # 사용자별 bucket 최대 개수 (LRU)
+MAX_BODY_PEEK = 64 * 1024   # user_id 를 찾으려고 읽어볼 최대 body 크기
+
+# 쓰기 API 기본 설정
+DEFAULT_RULES = {
+    'POST /api/cart': {'user_rate': 20, 'user_burst': 40, 'concurrency': 8, 'queue': 64, 'timeout': 1},
+    'POST /api/order': {'user_rate': 5, 'user_burst': 10, 'concurrency': 4, 'queue': 32, 'timeout': 2},
+    'POST /api/products': {'rate': 50, 'burst': 100, 'concurrency': 4, 'queue': 32, 'timeout': 1},
+    'POST /api/products/bulk': {'concurrency': 1, 'queue': 2, 'timeout': 30},
+}
+
+def parse_rules(value, defaults=DEFAULT_RULES):
+    rules = {key: dict(rule) for key, rule in defaults.items()}
+    for item in filter(None, (part.strip() for part in value.split(';'))):
+        key, _, options = item.partition('=')
+        key = ' '.join(key.split())
+        if options.strip() == 'off':
+            rules.pop(key, None)
+            continue
+        rule = rules.setdefault(key, {})
+        for option in filter(None, (part.strip() for part in options.split(','))):
+            name, _, number = option.partition(':')
+            rule[name.strip()] = float(number)
+    return rules
+
+class TokenBucket:
+    __slots__ = ('rate', 'burst', 'tokens', 'updated')
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def take(self):
+        """토큰 하나를 사용. 성공하면 0, 부족하면 다음 토큰까지 기다려야 하는 시간(초)"""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0
+        return (1 - self.tokens) / self.rate
+
+class ConcurrencyGate:
+    """동시 처리 수 제한 + 제한된 대기열 (이벤트 루프 안에서만 사용)"""
+    def __init__(self, limit, queue_size, timeout):
+        self.limit = int(limit)
+        self.queue_size = int(queue_size)
+        self.timeout = timeout
+        self.in_flight = 0
+        self._waiters = deque()
+
+    async def acquire(self):
+        """자리를 얻으면 None, 거절되면 거절 사유 ('queue_full' / 'queue_timeout')"""
+        if self.in_flight < self.limit and not self._waiters:
+            self.in_flight += 1
+            return None
+        if len(self._waiters) >= self.queue_size:
+            return 'queue_full'
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self.timeout)
+            return None  # release 에서 자리를 넘겨받음 (in_flight 는 그대로)
+        except asyncio.TimeoutError:
+            if waiter.done() and not waiter.cancelled():
+                return None  # timeout 과 동시에 자리를 넘겨받은 경우
+            waiter.cancel()
+            return 'queue_timeout'
+        except asyncio.CancelledError:
+            # 기다리는 중에 클라이언트 연결이 끊김 -> 이미 넘겨받은 자리가 있으면 반납
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            waiter.cancel()
+            raise
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+
+    def release(self):
+        # 대기중인 요청이 있으면 자리를 바로 넘겨줌
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.in_flight -= 1
+
+    @property
+    def queued(self):
+        return len(self._waiters)
+
+class Route:
+    def __init__(self, key, rule):
+        self.key = key
+        self.path = key.split(' ', 1)[1]
+        self.bucket = TokenBucket(rule['rate'], rule.get('burst', rule['rate'])) if rule.get('rate') else None
+        self.user_rate = rule.get('user_rate')
+        self.user_burst = rule.get('user_burst', self.user_rate)
+        self.user_buckets = OrderedDict()  # user_id -> TokenBucket
+        self.gate = ConcurrencyGate(rule['concurrency'], rule.get('queue', 0), rule.get('timeout', 1)) if rule.get('concurrency') else None
+
+    def user_bucket(self, user_id):
+        bucket = self.user_buckets.get(user_id)
+        if bucket is None:
+            bucket = self.user_buckets[user_id] = TokenBucket(self.user_rate, self.user_burst)
+            if len(self.user_buckets) > MAX_TRACKED_USERS:
+                self.user_buckets.popitem(last=False)
+        else:
+            self.user_buckets.move_to_end(user_id)
+        return bucket
+
+class AdmissionController:
+    def __init__(self, rules=None, max_inflight=MAX_INFLIGHT, queue_size=GLOBAL_QUEUE, queue_timeout=GLOBAL_QUEUE_TIMEOUT,
+                 exempt=EXEMPT_PATHS, on_shed=None):
+        rules = parse_rules(os.getenv('ADMISSION_RULES', '')) if rules is None else rules
+        self.routes = {key: Route(key, rule) for key, rule in rules.items()}
+        self.gate = ConcurrencyGate(max_inflight, queue_size, queue_timeout) if max_inflight else None
+        self.exempt = exempt
+        self.on_shed = on_shed  # (route, reason) -> None, 메트릭 기록용
+        self.stats = {'admitted': 0, 'shed': {}}
+
+    def shed(self, route, reason):
+        self.stats['shed'][reason] = self.stats['shed'].get(reason, 0) + 1
+        if self.on_shed is not None:
+            self.on_shed(route, reason)
+
+    def get_stats(self):
+        stats = {
+            'admitted': self.stats['admitted'],
+            'shed': dict(self.stats['shed']),
+            'in_flight': self.gate.in_flight if self.gate else None,
+            'queued': self.gate.queued if self.gate else None,
+            'routes': {},
+        }
+        for key, route in self.routes.items():
+            stats['routes'][key] = {
+                'in_flight': route.gate.in_flight if route.gate else None,
+                'queued': route.gate.queued if route.gate else None,
+                'tracked_users': len(route.user_buckets),
+            }
+        return stats
+
+def _json_response(status, message, retry_after):
+    body = json.dumps({'detail': message}, ensure_ascii=False).encode('utf-8')
+    headers = [
+        (b'content-type', b'application/json'),
+        (b'content-length', str(len(body)).encode()),
+        (b'retry-after', str(max(1, math.ceil(retry_after))).encode()),
+    ]
+    return status, headers, body
+
+async def _peek_body(receive, limit=MAX_BODY_PEEK):
+    """body 를 limit 바이트까지만 읽음 -> (읽은 메시지 목록, body). limit 을 넘거나 연결이 끊기면 body 는 None
+    Content-Length 가 없는 (chunked) 요청도 limit 이상은 메모리에 쌓지 않음"""
+    messages = []
+    size = 0
+    while True:
+        message = await receive()
+        messages.append(message)
+        if message['type'] != 'http.request':
+            return messages, None
+        size += len(message.get('body', b''))
+        if size > limit:
+            return messages, None
+        if not message.get('more_body'):
+            return messages, b''.join(m.get('body', b'') for m in messages)
+
+def _user_id_from(scope, body):
+    user_id = parse_qs(scope.get('query_string', b'').decode('latin-1')).get('user_id')
+    if user_id:
+        return user_id[0]
+    if body:
+        try:
+            data = json.loads(body)
+        except ValueError:
+            return None
+        if isinstance(data, dict) and data.get('user_id') is not None:
+            return str(data['user_id'])
+    return None
+
+class AdmissionMiddleware:
+    """ASGI 미들웨어 - 경로별 rate limit / 동시 처리 수 제한, 초과하면 바로 429 / 503"""
+    def __init__(self, app, controller):
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or scope['path'].startswith(self.controller.exempt):
+            return await self.app(scope, receive, send)
+        controller = self.controller
+        route = controller.routes.get(f"{scope['method']} {scope['path']}")
+        route_label = route.path if route else scope['path']
+
+        if route is not None:
+            # rate limit (경로 전체 -> 사용자별)
+            if route.bucket is not None:
+                wait = route.bucket.take()
+                if wait:
+                    return await self._reject(scope, send, route_label, 'route_rate', 429, '요청이 너무 많습니다.', wait)
+            if route.user_rate:
+                body = None
+                headers = dict(scope['headers'])
+                if int(headers.get(b'content-length', b'0') or 0) <= MAX_BODY_PEEK and b'json' in headers.get(b'content-type', b''):
+                    # user_id 를 찾으려고 body 를 MAX_BODY_PEEK 까지만 미리 읽고 앱에는 읽은 메시지를 그대로 다시 전달
+                    # (그보다 크면 user_id 를 모르는 것으로 보고 사용자별 제한 없이 나머지 body 와 함께 통과)
+                    messages, body = await _peek_body(receive)
+                    receive = _replay(messages, receive)
+                user_id = _user_id_from(scope, body)
+                if user_id is not None:
+                    wait = route.user_bucket(user_id).take()
+                    if wait:
+                        return await self._reject(scope, send, route_label, 'user_rate', 429, '요청이 너무 많습니다. 잠시 후 다시 시도하세요.', wait)
+
+        # 동시 처리 수 (전체 -> 경로별)
+        gates = []
+        try:
+            for gate, name in ((controller.gate, 'global'), (route.gate if route else None, 'route')):
+                if gate is None:
+                    continue
+                reason = await gate.acquire()
+                if reason is not None:
+                    return await self._reject(scope, send, route_label, f'{name}_{reason}', 503,
+                                              '서버가 바쁩니다. 잠시 후 다시 시도하세요.', gate.timeout)
+                gates.append(gate)
+            controller.stats['admitted'] += 1
+            await self.app(scope, receive, send)
+        finally:
+            for gate in gates:
+                gate.release()
+
+    async def _reject(self, scope, send, route_label, reason, status, message, retry_after):
+        self.controller.shed(route_label, reason)
+        # 메트릭 미들웨어가 라우팅 전에 거절된 요청도 경로별로 기록할 수 있도록
+        scope['shed_route'] = route_label
+        status, headers, body = _json_response(status, message, retry_after)
+        await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+        await send({'type': 'http.response.body', 'body': body})
+
+def _replay(messages, receive):
+    pending = deque(messages)
+
+    async def replay():
+        if pending:
+            return pending.popleft()
+        return await receive()  # 미리 읽은 메시지를 다 보내면 나머지 body / disconnect 등 원래 메시지
+    return replay
+
+def create_admission_controller(on_shed=None):
+    """ADMISSION_ENABLED=0 이면 None"""
+    if not ADMISSION_ENABLED:
+        return None
+    return AdmissionController(on_shed=on_shed)
@@ -0,0 +1,225 @@
+# async 모드용 라우트 (DB_ASYNC=1 일때 main.py 의 같은 경로 sync 라우트를 대체)
+# 상품 / 장바구니 / 주문 API 를 async def + AsyncSession 으로 구현
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Header
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+from typing import List, Optional, Union
+from datetime import datetime
+from model import *
+from schemas import *
+from database import get_async_db, async_engin
+from queries import product_list_query, order_list_query, cart_query, order_rows_to_dicts, checkout_insert_stmt, checkout_delete_stmt, merge_cart_lines, cart_upsert_stmt, sales_upsert_select_stmt, sales_from_cart_select, sales_adjust_stmt, sales_status_delta, order_status_update_stmt, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from product_cache import product_cache
+from fast_json import FastJSONResponse
+from order_events import order_events
+
+router = APIRouter()
+
+# 상품목록 조회 (keyset 페이지네이션 + 가격/이름 필터)
+@router.get('/api/products', response_model=List[ProductOut])
+async def get_produc(request: Request,
+                     after_id: Optional[int] = None,
+                     limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+                     min_price: Optional[int] = None,
+                     max_price: Optional[int] = None,
+                     name_prefix: Optional[str] = None,
+                     db: AsyncSession = Depends(get_async_db)):
+    key = (after_id, limit, min_price, max_price, name_prefix)
+    entry = product_cache.get_list(key)
+    if entry is None:
+        generation = product_cache.generation
+        result = await db.execute(product_list_query(after_id, limit, min_price, max_price, name_prefix))
+        products = [dict(row) for row in result.mappings()]
+        entry = product_cache.put_list(key, products, generation)
+    return product_cache.respond(request, entry)
+
+# 상품 등록
+@router.post('/api/products')
+async def create_produc(product: ProductCreate, db: AsyncSession = Depends(get_async_db)):
+    product = Product(name=product.name, price=product.price)
+    db.add(product)
+    await db.commit()
+    product_cache.invalidate(product.id)
+    return {"success":True, "message":"상품 등록 완료",'product_id':product.id}
+
+# 상품 상세 조회
+@router.get('/api/products/{product_id}', response_model=ProductOut)
+async def get_product_detail(product_id: int, request: Request, db: AsyncSession = Depends(get_async_db)):
+    entry = product_cache.get_item(product_id)
+    if entry is None:
+        generation = product_cache.generation
+        product = await db.get(Product, product_id)
+        if not product:
+            raise HTTPException(status_code=404, detail="상품을 찾을 수 없습니다.")
+        entry = product_cache.put_item(product_id, ProductOut.model_validate(product), generation)
+    return product_cache.respond(request, entry)
+
+# 상품 수정
+@router.put('/api/products/{product_id}')
+async def update_product(product_id: int, product: ProductCreate, db: AsyncSession = Depends(get_async_db)):
+    existing_product = await db.get(Product, product_id)
+    if not existing_product:
+        raise HTTPException(status_code=404, detail="상품을 찾을 수 없습니다.")
+
+    existing_product.name = product.name
+    existing_product.price = product.price
+    await db.commit()
+    product_cache.invalidate(product_id)
+    return {"success": True, "message": "상품이 수정되었습니다.", "product_id": existing_product.id}
+
+# 상품 삭제
+@router.delete('/api/products/{product_id}')
+async def delete_product(product_id: int, db: AsyncSession = Depends(get_async_db)):
+    product = await db.get(Product, product_id)
+    if not product:
+        raise HTTPException(status_code=404, detail="상품을 찾을 수 없습니다.")
+
+    await db.delete(product)
+    await db.commit()
+    product_cache.invalidate(product_id)
+    return {"success": True, "message": "상품이 삭제되었습니다."}
+
+# 장바구니 담기
+@router.post('/api/cart')
+async def add_to_cart(item: Union[CartBatch, CartItem], db: AsyncSession = Depends(get_async_db)):
+    # 상품 하나 (CartItem) 또는 여러 상품 (CartBatch) 을 INSERT ... ON CONFLICT DO UPDATE 한번으로 담음
+    lines = merge_cart_lines(item.items if isinstance(item, CartBatch) else [item])
+    rows = (await db.execute(cart_upsert_stmt(async_engin.dialect.name, item.user_id, lines))).all()
+    await db.commit()
+    cart_ids = {row.product_id: row.id for row in rows}
+    if isinstance(item, CartBatch):
+        return {"success":True, "message":"장바구니에 담겼습니다.", 'cart_ids':[cart_ids[product_id] for product_id in lines]}
+    return {"success":True, "message":"장바구니에 담겼습니다.",'cart_id':cart_ids[item.product_id]}
+
+# 장바구니 조회
+@router.get('/api/cart')
+async def get_cart(user_id: int = Query(...), db: AsyncSession = Depends(get_async_db)):
+    result = await db.execute(cart_query(user_id))
+    return [
+        {
+            'product_id':item.product_id,
+            'quantity':item.quantity,
+            'id':item.id,
+        }
+        for item in result.scalars()
+    ]
+
+# 장바구니 상세 조회 (상품정보 JOIN)
+@router.get('/api/cart/detail', response_model=CartDetailOut)
+async def get_cart_detail(user_id: int = Query(...), db: AsyncSession = Depends(get_async_db)):
+    result = await db.execute(
+        select(Cart.id, Cart.product_id, Cart.quantity, Product.name, Product.price)
+        .join(Product, Product.id == Cart.product_id)
+        .where(Cart.user_id == user_id)
+        .order_by(Cart.id)
+    )
+    items = [
+        {
+            'id': row.id,
+            'product_id': row.product_id,
+            'name': row.name,
+            'price': row.price,
+            'quantity': row.quantity,
+            'line_total': row.price * row.quantity,
+        }
+        for row in result
+    ]
+    return {'items': items, 'subtotal': sum(item['line_total'] for item in items)}
+
+# 장바구니 상품 수량 수정
+@router.put('/api/cart/{cart_id}')
+async def update_cart_item(cart_id: int, quantity: int = Query(..., gt=0), db: AsyncSession = Depends(get_async_db)):
+    cart_item = await db.get(Cart, cart_id)
+    if not cart_item:
+        raise HTTPException(status_code=404, detail="장바구니 상품을 찾을 수 없습니다.")
+
+    cart_item.quantity = quantity
+    await db.commit()
+    return {"success": True, "message": "장바구니 상품 수량이 수정되었습니다.", "cart_id": cart_item.id}
+
+# 장바구니 상품 삭제
+@router.delete('/api/cart/{cart_id}')
+async def delete_cart_item(cart_id: int, db: AsyncSession = Depends(get_async_db)):
+    cart_item = await db.get(Cart, cart_id)
+    if not cart_item:
+        raise HTTPException(status_code=404, detail="장바구니 상품을 찾을 수 없습니다.")
+
+    await db.delete(cart_item)
+    await db.commit()
+    return {"success": True, "message": "장바구니 상품이 삭제되었습니다."}
+
+# 주문 요청(장바구니 상품 주문) - checkout 기록 + INSERT ... SELECT + DELETE 를 한 트랜잭션으로 처리
+@router.post('/api/order')
+async def place_order(order: OrderRequest, idempotency_key: Optional[str] = Header(None), db: AsyncSession = Depends(get_async_db)):
+    key = idempotency_key or order.idempotency_key
+    checkout = Checkout(user_id=order.user_id, idempotency_key=key, created_at=datetime.utcnow())
+    db.add(checkout)
+    try:
+        await db.flush()
+    except IntegrityError:
+        await db.rollback()
+        result = await db.execute(
+            select(Checkout).where(Checkout.user_id == order.user_id, Checkout.idempotency_key == key)
+        )
+        previous = result.scalars().first()
+        return {"success":True, 'message':'이미 처리된 주문입니다', 'checkout_id':previous.id, 'order_count':previous.order_count}
+
+    order_count = (await db.execute(checkout_insert_stmt(order.user_id, checkout.created_at))).rowcount
+    if not order_count:
+        await db.rollback()
+        raise HTTPException(status_code=400,detail="장바구니가 비어있습니다.")
+    # 장바구니를 비우기 전에 상품별 일별 판매 집계에 반영 (같은 트랜잭션)
+    await db.execute(sales_upsert_select_stmt(async_engin.dialect.name, sales_from_cart_select(order.user_id, checkout.created_at.date())))
+    await db.execute(checkout_delete_stmt(order.user_id))
+    checkout.order_count = order_count
+    await db.commit()
+    return {"success":True, 'message':'주문이 완료 되었습니다', 'checkout_id':checkout.id, 'order_count':order_count}
+
+# 주문 목록 조회 (상품정보 JOIN, keyset 페이지네이션 + 기간 필터)
+@router.get('/api/order', response_model=List[OrderOut])
+async def get_orders(user_id: int = Query(...),
+                     after_id: Optional[int] = None,
+                     limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+                     date_from: Optional[datetime] = None,
+                     date_to: Optional[datetime] = None,
+                     db: AsyncSession = Depends(get_async_db)):
+    result = await db.execute(order_list_query(user_id, after_id, limit, date_from, date_to))
+    return FastJSONResponse(order_rows_to_dicts(result))
+
+# 주문 상세 조회
+@router.get('/api/orders/{order_id}', response_model=OrderOut)
+async def get_order_detail(order_id: int, db: AsyncSession = Depends(get_async_db)):
+    order = await db.get(Order, order_id, options=[joinedload(Order.product)])
+    if not order:
+        raise HTTPException(status_code=404, detail="주문을 찾을 수 없습니다.")
+    return order
+
+# 주문 상태 변경 - 읽은 상태 그대로일때만 바꾸는 조건부 UPDATE, 바뀐 경우에만 판매 집계 반영 (main.py 와 같음)
+ORDER_STATUS_RETRIES = 5
+
+@router.put('/api/orders/{order_id}/status')
+async def update_order_status(order_id: int, status: str = Query(..., pattern="^(pending|processing|completed|cancelled)$"), db: AsyncSession = Depends(get_async_db)):
+    for _ in range(ORDER_STATUS_RETRIES):
+        order = (await db.execute(
+            select(Order.id, Order.user_id, Order.product_id, Order.quantity, Order.unit_price, Order.created_at, Order.status)
+            .where(Order.id == order_id)
+        )).first()
+        if not order:
+            raise HTTPException(status_code=404, detail="주문을 찾을 수 없습니다.")
+        if (await db.execute(order_status_update_stmt(order_id, order.status, status))).rowcount == 1:
+            break
+        await db.rollback()
+    else:
+        raise HTTPException(status_code=409, detail="주문 상태가 동시에 변경되고 있습니다. 다시 시도하세요.")
+
+    # 취소 / 취소 해제되면 판매 집계도 같은 트랜잭션에서 빼거나 더함 (매출은 주문 시점 가격 기준)
+    delta = sales_status_delta(order.status, status)
+    if delta and order.created_at is not None:
+        price = order.unit_price or 0
+        await db.execute(sales_adjust_stmt(async_engin.dialect.name, order.created_at.date(), order.product_id,
+                                           delta, delta * order.quantity, delta * order.quantity * price))
+    await db.commit()
+    order_events.publish(order.user_id, {'order_id': order.id, 'status': status})
+    return {"success": True, "message": "주문 상태가 변경되었습니다.", "order_id": order.id}
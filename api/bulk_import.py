@@ -0,0 +1,177 @@
+# 상품 대량 등록 / 수정 (NDJSON 또는 CSV 스트리밍)
+# 요청 body 를 한줄씩 읽어서 ProductCreate 로 검증하고 CHUNK_SIZE 개씩 묶어서
+# name 기준 upsert(INSERT ... ON CONFLICT(name) DO UPDATE) 를 executemany 로 실행한다.
+# 잘못된 줄은 에러 목록에 기록하고 나머지 줄은 계속 처리한다.
+import csv
+import json
+import os
+from collections import deque
+from pydantic import ValidationError
+from sqlalchemy.exc import SQLAlchemyError
+from schemas import ProductCreate
+from queries import product_upsert_stmt
+
+CHUNK_SIZE = int(os.getenv('BULK_IMPORT_CHUNK_SIZE', '5000'))
+MAX_ERRORS = 1000  # 응답에 포함할 최대 에러 수 (개수는 error_count 로 전부 셈)
+
+def _decode(line):
+    """(문자열, None) 또는 UTF-8 이 아니면 (None, 에러 메시지)"""
+    try:
+        return line.decode('utf-8').rstrip('\r'), None
+    except UnicodeDecodeError as e:
+        return None, f'UTF-8 디코딩 실패: {e.reason} (byte {e.start})'
+
+async def iter_lines(stream):
+    """요청 body 스트림을 줄 단위로 나눠서 (줄번호, 문자열, 에러) 로 반환 - 디코딩에 실패한 줄은 문자열 대신 에러 메시지"""
+    buffer = b''
+    line_no = 0
+    async for chunk in stream:
+        buffer += chunk
+        *lines, buffer = buffer.split(b'\n')
+        for line in lines:
+            line_no += 1
+            yield (line_no, *_decode(line))
+    if buffer:
+        yield (line_no + 1, *_decode(buffer))
+
+class _NeedMoreLines(Exception):
+    """csv 레코드가 (따옴표 안의 줄바꿈으로) 아직 받지 않은 줄까지 이어짐"""
+
+class _CsvLineFeeder:
+    """하나의 csv.reader 에 줄을 넣어주는 iterator
+    레코드 중간에 줄이 떨어지면 _NeedMoreLines 를 던지고, 그 레코드에서 읽은 줄은 되돌려서 다음 줄이 오면 다시 읽음"""
+    def __init__(self):
+        self.lines = deque()  # (줄번호, 문자열)
+        self.taken = []       # 지금 읽는 레코드에서 꺼낸 줄
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if not self.lines:
+            raise _NeedMoreLines()
+        item = self.lines.popleft()
+        self.taken.append(item)
+        return item[1] + '\n'  # 따옴표 안의 줄바꿈이 값에 남도록
+
+    def next_record(self, reader):
+        """(시작 줄번호, 컬럼 목록 또는 에러 메시지) - 레코드가 아직 끝나지 않았으면 None"""
+        self.taken = []
+        try:
+            values = next(reader)
+        except _NeedMoreLines:
+            self.lines.extendleft(reversed(self.taken))
+            return None
+        except csv.Error as e:
+            return self.taken[0][0], f'CSV 파싱 실패: {e}'
+        return self.taken[0][0], values
+
+async def iter_csv_rows(stream):
+    """CSV 를 하나의 csv.reader 로 읽어서 (시작 줄번호, dict 또는 에러 메시지) 로 반환
+    따옴표 안에 줄바꿈이 있는 값도 한 레코드로 읽고, 첫 컬럼명의 UTF-8 BOM 은 제거"""
+    feeder = _CsvLineFeeder()
+    reader = csv.reader(feeder)
+    header = None
+    async for line_no, line, error in iter_lines(stream):
+        if error is not None:
+            # 잘못된 바이트가 있는 줄도 다른 줄의 에러처럼 기록하고 계속 처리
+            yield line_no, error
+            continue
+        feeder.lines.append((line_no, line))
+        while feeder.lines:
+            record = feeder.next_record(reader)
+            if record is None:
+                break
+            start_no, values = record
+            if isinstance(values, str):
+                yield start_no, values
+                continue
+            if not any(value.strip() for value in values):
+                continue
+            if header is None:  # 첫 줄은 컬럼명 (name,price)
+                values[0] = values[0].lstrip('\ufeff')
+                header = [name.strip() for name in values]
+                continue
+            if len(values) != len(header):
+                yield start_no, f'컬럼 수가 맞지 않습니다 ({len(values)} != {len(header)})'
+                continue
+            yield start_no, dict(zip(header, values))
+    if feeder.lines:
+        yield feeder.lines[0][0], '따옴표가 닫히지 않았습니다'
+
+async def iter_rows(stream, fmt):
+    """NDJSON / CSV 한 줄을 dict 로 변환 (파싱 실패하면 dict 대신 에러 메시지)"""
+    if fmt == 'csv':
+        async for row in iter_csv_rows(stream):
+            yield row
+        return
+    async for line_no, line, error in iter_lines(stream):
+        if error is not None:
+            # 잘못된 바이트가 있는 줄도 다른 줄의 에러처럼 기록하고 계속 처리
+            yield line_no, error
+            continue
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield line_no, f'JSON 파싱 실패: {e}'
+            continue
+        yield line_no, row if isinstance(row, dict) else 'JSON 객체가 아닙니다'
+
+class BulkImporter:
+    def __init__(self, engine, on_commit=None):
+        self.engine = engine
+        self.on_commit = on_commit  # chunk 가 commit 될때마다 호출 (캐시 무효화 등)
+        self.stmt = product_upsert_stmt(engine.dialect.name)
+        self.processed = 0
+        self.upserted = 0
+        self.error_count = 0
+        self.errors = []
+
+    def add_error(self, line_no, message):
+        self.error_count += 1
+        if len(self.errors) < MAX_ERRORS:
+            self.errors.append({'line': line_no, 'error': message})
+
+    def validate(self, line_no, row):
+        """검증에 성공하면 insert 파라미터, 실패하면 None"""
+        self.processed += 1
+        if isinstance(row, str):
+            self.add_error(line_no, row)
+            return None
+        try:
+            product = ProductCreate.model_validate(row)
+        except ValidationError as e:
+            self.add_error(line_no, '; '.join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors()))
+            return None
+        return {'name': product.name, 'price': product.price, '_line': line_no}
+
+    def write_chunk(self, params):
+        """chunk 하나 = 트랜잭션 하나. 실패하면 한 줄씩 다시 실행해서 문제있는 줄만 에러로 기록"""
+        if not params:
+            return
+        rows = [{'name': p['name'], 'price': p['price']} for p in params]
+        try:
+            with self.engine.begin() as conn:
+                conn.execute(self.stmt, rows)
+            self.upserted += len(rows)
+        except SQLAlchemyError:
+            for p, row in zip(params, rows):
+                try:
+                    with self.engine.begin() as conn:
+                        conn.execute(self.stmt, row)
+                    self.upserted += 1
+                except SQLAlchemyError as e:
+                    self.add_error(p['_line'], str(e.orig if hasattr(e, 'orig') else e))
+        if self.on_commit:
+            self.on_commit()
+
+    def result(self):
+        return {
+            'success': self.error_count == 0,
+            'processed': self.processed,
+            'upserted': self.upserted,
+            'error_count': self.error_count,
+            'errors': self.errors,
+        }
@@ -1,12 +1,182 @@
 # 데이터베이스 생성  FastAPI + sqlite 연동 환경
-from sqlalchemy import create_engine  # DB 연결 엔진
-from sqlalchemy.orm import sessionmaker, declarative_base  # 세션, 모델 베이스 생성
+import os
+import time
+import threading
+from sqlalchemy import create_engine, event  # DB 연결 엔진
+from sqlalchemy.orm import Session, sessionmaker, declarative_base  # 세션, 모델 베이스 생성
+from sqlalchemy.sql.dml import UpdateBase
 
-DATABASE_URL = 'sqlite:///./database.db'
+# 환경변수로 DB 경로를 바꿀 수 있음 (벤치마크, 테스트용)
+DATABASE_URL = os.getenv('DATABASE_URL', 'sqlite:///./database.db')
+# DB_ASYNC=1 이면 async 엔진 + async 라우트 사용 (pip install "sqlalchemy[asyncio]" aiosqlite 필요)
+DB_ASYNC = os.getenv('DB_ASYNC', '0') == '1'
+
+# 커넥션 풀 설정 (환경변수로 변경 가능)
+POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '10'))            # 항상 유지하는 커넥션 수
+MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', '20'))      # 트래픽이 몰릴때 추가로 여는 커넥션 수
+POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', '10'))    # 커넥션을 기다리는 최대 시간(초)
+POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', '1800'))    # 오래된 커넥션은 다시 연결(초)
+POOL_PRE_PING = os.getenv('DB_POOL_PRE_PING', '1') == '1'   # 사용전에 커넥션이 살아있는지 확인
+STATEMENT_TIMEOUT = float(os.getenv('DB_STATEMENT_TIMEOUT', '5'))  # 쿼리 하나의 최대 실행 시간(초), 0이면 제한없음
+
+# sqlite 성능 설정 (SQLITE_TUNED=0 이면 기본 저널 모드 + 단일 엔진 사용)
+SQLITE_TUNED = os.getenv('SQLITE_TUNED', '1') == '1' and DATABASE_URL.startswith('sqlite')
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',             # 쓰는 동안에도 읽기가 막히지 않음
+    'synchronous': 'NORMAL',           # WAL 에서는 NORMAL 로도 안전, fsync 횟수 감소
+    'busy_timeout': int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', '5000')),   # 락이 걸리면 바로 에러내지 않고 대기(ms)
+    'cache_size': -int(os.getenv('SQLITE_CACHE_SIZE_KB', '20000')),     # 음수는 KB 단위
+    'mmap_size': int(os.getenv('SQLITE_MMAP_SIZE', str(256 * 1024 * 1024))),
+    'temp_store': 'MEMORY',
+}
+
+# 풀 사용 현황 카운터 (/api/pool 로 확인)
+pool_counters = {'connects': 0, 'checkouts': 0, 'checkins': 0, 'invalidated': 0}
+_counter_lock = threading.Lock()
+
+def _count(name):
+    with _counter_lock:
+        pool_counters[name] += 1
+
+def _install_statement_timeout(dbapi_conn, timeout):
+    # sqlite 는 statement timeout 이 없어서 progress handler 로 시간을 넘긴 쿼리를 중단시킴
+    state = {'started': None}
+
+    def check():
+        started = state['started']
+        return 1 if started is not None and time.monotonic() - started > timeout else 0
+
+    dbapi_conn.set_progress_handler(check, 10000)
+    return state
+
+def create_db_engine(url=DATABASE_URL, statement_timeout=None, **kwargs):
+    """풀 설정 / pre-ping / statement timeout 이 적용된 엔진을 생성 (statement_timeout 을 주지 않으면 DB_STATEMENT_TIMEOUT, 0 이면 제한없음)"""
+    options = dict(
+        pool_size=POOL_SIZE,
+        max_overflow=MAX_OVERFLOW,
+        pool_timeout=POOL_TIMEOUT,
+        pool_recycle=POOL_RECYCLE,
+        pool_pre_ping=POOL_PRE_PING,
+    )
+    if url.startswith('sqlite'):
+        # 쓰레드 제한을 우회
+        options['connect_args'] = {"check_same_thread":False}
+    options.update(kwargs)
+    engine = create_engine(url, **options)
+    _attach_pool_events(engine, STATEMENT_TIMEOUT if statement_timeout is None else statement_timeout)
+    if SQLITE_TUNED:
+        _attach_sqlite_pragmas(engine)
+    return engine
+
+def _attach_sqlite_pragmas(engine):
+    # 커넥션이 새로 열릴때마다 pragma 적용
+    @event.listens_for(engine, 'connect')
+    def set_pragmas(dbapi_conn, record):
+        cursor = dbapi_conn.cursor()
+        for name, value in SQLITE_PRAGMAS.items():
+            cursor.execute(f'PRAGMA {name}={value}')
+        cursor.close()
+
+def _attach_pool_events(engine, statement_timeout):
+    @event.listens_for(engine, 'connect')
+    def on_connect(dbapi_conn, record):
+        _count('connects')
+        if statement_timeout > 0 and hasattr(dbapi_conn, 'set_progress_handler'):
+            record.info['statement_timer'] = _install_statement_timeout(dbapi_conn, statement_timeout)
+
+    @event.listens_for(engine, 'checkout')
+    def on_checkout(dbapi_conn, record, proxy):
+        _count('checkouts')
+
+    @event.listens_for(engine, 'checkin')
+    def on_checkin(dbapi_conn, record):
+        _count('checkins')
+
+    @event.listens_for(engine, 'invalidate')
+    def on_invalidate(dbapi_conn, record, exc):
+        _count('invalidated')
+
+    # 쿼리 시작/종료 시간을 statement timeout 타이머에 기록
+    @event.listens_for(engine, 'before_cursor_execute')
+    def start_timer(conn, cursor, statement, parameters, context, executemany):
+        timer = conn.connection.info.get('statement_timer')
+        if timer is not None:
+            timer['started'] = time.monotonic()
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def stop_timer(conn, cursor, statement, parameters, context, executemany):
+        timer = conn.connection.info.get('statement_timer')
+        if timer is not None:
+            timer['started'] = None
+
+    # 쿼리가 실패하면 after_cursor_execute 가 호출되지 않으므로 여기서도 타이머를 멈춤
+    # (멈추지 않으면 이 커넥션의 다음 pre-ping 같은 이벤트 없는 실행이 timeout 으로 중단됨)
+    @event.listens_for(engine, 'handle_error')
+    def stop_timer_on_error(context):
+        record = context.connection.connection if context.connection is not None else None
+        timer = record.info.get('statement_timer') if record is not None else None
+        if timer is not None:
+            timer['started'] = None
+
+def get_pool_stats():
+    """커넥션 풀 상태 (현재 사용중 / 오버플로우 / 누적 카운터)"""
+    pool = engin.pool
+    stats = dict(pool_counters)
+    stats.update({
+        'pool_size': pool.size() if hasattr(pool, 'size') else None,
+        'checked_out': pool.checkedout() if hasattr(pool, 'checkedout') else None,
+        'overflow': pool.overflow() if hasattr(pool, 'overflow') else None,
+        'max_overflow': MAX_OVERFLOW,
+    })
+    if writer_engin is not engin:
+        stats['writer_checked_out'] = writer_engin.pool.checkedout()
+    return stats
+
+# 현재경로에 database.db 파일을 생성 (읽기용 풀)
+engin = create_db_engine()
+
+# 쓰기 전용 커넥션 1개 - 쓰기 요청은 풀에서 순서대로 기다리므로 "database is locked" 가 나지 않음
+writer_engin = create_db_engine(pool_size=1, max_overflow=0) if SQLITE_TUNED else engin
+
+class RoutingSession(Session):
+    """flush(INSERT/UPDATE/DELETE) 와 DML 문은 writer 커넥션, 나머지 조회는 읽기 풀을 사용"""
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self._flushing or isinstance(clause, UpdateBase):
+            return writer_engin
+        return engin
 
-# 현재경로에 database.db 파일을 생성, 쓰레드 제한을 우회
-engin = create_engine(DATABASE_URL, connect_args={"check_same_thread":False})
 # 새션을 생성하는 함수.. 요청할때마다 이걸 통해서 세션을 만들어 사용
-SessionLocal = sessionmaker(bind=engin)
+SessionLocal = sessionmaker(class_=RoutingSession)
 # 클래스를 정의할때 마다 사용하는 베이스 클래스
-Base = declarative_base()
\ No newline at end of file
+Base = declarative_base()
+
+# async 모드일때만 async 엔진 생성 (aiosqlite 가 없으면 sync 모드는 그대로 동작)
+async_engin = None
+AsyncSessionLocal = None
+if DB_ASYNC:
+    from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+    # sqlite:///./database.db  ->  sqlite+aiosqlite:///./database.db
+    ASYNC_DATABASE_URL = DATABASE_URL.replace('sqlite://', 'sqlite+aiosqlite://', 1)
+    async_engin = create_async_engine(
+        ASYNC_DATABASE_URL,
+        pool_size=POOL_SIZE,
+        max_overflow=MAX_OVERFLOW,
+        pool_timeout=POOL_TIMEOUT,
+        pool_recycle=POOL_RECYCLE,
+        pool_pre_ping=POOL_PRE_PING,
+    )
+    if SQLITE_TUNED:
+        _attach_sqlite_pragmas(async_engin.sync_engine)
+    # expire_on_commit=False : commit 후에도 객체 속성을 다시 조회하지 않고 사용
+    AsyncSessionLocal = async_sessionmaker(bind=async_engin, expire_on_commit=False)
+
+def get_db():
+    db = SessionLocal()  # 새션 객체  생성
+    try:
+        yield db # 종속된 함수에 세션 주입
+    finally:
+        db.close()  # 요청이 끝나면 자동으로 세션 종료
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:  # 요청마다 async 세션 생성
+        yield db  # 요청이 끝나면 async with 가 세션을 닫음
@@ -0,0 +1,26 @@
+# 빠른 JSON 직렬화 (pip install orjson 이 있으면 orjson, 없으면 표준 json 으로 동작)
+# 목록 API 는 ORM 객체 -> pydantic 검증 -> json 대신 컬럼 튜플 -> dict -> orjson 으로 바로 직렬화
+import json
+from datetime import date, datetime
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+
+    def dumps(data):
+        return orjson.dumps(data)
+except ImportError:
+    orjson = None
+
+    def _default(value):
+        if isinstance(value, (datetime, date)):
+            return value.isoformat()
+        raise TypeError(f'{type(value).__name__} is not JSON serializable')
+
+    def dumps(data):
+        return json.dumps(data, ensure_ascii=False, separators=(',', ':'), default=_default).encode('utf-8')
+
+class FastJSONResponse(JSONResponse):
+    """FastAPI 기본 응답 클래스로 사용 (default_response_class)"""
+    def render(self, content):
+        return dumps(content)
@@ -1,18 +1,27 @@
 # FAST API의 메인 서버
-from fastapi import FastAPI,HTTPException,Depends
+from fastapi import FastAPI,HTTPException,Depends,Query,Request,Header
 from pydantic import BaseModel
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.exc import IntegrityError
 from model import *
-from database import SessionLocal,engin
+from database import SessionLocal,engin,writer_engin,async_engin,DB_ASYNC,get_db,get_pool_stats
 from schemas import *
+from migrations import run_migrations, migration_engine
+from queries import product_list_query, order_list_query, cart_query, order_rows_to_dicts, checkout_insert_stmt, checkout_delete_stmt, merge_cart_lines, cart_upsert_stmt, user_insert_stmt, user_conflict_query, sales_upsert_select_stmt, sales_from_cart_select, sales_adjust_stmt, sales_status_delta, order_status_update_stmt, sales_top_query, sales_daily_query, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from product_cache import product_cache
+from fast_json import FastJSONResponse
+from bulk_import import BulkImporter, iter_rows, CHUNK_SIZE
+from order_events import order_events, EventStreamResponse, TooManySubscribers
+from admission import AdmissionMiddleware, create_admission_controller
+from starlette.concurrency import run_in_threadpool
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
-from typing import List, Optional
+from fastapi.responses import PlainTextResponse
+from typing import List, Optional, Union
 import logging
 import sys
-from logging.handlers import TimedRotatingFileHandler
 import os
-from datetime import datetime
+from datetime import date, datetime, timedelta
 import json
 
 # 현재 스크립트의 절대 경로
@@ -22,39 +31,27 @@ project_root = os.path.dirname(current_dir)
 # 로그 디렉토리 경로
 log_dir = os.path.join(project_root, 'logs')
 
-# 로그 디렉토리 생성
-if not os.path.exists(log_dir):
-    os.makedirs(log_dir)
-    print(f'Created log directory at: {log_dir}')
-
 # 로그 파일 경로 설정
 log_file = os.path.join(log_dir, 'api.log')
-print(f'API Log file will be saved at: {log_file}')
-
-# 로깅 설정
-logging.basicConfig(
-    level=logging.DEBUG,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        # 콘솔 출력
-        logging.StreamHandler(sys.stdout),
-        # 파일 출력 (날짜별 로테이션)
-        TimedRotatingFileHandler(
-            filename=log_file,
-            when='midnight',  # 매일 자정에 새로운 파일 생성
-            interval=1,       # 1일 간격
-            backupCount=30,   # 30일치 로그 파일 유지
-            encoding='utf-8'
-        )
-    ]
-)
+
+# 로깅 설정 (QueueHandler + 백그라운드 쓰레드에서 출력, LOG_LEVEL / LOG_FORMAT / LOG_SAMPLE_RATES 환경변수)
+sys.path.insert(0, project_root)
+from common.log_setup import setup_logging, LogSamplingMiddleware
+from common.metrics import registry, Gauge, MetricsMiddleware, instrument_engine, record_shed
+setup_logging(log_file)
 
 # 로거 설정
 logger = logging.getLogger(__name__)
-logger.info(f'API Logging initialized. Log directory: {log_dir}')
+logger.info('API Logging initialized. Log file: %s', log_file)
 
 # Fast api 생성
-app = FastAPI()
+app = FastAPI(default_response_class=FastJSONResponse)  # orjson 으로 응답 직렬화
+
+# 쓰기 API 요청 수락 제어 (rate limit / 동시 처리 수 제한, 초과하면 429 / 503)
+# 가장 안쪽에 두어서 거절 응답에도 CORS 헤더가 붙고 메트릭에도 기록되도록 함
+admission = create_admission_controller(on_shed=lambda route, reason: record_shed('api', route, reason))
+if admission is not None:
+    app.add_middleware(AdmissionMiddleware, controller=admission)
 
 # CORS(Cross-Origin Resource Sharing) 설정
 app.add_middleware(
@@ -64,16 +61,74 @@ app.add_middleware(
     allow_methods=['*'],
     allow_headers=['*']
 )
+# 경로별 로그 샘플링
+app.add_middleware(LogSamplingMiddleware)
+# 경로별 요청수 / 지연시간 / 요청당 DB 쿼리 수, 시간 기록 (/metrics)
+app.add_middleware(MetricsMiddleware, service='api')
+
+# DB 쿼리 시간 / 횟수를 요청별로 누적
+for engine in {engin, writer_engin}:
+    instrument_engine(engine)
+if async_engin is not None:
+    instrument_engine(async_engin.sync_engine)
 
 # 앱을 실행하면 DB에 정의된 모든 테이블을 생성
-Base.metadata.create_all(bind=engin)
+Base.metadata.create_all(bind=writer_engin)
+# 이미 있던 DB 에는 create_all 이 변경사항(인덱스 등)을 반영하지 않으므로 마이그레이션 적용
+# 큰 테이블은 인덱스 생성 / 백필이 오래 걸리므로 요청용 statement timeout 이 없는 전용 엔진으로 실행
+_migration_engine = migration_engine()
+try:
+    applied = run_migrations(_migration_engine)
+finally:
+    _migration_engine.dispose()
+if applied:
+    logger.info('Applied schema migrations: %s', applied)
 
-def get_db():
-    db = SessionLocal()  # 새션 객체  생성
-    try:
-        yield db # 종속된 함수에 세션 주입
-    finally:
-        db.close()  # 요청이 끝나면 자동으로 세션 종료
+# 커넥션 풀 / 상품 캐시 상태는 /metrics 를 조회할때 gauge 로 채움
+DB_POOL = registry.add(Gauge('db_pool', 'DB connection pool stats'))
+PRODUCT_CACHE = registry.add(Gauge('product_cache', 'Product cache stats'))
+ORDER_EVENTS = registry.add(Gauge('order_events', 'Order status SSE broker stats'))
+ADMISSION = registry.add(Gauge('admission', 'Admission control in-flight / queued requests'))
+
+def collect_api_gauges():
+    for name, value in get_pool_stats().items():
+        if value is not None:
+            DB_POOL.set((('stat', name),), value)
+    for name, value in product_cache.get_stats().items():
+        PRODUCT_CACHE.set((('stat', name),), value)
+    for name, value in order_events.get_stats().items():
+        ORDER_EVENTS.set((('stat', name),), value)
+    if admission is not None:
+        stats = admission.get_stats()
+        for name in ('in_flight', 'queued'):
+            if stats[name] is not None:
+                ADMISSION.set((('route', 'global'), ('stat', name)), stats[name])
+        for route, route_stats in stats['routes'].items():
+            for name, value in route_stats.items():
+                if value is not None:
+                    ADMISSION.set((('route', route), ('stat', name)), value)
+
+registry.collectors.append(collect_api_gauges)
+
+# Prometheus 메트릭
+@app.get('/metrics', response_class=PlainTextResponse)
+def metrics():
+    return registry.render()
+
+# 상품 캐시 hit / miss 현황
+@app.get('/api/cache/products')
+def product_cache_status():
+    return product_cache.get_stats()
+
+# 요청 수락 제어 현황 (처리중 / 대기중 / 거절 사유별 횟수)
+@app.get('/api/admission')
+def admission_status():
+    return admission.get_stats() if admission is not None else {'enabled': False}
+
+# 커넥션 풀 사용 현황 (사용중 / 오버플로우 / 누적 checkout 횟수)
+@app.get('/api/pool')
+def pool_status():
+    return get_pool_stats()
 
 
 from fastapi.templating import Jinja2Templates
@@ -92,24 +147,20 @@ from fastapi import FastAPI, Request
 # 라우터(요청에 응답하는)
 @app.post('/api/register')
 def register_user(user: RegisterRequest, db:Session=Depends(get_db)):
-    # 같은 사용자가 있는지 조회
-    existing_user =  db.query(User) \
-        .filter(User.username == user.username or User.email == user.email) \
-        .first()
-    # 같은 사용자가 있으면  400에러로 응답
-    if existing_user:
-        raise HTTPException(status_code=400, detail="이미 존재하는 사용자입니다.")
-    # 새 유저에대한 객체(인스턴스) 생성성
-    new_user =  User(
-        username = user.username,
-        email = user.email,
-        password = user.password
-    )
-    # db commit하는 과정과 동일
-    db.add(new_user)
+    # INSERT ... ON CONFLICT DO NOTHING RETURNING id 한번으로 가입 (중복이면 id 가 없음)
+    stmt = user_insert_stmt(writer_engin.dialect.name, user.username, user.email, user.password)
+    user_id = db.execute(stmt).scalar()
     db.commit()
-    db.refresh(new_user)  # DB에서 자동 생성된 id를 유저인스턴스에 할당
-    return {"success":True,'message':'회원가입 성공', 'user_id':new_user.id}
+    if user_id is None:
+        # 중복된 필드별로 409 응답
+        conflicts = {}
+        for row in db.execute(user_conflict_query(user.username, user.email)):
+            if row.username == user.username:
+                conflicts['username'] = '이미 사용중인 아이디입니다.'
+            if row.email == user.email:
+                conflicts['email'] = '이미 사용중인 이메일입니다.'
+        raise HTTPException(status_code=409, detail={'message': '이미 존재하는 사용자입니다.', 'conflicts': conflicts})
+    return {"success":True,'message':'회원가입 성공', 'user_id':user_id}
 
 # 사용자정보 UserCreate 로 DB 조회회
 @app.post('/api/login')
@@ -131,39 +182,70 @@ def get_user(user_id:int, db:Session=Depends(get_db) ):
     return user
 
 from typing import List
-# 전체상품 조회
+# 상품목록 조회  /api/products?after_id=50&limit=50&min_price=1000&name_prefix=사과
+# 다음 페이지는 마지막으로 받은 상품 id 를 after_id 로 전달
 @app.get('/api/products', response_model=List[ProductOut])
-def get_produc():
-    db = SessionLocal()
-    products = db.query(Product).all()
-    db.close()
-    return products
+def get_produc(request: Request,
+               after_id: Optional[int] = None,
+               limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+               min_price: Optional[int] = None,
+               max_price: Optional[int] = None,
+               name_prefix: Optional[str] = None,
+               db:Session=Depends(get_db)):
+    # 캐시에 있으면 DB 조회 없이 미리 직렬화된 JSON 으로 응답
+    key = (after_id, limit, min_price, max_price, name_prefix)
+    entry = product_cache.get_list(key)
+    if entry is None:
+        generation = product_cache.generation
+        stmt = product_list_query(after_id, limit, min_price, max_price, name_prefix)
+        products = [dict(row) for row in db.execute(stmt).mappings()]
+        entry = product_cache.put_list(key, products, generation)
+    return product_cache.respond(request, entry)
 # 상품 등록
 @app.post('/api/products')
-def create_produc(product: ProductCreate):
-    db = SessionLocal()
+def create_produc(product: ProductCreate, db:Session=Depends(get_db)):
     product = Product(name= product.name, price = product.price)
     db.add(product)
     db.commit()    
     db.refresh(product)
-    db.close()
+    product_cache.invalidate(product.id)
     return {"success":True, "message":"상품 등록 완료",'product_id':product.id}    
+# 상품 대량 등록/수정  POST /api/products/bulk  (body : NDJSON 또는 CSV, 스트리밍으로 읽음)
+# NDJSON : {"name": "사과", "price": 1000} 한줄에 하나
+# CSV    : 첫줄 name,price 다음부터 데이터
+@app.post('/api/products/bulk')
+async def bulk_import_products(request: Request, data_format: Optional[str] = Query(None, alias='format', pattern='^(ndjson|csv)$')):
+    fmt = data_format or ('csv' if 'csv' in request.headers.get('content-type', '') else 'ndjson')
+    importer = BulkImporter(writer_engin, on_commit=product_cache.invalidate)
+    chunk = []
+    async for line_no, row in iter_rows(request.stream(), fmt):
+        params = importer.validate(line_no, row)
+        if params:
+            chunk.append(params)
+        if len(chunk) >= CHUNK_SIZE:
+            # DB 쓰기는 블로킹이므로 쓰레드풀에서 실행 (그동안 다음 body 를 계속 받을 수 있음)
+            await run_in_threadpool(importer.write_chunk, chunk)
+            chunk = []
+    await run_in_threadpool(importer.write_chunk, chunk)
+    return importer.result()
+
 # 장바구니 담기
 @app.post('/api/cart')
-def add_to_cart(item: CartItem):
-    db = SessionLocal()
-    cart = Cart(user_id=item.user_id, product_id=item.product_id, quantity=item.quantity)
-    db.add(cart)
+def add_to_cart(item: Union[CartBatch, CartItem], db:Session=Depends(get_db)):
+    # 상품 하나 (CartItem) 또는 여러 상품 (CartBatch) 을 INSERT ... ON CONFLICT DO UPDATE 한번으로 담음
+    lines = merge_cart_lines(item.items if isinstance(item, CartBatch) else [item])
+    rows = db.execute(cart_upsert_stmt(writer_engin.dialect.name, item.user_id, lines)).all()
     db.commit()
-    db.refresh(cart)
-    db.close()
-    return {"success":True, "message":"장바구니에 담겼습니다.",'cart_id':cart.id}    
+    cart_ids = {row.product_id: row.id for row in rows}
+    if isinstance(item, CartBatch):
+        return {"success":True, "message":"장바구니에 담겼습니다.", 'cart_ids':[cart_ids[product_id] for product_id in lines]}
+    return {"success":True, "message":"장바구니에 담겼습니다.",'cart_id':cart_ids[item.product_id]}
 
 # 장바구니 조회  /api/cart?user_id=1   ?키=벨류&키=벨류  쿼리파라메터터
 from fastapi import Query
 @app.get('/api/cart')
 def get_cart(user_id: int = Query(...), db:Session=Depends(get_db)):
-    items = db.query(Cart).filter(Cart.user_id == user_id).all()
+    items = db.execute(cart_query(user_id)).scalars()
     return [     
         {            
             'product_id':item.product_id ,
@@ -173,39 +255,95 @@ def get_cart(user_id: int = Query(...), db:Session=Depends(get_db)):
         }
      for item in items
     ]
+# 장바구니 상세 조회  /api/cart/detail?user_id=1
+# 장바구니와 상품을 JOIN 해서 한번에 조회 (상품마다 따로 요청하지 않아도 됨)
+@app.get('/api/cart/detail', response_model=CartDetailOut)
+def get_cart_detail(user_id: int = Query(...), db:Session=Depends(get_db)):
+    rows = db.query(Cart.id, Cart.product_id, Cart.quantity, Product.name, Product.price) \
+        .join(Product, Product.id == Cart.product_id) \
+        .filter(Cart.user_id == user_id) \
+        .order_by(Cart.id) \
+        .all()
+    items = [
+        {
+            'id': row.id,
+            'product_id': row.product_id,
+            'name': row.name,
+            'price': row.price,
+            'quantity': row.quantity,
+            'line_total': row.price * row.quantity,
+        }
+        for row in rows
+    ]
+    return {'items': items, 'subtotal': sum(item['line_total'] for item in items)}
 # 주문 요청(장바구니 상품 주문)
+# 하나의 트랜잭션 안에서  checkout 기록 -> INSERT ... SELECT (cart -> orders) -> DELETE cart  순서로 실행
+# 첫 문장이 쓰기이므로 트랜잭션 시작부터 쓰기 락을 잡고, 동시에 들어온 주문은 순서대로 처리됨
 @app.post('/api/order')
-def place_order(order: OrderRequest, db:Session=Depends(get_db)):
-    cart_items = db.query(Cart).filter(Cart.user_id == order.user_id).all()
-    if not cart_items:
+def place_order(order: OrderRequest, idempotency_key: Optional[str] = Header(None), db:Session=Depends(get_db)):
+    key = idempotency_key or order.idempotency_key
+    checkout = Checkout(user_id=order.user_id, idempotency_key=key, created_at=datetime.utcnow())
+    db.add(checkout)
+    try:
+        db.flush()
+    except IntegrityError:
+        # 같은 키로 이미 처리된 주문 -> 다시 주문하지 않고 처음 결과를 돌려줌
+        db.rollback()
+        previous = db.query(Checkout) \
+            .filter(Checkout.user_id == order.user_id, Checkout.idempotency_key == key) \
+            .first()
+        return {"success":True, 'message':'이미 처리된 주문입니다', 'checkout_id':previous.id, 'order_count':previous.order_count}
+
+    order_count = db.execute(checkout_insert_stmt(order.user_id, checkout.created_at)).rowcount
+    if not order_count:
+        db.rollback()
         raise HTTPException(status_code=400,detail="장바구니가 비어있습니다.")
-    
-    for item in cart_items:
-        new_order = Order(
-            user_id=item.user_id,
-            product_id = item.product_id,
-            quantity = item.quantity
-        )
-        db.add(new_order)  # 주문테이블에 추가
-        db.delete(item)  # cart 테이블에서 삭제        
+    # 장바구니를 비우기 전에 상품별 일별 판매 집계에 반영 (같은 트랜잭션)
+    db.execute(sales_upsert_select_stmt(writer_engin.dialect.name, sales_from_cart_select(order.user_id, checkout.created_at.date())))
+    db.execute(checkout_delete_stmt(order.user_id))
+    checkout.order_count = order_count
     db.commit()
-    return {"success":True, 'message':'주문이 완료 되었습니다'}
+    return {"success":True, 'message':'주문이 완료 되었습니다', 'checkout_id':checkout.id, 'order_count':order_count}
 #주문 목록 조회
 @app.get('/api/order', response_model=List[OrderOut])
-def get_orders(user_id:int = Query(...),db:Session=Depends(get_db)):
-    orders = db.query(Order).filter(Order.user_id == user_id).all()
-    # 각 주문에 상품 정보 추가
-    for order in orders:
-        order.product = db.query(Product).filter(Product.id == order.product_id).first()
-    return orders
+def get_orders(user_id:int = Query(...),
+               after_id: Optional[int] = None,
+               limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+               date_from: Optional[datetime] = None,
+               date_to: Optional[datetime] = None,
+               db:Session=Depends(get_db)):
+    # 주문과 상품 정보를 JOIN 으로 한번에 조회 (주문마다 상품을 따로 조회하지 않음)
+    stmt = order_list_query(user_id, after_id, limit, date_from, date_to)
+    # 컬럼 튜플을 dict 로 바꿔서 바로 직렬화 (행마다 OrderOut 검증을 하지 않음)
+    return FastJSONResponse(order_rows_to_dicts(db.execute(stmt)))
+
+# 주문 상태 변경 알림 (Server-Sent Events)  /api/order/events?user_id=1
+# 주문목록 페이지가 폴링하지 않고 연결을 유지한채로 상태 변경 이벤트만 받음
+@app.get('/api/order/events')
+async def order_status_events(user_id: int = Query(...)):
+    try:
+        queue = order_events.subscribe(user_id)
+    except TooManySubscribers:
+        raise HTTPException(status_code=503, detail="접속자가 많아 알림을 연결할 수 없습니다.", headers={'Retry-After': '30'})
+    # 응답이 끝나면 (본문을 보내기 전에 연결이 끊겨도) 구독 해제
+    return EventStreamResponse(user_id, queue)
+
+# 주문 알림 구독자 수 / 전달 현황
+@app.get('/api/order/events/stats')
+def order_events_status():
+    return order_events.get_stats()
 
 # 상품 상세 조회
 @app.get('/api/products/{product_id}', response_model=ProductOut)
-def get_product_detail(product_id: int, db: Session = Depends(get_db)):
-    product = db.query(Product).filter(Product.id == product_id).first()
-    if not product:
-        raise HTTPException(status_code=404, detail="상품을 찾을 수 없습니다.")
-    return product
+def get_product_detail(product_id: int, request: Request, db: Session = Depends(get_db)):
+    entry = product_cache.get_item(product_id)
+    if entry is None:
+        generation = product_cache.generation
+        product = db.query(Product).filter(Product.id == product_id).first()
+        if not product:
+            raise HTTPException(status_code=404, detail="상품을 찾을 수 없습니다.")
+        entry = product_cache.put_item(product_id, ProductOut.model_validate(product), generation)
+    return product_cache.respond(request, entry)
 
 # 상품 수정
 @app.put('/api/products/{product_id}')
@@ -218,6 +356,7 @@ def update_product(product_id: int, product: ProductCreate, db: Session = Depend
     existing_product.price = product.price
     db.commit()
     db.refresh(existing_product)
+    product_cache.invalidate(product_id)
     return {"success": True, "message": "상품이 수정되었습니다.", "product_id": existing_product.id}
 
 # 상품 삭제
@@ -229,6 +368,7 @@ def delete_product(product_id: int, db: Session = Depends(get_db)):
     
     db.delete(product)
     db.commit()
+    product_cache.invalidate(product_id)
     return {"success": True, "message": "상품이 삭제되었습니다."}
 
 # 장바구니 상품 수량 수정
@@ -261,23 +401,126 @@ def delete_cart_item(cart_id: int, db: Session = Depends(get_db)):
 # 주문 상세 조회
 @app.get('/api/orders/{order_id}', response_model=OrderOut)
 def get_order_detail(order_id: int, db: Session = Depends(get_db)):
-    order = db.query(Order).filter(Order.id == order_id).first()
+    order = db.query(Order) \
+        .options(joinedload(Order.product)) \
+        .filter(Order.id == order_id) \
+        .first()
     if not order:
         raise HTTPException(status_code=404, detail="주문을 찾을 수 없습니다.")
     return order
 
 # 주문 상태 변경
+# 상태를 읽고 "읽은 상태 그대로일때만" 바꾸는 조건부 UPDATE 를 writer 에서 실행 -> 바뀐 경우에만 판매 집계 반영
+# 동시에 같은 주문을 취소해도 한 요청만 취소 -> 취소 로 바꾸고 집계도 한번만 빠짐
+ORDER_STATUS_RETRIES = 5
+
 @app.put('/api/orders/{order_id}/status')
-def update_order_status(order_id: int, status: str = Query(..., regex="^(pending|processing|completed|cancelled)$"), db: Session = Depends(get_db)):
-    order = db.query(Order).filter(Order.id == order_id).first()
-    if not order:
-        raise HTTPException(status_code=404, detail="주문을 찾을 수 없습니다.")
-    
-    order.status = status
+def update_order_status(order_id: int, status: str = Query(..., pattern="^(pending|processing|completed|cancelled)$"), db: Session = Depends(get_db)):
+    for _ in range(ORDER_STATUS_RETRIES):
+        order = db.query(Order.id, Order.user_id, Order.product_id, Order.quantity, Order.unit_price, Order.created_at, Order.status) \
+            .filter(Order.id == order_id) \
+            .first()
+        if not order:
+            raise HTTPException(status_code=404, detail="주문을 찾을 수 없습니다.")
+        if db.execute(order_status_update_stmt(order_id, order.status, status)).rowcount == 1:
+            break
+        # 읽은 뒤에 다른 요청이 상태를 바꿈 -> 다시 읽어서 재시도
+        db.rollback()
+    else:
+        raise HTTPException(status_code=409, detail="주문 상태가 동시에 변경되고 있습니다. 다시 시도하세요.")
+
+    # 취소 / 취소 해제되면 판매 집계도 같은 트랜잭션에서 빼거나 더함 (매출은 주문 시점 가격 기준)
+    delta = sales_status_delta(order.status, status)
+    if delta and order.created_at is not None:
+        price = order.unit_price or 0
+        db.execute(sales_adjust_stmt(writer_engin.dialect.name, order.created_at.date(), order.product_id,
+                                     delta, delta * order.quantity, delta * order.quantity * price))
     db.commit()
-    db.refresh(order)
+    # 해당 사용자의 주문목록 페이지(SSE 구독자)로 알림
+    order_events.publish(order.user_id, {'order_id': order.id, 'status': status})
     return {"success": True, "message": "주문 상태가 변경되었습니다.", "order_id": order.id}
 
+# 판매 리포트 - 기간 내 상품별 합계 상위 N 개  /api/reports/sales/top?date_from=2025-01-01&date_to=2025-01-31&top=10&order_by=revenue
+# 주문 테이블 대신 일별 집계만 조회 (기간을 주지 않으면 최근 30일)
+def _report_range(date_from, date_to):
+    date_to = date_to or datetime.utcnow().date()
+    date_from = date_from or date_to - timedelta(days=29)
+    if date_from > date_to:
+        raise HTTPException(status_code=400, detail="date_from 이 date_to 보다 늦습니다.")
+    return date_from, date_to
+
+@app.get('/api/reports/sales/top', response_model=List[SalesTotalOut])
+def sales_top_report(date_from: Optional[date] = None,
+                     date_to: Optional[date] = None,
+                     top: int = Query(10, ge=1, le=100),
+                     order_by: str = Query('units', pattern="^(units|revenue|order_count)$"),
+                     db: Session = Depends(get_db)):
+    date_from, date_to = _report_range(date_from, date_to)
+    rows = db.execute(sales_top_query(date_from, date_to, top, order_by)).mappings()
+    return FastJSONResponse([dict(row) for row in rows])
+
+# 판매 리포트 - 기간 내 일별 합계 (product_id 를 주면 해당 상품만)  /api/reports/sales/daily?product_id=3
+@app.get('/api/reports/sales/daily', response_model=List[SalesDayOut])
+def sales_daily_report(date_from: Optional[date] = None,
+                       date_to: Optional[date] = None,
+                       product_id: Optional[int] = None,
+                       db: Session = Depends(get_db)):
+    date_from, date_to = _report_range(date_from, date_to)
+    rows = db.execute(sales_daily_query(date_from, date_to, product_id)).mappings()
+    return FastJSONResponse([dict(row) for row in rows])
+
+# async 모드 (DB_ASYNC=1) : 상품/장바구니/주문 라우트를 async 버전으로 교체
+if DB_ASYNC:
+    from fastapi.routing import APIRoute
+    from async_routes import router as async_router
+    async_keys = {(route.path, method) for route in async_router.routes for method in route.methods}
+    # 같은 경로+메서드의 sync 라우트는 제거하고 async 라우트를 등록
+    app.router.routes = [
+        route for route in app.router.routes
+        if not (isinstance(route, APIRoute) and any((route.path, method) in async_keys for method in route.methods))
+    ]
+    app.include_router(async_router)
+    logger.info('Async DB mode enabled')
+
+# 통합 모드 (COMBINED_MODE=1) : Flask 프론트엔드를 이 FastAPI 앱에 mount 해서 한 프로세스로 실행
+# 페이지와 /api 가 같은 origin 이 되어 CORS preflight 가 없고, 로그인/회원가입은 HTTP 대신 함수 호출로 처리
+COMBINED_MODE = os.getenv('COMBINED_MODE', '0') == '1'
+if COMBINED_MODE:
+    sys.path.insert(0, os.path.join(project_root, 'frontend'))
+    try:
+        from a2wsgi import WSGIMiddleware  # pip install a2wsgi (권장)
+    except ImportError:
+        from fastapi.middleware.wsgi import WSGIMiddleware
+    from pydantic import ValidationError
+    import app as frontend
+
+    class LocalUserBackend:
+        """Flask 의 로그인/회원가입을 API 라우트 함수 직접 호출로 처리"""
+        def _call(self, handler, schema, payload):
+            try:
+                data = schema(**payload)
+            except ValidationError as e:
+                return 422, {'detail': e.errors()}
+            db = SessionLocal()
+            try:
+                return 200, handler(data, db)
+            except HTTPException as e:
+                return e.status_code, {'detail': e.detail}
+            finally:
+                db.close()
+
+        def login(self, credentials):
+            return self._call(login, UserCreate, credentials)
+
+        def register(self, user):
+            return self._call(register_user, RegisterRequest, user)
+
+    frontend.user_backend = LocalUserBackend()
+    frontend.app.config['API_BASE'] = ''
+    # API 라우트가 먼저 매칭되고 나머지 경로는 전부 Flask 로 전달
+    app.mount('/', WSGIMiddleware(frontend.app))
+    logger.info('Combined mode: Flask frontend mounted at /')
+
 if __name__ == "__main__":
     import uvicorn
     logger.info("Starting API server...")
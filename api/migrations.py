@@ -0,0 +1,166 @@
+# 스키마 마이그레이션
+# Base.metadata.create_all 은 이미 있는 테이블은 건드리지 않으므로 (인덱스 추가 X)
+# 기존 DB 에 필요한 변경을 버전 순서대로 적용하고 schema_migrations 테이블에 기록한다.
+# 요청용 엔진의 statement timeout(DB_STATEMENT_TIMEOUT) 이 걸리면 큰 테이블의 인덱스 생성 / 백필이 중단되므로
+# timeout 없는 마이그레이션 전용 엔진(migration_engine)으로 실행한다.
+# 실행 : python migrations.py            (대기중인 마이그레이션 적용)
+#        python migrations.py --explain  (주요 쿼리가 인덱스를 타는지 확인)
+import os
+import sys
+from datetime import datetime
+from sqlalchemy import text, inspect
+
+MIGRATIONS = []  # (version, name, func, chunked)
+
+# chunk 단위로 나눠서 실행하는 마이그레이션의 chunk 크기 (orders id 범위)
+MIGRATION_CHUNK_SIZE = int(os.getenv('MIGRATION_CHUNK_SIZE', '10000'))
+
+def migration(version, name, chunked=False):
+    """마이그레이션 함수 등록용 데코레이터 - func(conn) 은 한 트랜잭션 안에서 실행됨
+    chunked=True 면 func(engine) 이 직접 chunk 마다 트랜잭션을 나눠서 실행하고, 끝난 뒤에 버전을 기록함
+    (중간에 실패하면 기록되지 않으므로 다음 실행때 처음부터 다시 실행해도 같은 결과가 되도록 작성)"""
+    def register(func):
+        MIGRATIONS.append((version, name, func, chunked))
+        MIGRATIONS.sort(key=lambda m: m[0])
+        return func
+    return register
+
+@migration(1, 'cart / orders 외래키 인덱스 추가')
+def add_cart_order_indexes(conn):
+    conn.execute(text('CREATE INDEX IF NOT EXISTS ix_cart_user_product ON cart (user_id, product_id)'))
+    conn.execute(text('CREATE INDEX IF NOT EXISTS ix_cart_product_id ON cart (product_id)'))
+    conn.execute(text('CREATE INDEX IF NOT EXISTS ix_orders_user_created ON orders (user_id, created_at)'))
+    conn.execute(text('CREATE INDEX IF NOT EXISTS ix_orders_product_id ON orders (product_id)'))
+
+@migration(2, 'cart (user_id, product_id) 중복 줄 합치고 unique 인덱스로 변경')
+def unique_cart_lines(conn):
+    # 같은 상품이 여러 줄이면 가장 먼저 담은 줄에 수량을 합치고 나머지는 삭제
+    conn.execute(text(
+        'UPDATE cart SET quantity = ('
+        '  SELECT SUM(c.quantity) FROM cart c WHERE c.user_id = cart.user_id AND c.product_id = cart.product_id'
+        ') WHERE id IN ('
+        '  SELECT MIN(id) FROM cart WHERE user_id IS NOT NULL AND product_id IS NOT NULL'
+        '  GROUP BY user_id, product_id HAVING COUNT(*) > 1'
+        ')'
+    ))
+    conn.execute(text(
+        'DELETE FROM cart WHERE user_id IS NOT NULL AND product_id IS NOT NULL AND id NOT IN ('
+        '  SELECT MIN(id) FROM cart WHERE user_id IS NOT NULL AND product_id IS NOT NULL GROUP BY user_id, product_id'
+        ')'
+    ))
+    conn.execute(text('DROP INDEX IF EXISTS ix_cart_user_product'))
+    conn.execute(text('CREATE UNIQUE INDEX IF NOT EXISTS uq_cart_user_product ON cart (user_id, product_id)'))
+
+@migration(3, 'orders.status 컬럼 추가')
+def add_order_status(conn):
+    # 새 DB 는 create_all 이 이미 컬럼을 만들었으므로 없을때만 추가
+    if 'status' not in {column['name'] for column in inspect(conn).get_columns('orders')}:
+        conn.execute(text("ALTER TABLE orders ADD COLUMN status VARCHAR NOT NULL DEFAULT 'pending'"))
+
+@migration(4, 'orders (user_id, id) 인덱스 추가')
+def add_order_user_id_index(conn):
+    # 주문목록은 id 순 keyset 페이지라 (user_id, created_at) 인덱스로는 페이지마다 사용자 주문 전체를 정렬함
+    conn.execute(text('CREATE INDEX IF NOT EXISTS ix_orders_user_id ON orders (user_id, id)'))
+
+@migration(5, 'orders.unit_price 컬럼 추가 (주문 시점 가격)', chunked=True)
+def add_order_unit_price(engine):
+    with engine.begin() as conn:
+        if 'unit_price' not in {column['name'] for column in inspect(conn).get_columns('orders')}:
+            conn.execute(text('ALTER TABLE orders ADD COLUMN unit_price INTEGER'))
+        upto_id = conn.execute(text('SELECT MAX(id) FROM orders')).scalar() or 0
+    # 이전 주문은 주문 시점 가격을 알 수 없으므로 지금 상품 가격으로 채움
+    # 한번에 UPDATE 하면 orders 전체를 잡고 있으므로 id 범위 chunk 단위로 나눠서 채움 (이미 채운 줄은 건너뜀)
+    after_id = 0
+    while after_id < upto_id:
+        end_id = min(after_id + MIGRATION_CHUNK_SIZE, upto_id)
+        with engine.begin() as conn:
+            conn.execute(text(
+                'UPDATE orders SET unit_price = (SELECT price FROM products WHERE products.id = orders.product_id) '
+                'WHERE unit_price IS NULL AND id > :after_id AND id <= :end_id'
+            ), {'after_id': after_id, 'end_id': end_id})
+        after_id = end_id
+
+@migration(6, 'product_daily_sales 생성 + 기존 주문 백필', chunked=True)
+def backfill_product_daily_sales(engine):
+    # 기존 DB 의 주문은 집계에 들어가 있지 않으므로 (주문하기 / 상태 변경만 집계를 갱신) orders 로 한번 다시 만듦
+    # 이미 집계가 쌓이고 있던 DB 도 비우고 다시 만들기 때문에 결과는 같음
+    from model import ProductDailySales
+    from sales import backfill
+    ProductDailySales.__table__.create(engine, checkfirst=True)
+    backfill(engine, MIGRATION_CHUNK_SIZE)
+
+def applied_versions(conn):
+    conn.execute(text(
+        'CREATE TABLE IF NOT EXISTS schema_migrations ('
+        'version INTEGER PRIMARY KEY, name VARCHAR NOT NULL, applied_at DATETIME NOT NULL)'
+    ))
+    return {row[0] for row in conn.execute(text('SELECT version FROM schema_migrations'))}
+
+def migration_engine(url=None):
+    """statement timeout 없는 커넥션 하나짜리 엔진 (사용 후 dispose)"""
+    from database import DATABASE_URL, create_db_engine
+    return create_db_engine(url or DATABASE_URL, statement_timeout=0, pool_size=1, max_overflow=0)
+
+def run_migrations(engine):
+    """아직 적용되지 않은 마이그레이션을 순서대로 적용하고 적용한 버전 목록을 반환"""
+    with engine.begin() as conn:
+        done = applied_versions(conn)
+    applied = []
+    for version, name, func, chunked in MIGRATIONS:
+        if version in done:
+            continue
+        if chunked:
+            func(engine)
+        # 마이그레이션 하나 = 트랜잭션 하나 (실패하면 기록도 같이 롤백)
+        with engine.begin() as conn:
+            if not chunked:
+                func(conn)
+            conn.execute(
+                text('INSERT INTO schema_migrations (version, name, applied_at) VALUES (:version, :name, :applied_at)'),
+                {'version': version, 'name': name, 'applied_at': datetime.utcnow()},
+            )
+        applied.append(version)
+    return applied
+
+# 인덱스를 타야하는 주요 쿼리 (get_cart, get_orders) - 라우트가 실제로 실행하는 statement 를 그대로 사용
+def hot_queries():
+    from queries import cart_query, order_list_query
+    return {
+        'cart_by_user': cart_query(1),
+        'orders_by_user': order_list_query(1),
+        'orders_by_user_next_page': order_list_query(1, after_id=100),
+    }
+
+def query_plan(engine, stmt):
+    """statement 를 값까지 채워서 컴파일하고 EXPLAIN QUERY PLAN 결과를 ' / ' 로 이어서 반환"""
+    sql = stmt.compile(engine, compile_kwargs={'literal_binds': True})
+    with engine.connect() as conn:
+        return ' / '.join(row[-1] for row in conn.execute(text(f'EXPLAIN QUERY PLAN {sql}')))
+
+def uses_index_only(plan):
+    # 테이블 전체 SCAN 이나 ORDER BY 를 위한 임시 정렬(TEMP B-TREE) 이 없어야 함
+    return 'SCAN' not in plan and 'TEMP B-TREE' not in plan
+
+def explain(engine):
+    """EXPLAIN QUERY PLAN 결과를 {쿼리이름: (인덱스만 사용하는지, plan)} 으로 반환"""
+    result = {}
+    for name, stmt in hot_queries().items():
+        plan = query_plan(engine, stmt)
+        result[name] = (uses_index_only(plan), plan)
+    return result
+
+if __name__ == '__main__':
+    from database import writer_engin, Base
+    import model  # 테이블 정의 등록
+    Base.metadata.create_all(bind=writer_engin)
+    if '--explain' in sys.argv:
+        ok = True
+        for name, (indexed, plan) in explain(writer_engin).items():
+            print(f"{'OK  ' if indexed else 'SLOW'} {name}: {plan}")
+            ok = ok and indexed
+        sys.exit(0 if ok else 1)
+    engine = migration_engine()
+    try:
+        print('applied migrations:', run_migrations(engine) or 'none')
+    finally:
+        engine.dispose()
@@ -1,5 +1,6 @@
 # 데이터 베이스 테이블 정의
-from sqlalchemy import Column,Integer,String,ForeignKey,DateTime
+from sqlalchemy import Column,Integer,String,ForeignKey,DateTime,Date,Index,UniqueConstraint
+from sqlalchemy.orm import relationship
 from database import Base
 from datetime import datetime
 
@@ -22,6 +23,13 @@ class Cart(Base):
     user_id = Column(Integer,ForeignKey('users.id'))
     product_id = Column(Integer,ForeignKey('products.id'))
     quantity = Column(Integer)
+    # 장바구니 상품 정보 (Cart.product 로 바로 접근)
+    product = relationship('Product')
+    # 사용자별로 상품당 한 줄만 있도록 (user_id, product_id) unique 인덱스 (user_id 조회에도 사용)
+    __table_args__ = (
+        Index('uq_cart_user_product', 'user_id', 'product_id', unique=True),
+        Index('ix_cart_product_id', 'product_id'),
+    )
 
 # 주문
 class Order(Base):
@@ -30,4 +38,41 @@ class Order(Base):
     user_id = Column(Integer,ForeignKey('users.id'))
     product_id = Column(Integer,ForeignKey('products.id'))
     quantity = Column(Integer)
-    created_at = Column(DateTime, default=datetime.utcnow)
\ No newline at end of file
+    # 주문 시점의 상품 가격 (주문하기에서 products.price 를 복사, 이후 가격이 바뀌어도 매출 계산은 이 값 사용)
+    unit_price = Column(Integer)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    # 주문 상태 (pending / processing / completed / cancelled)
+    status = Column(String, nullable=False, default='pending', server_default='pending')
+    # 주문 상품 정보 - 조회할때 joinedload 로 한번에 가져옴
+    product = relationship('Product')
+    # 사용자별 주문목록 조회용 인덱스 - 목록은 id 순 keyset 페이지라 (user_id, id), 기간 필터는 (user_id, created_at)
+    __table_args__ = (
+        Index('ix_orders_user_id', 'user_id', 'id'),
+        Index('ix_orders_user_created', 'user_id', 'created_at'),
+        Index('ix_orders_product_id', 'product_id'),
+    )
+
+# 주문 요청(checkout) 기록 - idempotency_key 로 같은 주문 요청이 두번 처리되지 않도록 함
+class Checkout(Base):
+    __tablename__ ='checkouts'
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer,ForeignKey('users.id'))
+    idempotency_key = Column(String, nullable=True)
+    order_count = Column(Integer, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    __table_args__ = (
+        UniqueConstraint('user_id', 'idempotency_key', name='uq_checkouts_user_key'),
+    )
+
+# 상품별 일별 판매 집계 (주문 / 주문 상태 변경과 같은 트랜잭션에서 갱신, 취소된 주문은 제외)
+# 리포트는 orders 전체 대신 이 테이블만 조회 -> 조회 비용이 주문 수가 아니라 (일수 x 상품수) 에 비례
+class ProductDailySales(Base):
+    __tablename__ = 'product_daily_sales'
+    day = Column(Date, primary_key=True)
+    product_id = Column(Integer, ForeignKey('products.id'), primary_key=True)
+    order_count = Column(Integer, nullable=False, default=0)
+    units = Column(Integer, nullable=False, default=0)
+    revenue = Column(Integer, nullable=False, default=0)  # 수량 x 상품가격
+    __table_args__ = (
+        Index('ix_product_daily_sales_product_day', 'product_id', 'day'),
+    )
@@ -0,0 +1,116 @@
+# 주문 상태 변경 알림 (프로세스 내 asyncio pub/sub)
+# - GET /api/order/events?user_id=1 (SSE) 로 접속한 구독자마다 작은 asyncio.Queue 하나
+# - 주문 상태가 바뀌면 해당 사용자의 구독자 큐에 이벤트를 넣음 (블로킹 없이, 큐가 차면 가장 오래된 이벤트를 버림)
+# - sync 라우트(쓰레드풀)에서 publish 해도 이벤트 루프 쓰레드로 넘겨서 처리
+# - 구독자 수 / 큐 크기에 상한이 있어서 대기중인 연결이 많아도 메모리가 일정 수준을 넘지 않음
+# 프로세스 메모리 기반이라 워커가 여러개면 같은 워커에 연결된 구독자에게만 전달됨
+import asyncio
+import os
+import threading
+from starlette.responses import StreamingResponse
+from fast_json import dumps
+
+MAX_SUBSCRIBERS = int(os.getenv('ORDER_EVENTS_MAX_SUBSCRIBERS', '10000'))  # 전체 동시 구독자 수 상한
+QUEUE_SIZE = int(os.getenv('ORDER_EVENTS_QUEUE_SIZE', '16'))               # 구독자별로 쌓아둘 최대 이벤트 수
+KEEPALIVE = float(os.getenv('ORDER_EVENTS_KEEPALIVE', '15'))               # 이벤트가 없을때 keepalive 주기(초)
+
+class TooManySubscribers(Exception):
+    """구독자 수가 MAX_SUBSCRIBERS 에 도달함"""
+
+class OrderEventBroker:
+    def __init__(self, max_subscribers=MAX_SUBSCRIBERS, queue_size=QUEUE_SIZE):
+        self.max_subscribers = max_subscribers
+        self.queue_size = queue_size
+        self._subscribers = {}  # user_id -> set(asyncio.Queue)
+        self._count = 0
+        self._loop = None
+        self._lock = threading.Lock()
+        self.stats = {'published': 0, 'delivered': 0, 'dropped': 0, 'rejected': 0}
+
+    def subscribe(self, user_id):
+        """이벤트 루프 안에서 호출. 구독자 큐를 반환 (끝나면 unsubscribe)"""
+        with self._lock:
+            if self._count >= self.max_subscribers:
+                self.stats['rejected'] += 1
+                raise TooManySubscribers()
+            self._loop = asyncio.get_running_loop()
+            queue = asyncio.Queue(self.queue_size)
+            self._subscribers.setdefault(user_id, set()).add(queue)
+            self._count += 1
+        return queue
+
+    def unsubscribe(self, user_id, queue):
+        with self._lock:
+            queues = self._subscribers.get(user_id)
+            if queues is None or queue not in queues:
+                return
+            queues.discard(queue)
+            if not queues:
+                del self._subscribers[user_id]
+            self._count -= 1
+
+    def publish(self, user_id, event):
+        """이벤트 루프 / 다른 쓰레드 어디서든 호출 가능. 구독자가 없으면 아무것도 하지 않음"""
+        if user_id not in self._subscribers:
+            return
+        self.stats['published'] += 1
+        loop = self._loop
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self._deliver(user_id, event)
+        elif loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(self._deliver, user_id, event)
+
+    def _deliver(self, user_id, event):
+        # 이벤트 루프 쓰레드에서만 실행
+        for queue in list(self._subscribers.get(user_id, ())):
+            if queue.full():
+                # 느린 구독자 때문에 메모리가 늘지 않도록 가장 오래된 이벤트를 버림
+                queue.get_nowait()
+                self.stats['dropped'] += 1
+            queue.put_nowait(event)
+            self.stats['delivered'] += 1
+
+    def subscriber_count(self):
+        return self._count
+
+    def get_stats(self):
+        with self._lock:
+            return dict(self.stats, subscribers=self._count, users=len(self._subscribers),
+                        max_subscribers=self.max_subscribers, queue_size=self.queue_size)
+
+order_events = OrderEventBroker()
+
+async def event_stream(user_id, queue, keepalive=KEEPALIVE):
+    """SSE 응답 body - 이벤트마다 'event: order_status' 한 건, 이벤트가 없으면 주석 한 줄로 연결 유지"""
+    try:
+        yield b'retry: 3000\n\n'  # 연결이 끊기면 브라우저가 3초 후 다시 연결
+        while True:
+            try:
+                event = await asyncio.wait_for(queue.get(), keepalive)
+            except asyncio.TimeoutError:
+                yield b': keepalive\n\n'
+                continue
+            yield b'event: order_status\ndata: ' + dumps(event) + b'\n\n'
+    finally:
+        # 클라이언트가 연결을 끊으면 Starlette 가 제너레이터를 닫음 -> 구독 해제
+        order_events.unsubscribe(user_id, queue)
+
+class EventStreamResponse(StreamingResponse):
+    """구독자 큐를 SSE 로 보내는 응답.
+    본문을 보내기 전에 연결이 끊기거나 헤더 전송이 실패하면 제너레이터가 시작되지 않아 위의 finally 가 실행되지 않으므로
+    응답이 어떻게 끝나든 여기서 구독을 해제한다 (unsubscribe 는 두번 호출해도 됨)"""
+    def __init__(self, user_id, queue):
+        super().__init__(event_stream(user_id, queue), media_type='text/event-stream',
+                         headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+        self.user_id = user_id
+        self.queue = queue
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            order_events.unsubscribe(self.user_id, self.queue)
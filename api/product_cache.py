@@ -0,0 +1,95 @@
+# 상품 캐시 (프로세스 메모리)
+# 상품목록 페이지 / 상품 상세 응답을 JSON bytes 로 미리 직렬화해서 저장하고 ETag 로 304 응답을 지원한다.
+# 상품 등록 / 수정 / 삭제시 바로 invalidate 해서 오래된 데이터가 나가지 않도록 한다.
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from fastapi import Request, Response
+from fast_json import dumps
+
+CACHE_TTL = float(os.getenv('PRODUCT_CACHE_TTL', '60'))       # 캐시 유지 시간(초)
+CACHE_SIZE = int(os.getenv('PRODUCT_CACHE_SIZE', '1024'))     # 목록 / 상세 각각 최대 항목 수 (LRU)
+
+class CacheEntry:
+    __slots__ = ('body', 'etag', 'expires')
+
+    def __init__(self, body, ttl):
+        self.body = body
+        self.etag = '"' + hashlib.blake2b(body, digest_size=8).hexdigest() + '"'
+        self.expires = time.monotonic() + ttl
+
+class ProductCache:
+    def __init__(self, ttl=CACHE_TTL, max_entries=CACHE_SIZE):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lists = OrderedDict()   # (after_id, limit, min_price, max_price, name_prefix) -> CacheEntry
+        self._items = OrderedDict()   # product_id -> CacheEntry
+        self._lock = threading.Lock()
+        # 조회 도중에 수정이 일어나면 옛날 데이터를 캐시에 넣지 않도록 세대 번호를 비교
+        self.generation = 0
+        self.stats = {'hits': 0, 'misses': 0, 'not_modified': 0, 'invalidations': 0}
+
+    def _get(self, store, key):
+        with self._lock:
+            entry = store.get(key)
+            if entry is not None and entry.expires > time.monotonic():
+                store.move_to_end(key)
+                self.stats['hits'] += 1
+                return entry
+            if entry is not None:
+                del store[key]
+            self.stats['misses'] += 1
+            return None
+
+    def _put(self, store, key, data, generation):
+        entry = CacheEntry(dumps(data), self.ttl)
+        with self._lock:
+            if generation == self.generation:
+                store[key] = entry
+                store.move_to_end(key)
+                while len(store) > self.max_entries:
+                    store.popitem(last=False)  # 가장 오래 사용하지 않은 항목 제거
+        return entry
+
+    def get_list(self, key):
+        return self._get(self._lists, key)
+
+    def put_list(self, key, products, generation):
+        """products : 상품 dict 목록 (id, name, price)"""
+        return self._put(self._lists, key, products, generation)
+
+    def get_item(self, product_id):
+        return self._get(self._items, product_id)
+
+    def put_item(self, product_id, product, generation):
+        return self._put(self._items, product_id, product.model_dump(), generation)
+
+    def invalidate(self, product_id=None):
+        """상품이 변경되면 목록 캐시 전체와 해당 상품 상세 캐시를 제거 (product_id 가 없으면 전부 제거)"""
+        with self._lock:
+            self.generation += 1
+            self.stats['invalidations'] += 1
+            self._lists.clear()
+            if product_id is None:
+                self._items.clear()
+            else:
+                self._items.pop(product_id, None)
+
+    def respond(self, request: Request, entry):
+        """If-None-Match 가 ETag 와 같으면 304, 아니면 캐시된 JSON bytes 로 응답"""
+        headers = {'ETag': entry.etag, 'Cache-Control': 'no-cache'}
+        if request.headers.get('if-none-match') == entry.etag:
+            with self._lock:
+                self.stats['not_modified'] += 1
+            return Response(status_code=304, headers=headers)
+        return Response(content=entry.body, media_type='application/json', headers=headers)
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self.stats)
+            stats.update({'lists': len(self._lists), 'items': len(self._items), 'ttl': self.ttl, 'max_entries': self.max_entries})
+        return stats
+
+product_cache = ProductCache()
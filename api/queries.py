@@ -0,0 +1,178 @@
+# 공용 쿼리 (sync 라우트와 async 라우트가 같이 사용)
+# 페이지네이션은 OFFSET 대신 keyset(after_id) 방식 - 마지막으로 받은 id 다음부터 limit 개 조회
+from sqlalchemy import select, insert, update, delete, literal, or_, func, desc, Date
+from model import User, Product, Order, Cart, ProductDailySales
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+# 목록 조회는 ORM 객체 대신 필요한 컬럼만 조회 (.mappings() 로 dict 처럼 사용, pydantic 검증 없이 바로 직렬화)
+def product_list_query(after_id=None, limit=DEFAULT_PAGE_SIZE, min_price=None, max_price=None, name_prefix=None):
+    stmt = select(Product.id, Product.name, Product.price)
+    if after_id is not None:
+        stmt = stmt.where(Product.id > after_id)
+    if min_price is not None:
+        stmt = stmt.where(Product.price >= min_price)
+    if max_price is not None:
+        stmt = stmt.where(Product.price <= max_price)
+    if name_prefix:
+        # % _ 같은 LIKE 특수문자는 이스케이프
+        stmt = stmt.where(Product.name.startswith(name_prefix, autoescape=True))
+    return stmt.order_by(Product.id).limit(limit)
+
+# (user_id, id) 인덱스 순서 그대로 읽으므로 페이지마다 사용자 주문 전체를 정렬하지 않음
+def order_list_query(user_id, after_id=None, limit=DEFAULT_PAGE_SIZE, date_from=None, date_to=None):
+    stmt = select(Order.id, Order.user_id, Order.product_id, Order.quantity, Order.unit_price, Order.created_at, Order.status,
+                  Product.id.label('product_ref'), Product.name.label('product_name'), Product.price.label('product_price')) \
+        .outerjoin(Product, Product.id == Order.product_id) \
+        .where(Order.user_id == user_id)
+    if after_id is not None:
+        stmt = stmt.where(Order.id > after_id)
+    if date_from is not None:
+        stmt = stmt.where(Order.created_at >= date_from)
+    if date_to is not None:
+        stmt = stmt.where(Order.created_at < date_to)
+    return stmt.order_by(Order.id).limit(limit)
+
+def order_rows_to_dicts(rows):
+    """order_list_query 결과를 OrderOut 과 같은 모양의 dict 로 변환"""
+    return [
+        {
+            'id': row.id,
+            'user_id': row.user_id,
+            'product_id': row.product_id,
+            'quantity': row.quantity,
+            'unit_price': row.unit_price,
+            'created_at': row.created_at,
+            'status': row.status,
+            # 상품이 삭제된 주문은 product 가 None
+            'product': {'id': row.product_id, 'name': row.product_name, 'price': row.product_price}
+            if row.product_ref is not None else None,
+        }
+        for row in rows
+    ]
+
+# 장바구니 조회 - (user_id, product_id) unique 인덱스로 해당 사용자 줄만 읽음
+def cart_query(user_id):
+    return select(Cart).where(Cart.user_id == user_id)
+
+# 주문하기 - 장바구니 전체를 INSERT ... SELECT 한번으로 주문테이블에 복사하고 DELETE 한번으로 비움 (지금 상품 가격도 같이 복사)
+def checkout_insert_stmt(user_id, now):
+    rows = select(Cart.user_id, Cart.product_id, Cart.quantity, Product.price, literal(now, Order.created_at.type)) \
+        .outerjoin(Product, Product.id == Cart.product_id) \
+        .where(Cart.user_id == user_id) \
+        .order_by(Cart.id)
+    return insert(Order).from_select(['user_id', 'product_id', 'quantity', 'unit_price', 'created_at'], rows)
+
+def checkout_delete_stmt(user_id):
+    return delete(Cart).where(Cart.user_id == user_id)
+
+# ON CONFLICT 를 지원하는 DB 별 insert (sqlite / postgresql)
+def dialect_insert(dialect_name):
+    if dialect_name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert
+
+# 회원가입 - username / email unique 인덱스에 걸리면 아무것도 하지 않고 id 도 반환하지 않음
+# SELECT 후 INSERT 하는 방식과 달리 한번에 처리되고 동시에 같은 이름으로 가입해도 한명만 성공
+def user_insert_stmt(dialect_name, username, email, password):
+    return dialect_insert(dialect_name)(User) \
+        .values(username=username, email=email, password=password) \
+        .on_conflict_do_nothing() \
+        .returning(User.id)
+
+# 가입이 실패했을때만 어떤 필드가 겹치는지 조회
+def user_conflict_query(username, email):
+    return select(User.username, User.email).where(or_(User.username == username, User.email == email))
+
+# 상품 upsert - name 이 같은 상품이 있으면 가격만 수정 (executemany 용으로 값은 실행할때 전달)
+def product_upsert_stmt(dialect_name):
+    stmt = dialect_insert(dialect_name)(Product)
+    return stmt.on_conflict_do_update(index_elements=[Product.name], set_={'price': stmt.excluded.price})
+
+# 장바구니 담기 - 같은 상품이 이미 있으면 새 줄을 만들지 않고 수량만 더함 ((user_id, product_id) unique 인덱스)
+# 한 요청에 같은 상품이 여러번 있으면 먼저 합쳐서 한 줄로 만듦 (같은 행을 한 문장에서 두번 수정할 수 없음)
+def merge_cart_lines(lines):
+    """lines : product_id / quantity 속성이 있는 객체 목록 -> {product_id: quantity} (요청 순서 유지)"""
+    merged = {}
+    for line in lines:
+        merged[line.product_id] = merged.get(line.product_id, 0) + line.quantity
+    return merged
+
+def cart_upsert_stmt(dialect_name, user_id, merged_lines):
+    stmt = dialect_insert(dialect_name)(Cart).values([
+        {'user_id': user_id, 'product_id': product_id, 'quantity': quantity}
+        for product_id, quantity in merged_lines.items()
+    ])
+    return stmt.on_conflict_do_update(
+        index_elements=[Cart.user_id, Cart.product_id],
+        set_={'quantity': Cart.quantity + stmt.excluded.quantity},
+    ).returning(Cart.id, Cart.product_id)
+
+# 판매 집계 - (day, product_id) 행이 있으면 건수 / 수량 / 매출을 더함
+SALES_COLUMNS = ('order_count', 'units', 'revenue')
+
+def _sales_on_conflict(stmt):
+    return stmt.on_conflict_do_update(
+        index_elements=[ProductDailySales.day, ProductDailySales.product_id],
+        set_={name: getattr(ProductDailySales, name) + getattr(stmt.excluded, name) for name in SALES_COLUMNS},
+    )
+
+def sales_upsert_select_stmt(dialect_name, rows):
+    """rows : (day, product_id, order_count, units, revenue) 를 조회하는 select"""
+    return _sales_on_conflict(dialect_insert(dialect_name)(ProductDailySales).from_select(['day', 'product_id', *SALES_COLUMNS], rows))
+
+def sales_adjust_stmt(dialect_name, day, product_id, order_count, units, revenue):
+    return _sales_on_conflict(dialect_insert(dialect_name)(ProductDailySales).values(
+        day=day, product_id=product_id, order_count=order_count, units=units, revenue=revenue))
+
+# 주문하기 - 주문으로 옮기기 전의 장바구니를 상품별로 합쳐서 집계에 반영 (checkout_insert_stmt 와 같은 트랜잭션, 같은 가격)
+def sales_from_cart_select(user_id, day):
+    return select(literal(day, Date()), Cart.product_id, func.count(Cart.id), func.sum(Cart.quantity),
+                  func.sum(Cart.quantity * func.coalesce(Product.price, 0))) \
+        .outerjoin(Product, Product.id == Cart.product_id) \
+        .where(Cart.user_id == user_id) \
+        .group_by(Cart.product_id)
+
+# 백필 - 주문 id 범위 (after_id, upto_id] 를 날짜 / 상품별로 합침 (매출은 주문 시점 가격 기준)
+def sales_from_orders_select(after_id, upto_id):
+    day = func.date(Order.created_at)
+    return select(day, Order.product_id, func.count(Order.id), func.sum(Order.quantity),
+                  func.sum(Order.quantity * func.coalesce(Order.unit_price, 0))) \
+        .where(Order.id > after_id, Order.id <= upto_id, Order.status != 'cancelled', Order.created_at.isnot(None)) \
+        .group_by(day, Order.product_id)
+
+# 주문 상태 변경 - 읽었던 상태가 그대로일때만 변경 (다른 요청이 먼저 바꿨으면 rowcount 0)
+def order_status_update_stmt(order_id, old_status, new_status):
+    return update(Order).where(Order.id == order_id, Order.status == old_status).values(status=new_status)
+
+def sales_status_delta(old_status, new_status):
+    """취소되면 집계에서 빼고(-1) 취소가 풀리면 다시 더함(+1)"""
+    if old_status != 'cancelled' and new_status == 'cancelled':
+        return -1
+    if old_status == 'cancelled' and new_status != 'cancelled':
+        return 1
+    return 0
+
+# 기간 내 상품별 합계 상위 N 개 (date_from ~ date_to, 양쪽 포함)
+def sales_top_query(date_from, date_to, limit=10, order_by='units'):
+    totals = select(ProductDailySales.product_id,
+                    *(func.sum(getattr(ProductDailySales, name)).label(name) for name in SALES_COLUMNS)) \
+        .where(ProductDailySales.day >= date_from, ProductDailySales.day <= date_to) \
+        .group_by(ProductDailySales.product_id) \
+        .order_by(desc(order_by)) \
+        .limit(limit) \
+        .subquery()
+    return select(totals.c.product_id, Product.name, *(totals.c[name] for name in SALES_COLUMNS)) \
+        .outerjoin(Product, Product.id == totals.c.product_id) \
+        .order_by(desc(totals.c[order_by]), totals.c.product_id)
+
+# 기간 내 일별 합계 (product_id 를 주면 해당 상품만)
+def sales_daily_query(date_from, date_to, product_id=None):
+    stmt = select(ProductDailySales.day, *(func.sum(getattr(ProductDailySales, name)).label(name) for name in SALES_COLUMNS)) \
+        .where(ProductDailySales.day >= date_from, ProductDailySales.day <= date_to)
+    if product_id is not None:
+        stmt = stmt.where(ProductDailySales.product_id == product_id)
+    return stmt.group_by(ProductDailySales.day).order_by(ProductDailySales.day)
@@ -0,0 +1,68 @@
+# 판매 집계(product_daily_sales) 백필 / 검증
+# 주문하기 / 주문 상태 변경 API 가 집계를 같이 갱신하고, 기존 DB 는 마이그레이션(6)이 한번 백필하므로
+# 평소에는 실행할 필요 없음. --verify 에서 어긋난 것이 보이면 실행.
+# 매출은 주문에 저장된 주문 시점 가격(orders.unit_price) 기준이라 상품 가격이 바뀌어도 다시 계산할 필요 없음.
+# 실행 : python sales.py --backfill [--chunk 10000]   (집계를 지우고 orders 에서 chunk 단위로 다시 만듦)
+#        python sales.py --verify                     (집계 합계와 orders 직접 집계가 같은지 확인)
+# 백필 도중에는 리포트가 일부만 보이고, 아직 처리하지 않은 주문의 상태가 바뀌면 집계가 어긋날 수 있으므로
+# 쓰기가 적을때 실행하고 --verify 로 확인한다.
+import argparse
+import os
+import sys
+import time
+from sqlalchemy import select, delete, func
+from model import Order, ProductDailySales
+from queries import sales_upsert_select_stmt, sales_from_orders_select
+
+BACKFILL_CHUNK_SIZE = int(os.getenv('SALES_BACKFILL_CHUNK_SIZE', '10000'))
+
+def backfill(engine, chunk_size=BACKFILL_CHUNK_SIZE, progress=None):
+    """집계를 비우고 orders 를 id 범위 chunk 단위로 (chunk 하나 = 트랜잭션 하나) 다시 집계. 처리한 마지막 주문 id 를 반환"""
+    with engine.begin() as conn:
+        conn.execute(delete(ProductDailySales))
+        # 이후에 들어오는 주문은 place_order 가 직접 집계하므로 지금 있는 주문까지만 처리
+        upto_id = conn.execute(select(func.max(Order.id))).scalar() or 0
+    after_id = 0
+    while after_id < upto_id:
+        end_id = min(after_id + chunk_size, upto_id)
+        with engine.begin() as conn:
+            conn.execute(sales_upsert_select_stmt(engine.dialect.name, sales_from_orders_select(after_id, end_id)))
+        after_id = end_id
+        if progress is not None:
+            progress(after_id, upto_id)
+    return upto_id
+
+def verify(engine):
+    """집계 테이블 합계와 orders 를 직접 집계한 합계를 비교 -> (같은지, 집계값, orders 값)"""
+    with engine.connect() as conn:
+        aggregated = tuple(conn.execute(select(
+            func.coalesce(func.sum(ProductDailySales.order_count), 0),
+            func.coalesce(func.sum(ProductDailySales.units), 0),
+            func.coalesce(func.sum(ProductDailySales.revenue), 0),
+        )).one())
+        scanned = tuple(conn.execute(
+            select(
+                func.count(Order.id),
+                func.coalesce(func.sum(Order.quantity), 0),
+                func.coalesce(func.sum(Order.quantity * func.coalesce(Order.unit_price, 0)), 0),
+            )
+            .where(Order.status != 'cancelled', Order.created_at.isnot(None))
+        ).one())
+    return aggregated == scanned, aggregated, scanned
+
+if __name__ == '__main__':
+    from database import writer_engin, Base
+    Base.metadata.create_all(bind=writer_engin)
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--backfill', action='store_true')
+    parser.add_argument('--verify', action='store_true')
+    parser.add_argument('--chunk', type=int, default=BACKFILL_CHUNK_SIZE)
+    args = parser.parse_args()
+    if args.backfill:
+        started = time.perf_counter()
+        last_id = backfill(writer_engin, args.chunk, lambda done, total: print(f'backfilled orders up to id {done}/{total}'))
+        print(f'backfill done: {last_id} orders in {time.perf_counter() - started:.1f}s')
+    if args.verify or not args.backfill:
+        ok, aggregated, scanned = verify(writer_engin)
+        print(f"{'OK' if ok else 'MISMATCH'} (order_count, units, revenue) aggregated={aggregated} orders={scanned}")
+        sys.exit(0 if ok else 1)
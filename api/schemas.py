@@ -1,6 +1,7 @@
 # 요청 / 응답 모델(데이터 타입) 정의
-from pydantic import BaseModel
-from datetime import datetime
+from pydantic import BaseModel, Field
+from datetime import date, datetime
+from typing import List, Optional
 
 # 회원가입용 데이터타입  pydantic 
 class RegisterRequest(BaseModel):
@@ -34,20 +35,63 @@ class ProductOut(BaseModel):
 class CartItem(BaseModel):
     user_id: int
     product_id: int
-    quantity: int
+    quantity: int = Field(..., ge=1)  # 담을때 기존 수량에 더하므로 0 이하는 허용하지 않음
+
+# 여러 상품을 한번에 담기 {"user_id": 1, "items": [{"product_id": 3, "quantity": 2}, ...]}
+MAX_CART_BATCH = 100
+
+class CartLine(BaseModel):
+    product_id: int
+    quantity: int = Field(1, ge=1)
+
+class CartBatch(BaseModel):
+    user_id: int
+    items: List[CartLine] = Field(..., min_length=1, max_length=MAX_CART_BATCH)
 
 class CartItemOut(BaseModel):
     quantity: int
 
+# 장바구니 한 줄 (상품정보 포함)
+class CartLineOut(BaseModel):
+    id: int
+    product_id: int
+    name: str
+    price: int
+    quantity: int
+    line_total: int
+
+# 장바구니 전체 (상품정보 + 합계)
+class CartDetailOut(BaseModel):
+    items: List[CartLineOut]
+    subtotal: int
+
 class OrderRequest(BaseModel):    
     user_id: int
+    # 같은 키로 다시 요청하면 새로 주문하지 않고 처음 결과를 돌려줌 (중복 주문 방지)
+    idempotency_key: Optional[str] = None
 
 class OrderOut(BaseModel):
     id: int
     user_id: int    
     product_id: int
     quantity: int
+    unit_price: Optional[int] = None    # 주문 시점 가격 (상품 가격이 바뀌어도 그대로)
     created_at: datetime
-    product: ProductOut
+    status: str
+    product: Optional[ProductOut] = None    # 상품이 삭제된 주문은 None
     class Config:   # 객체로 리턴할때
-        from_attributes = True    
\ No newline at end of file
+        from_attributes = True    
+
+# 판매 리포트
+class SalesTotalOut(BaseModel):
+    product_id: int
+    name: Optional[str]
+    order_count: int
+    units: int
+    revenue: int
+
+class SalesDayOut(BaseModel):
+    day: date
+    order_count: int
+    units: int
+    revenue: int
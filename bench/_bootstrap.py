@@ -0,0 +1,14 @@
+# 벤치마크 공용 준비 - api 모듈을 직접 import 하는 스크립트에서 가장 먼저 import 한다
+# api 모듈은 import 시점에 DATABASE_URL 을 읽으므로 임시 DB 를 먼저 지정하고 api 경로를 추가, 로그는 끔
+import logging
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+API_DIR = os.path.join(ROOT, 'api')
+TMP_DIR = tempfile.mkdtemp()
+
+os.environ.setdefault('DATABASE_URL', f'sqlite:///{os.path.join(TMP_DIR, "bench.db")}')
+sys.path.insert(0, API_DIR)
+logging.disable(logging.CRITICAL)
@@ -0,0 +1,121 @@
+# 과부하 상황에서 요청 수락 제어(admission) 유무 비교
+# 많은 클라이언트가 동시에 장바구니 담기 / 주문하기(SQLite 쓰기)를 반복 -> 수락된 요청의 p50 / p99, 거절(429/503) / timeout 수
+# 사용법 : python bench/bench_admission.py --concurrency 300 --duration 15
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from bench_async import start_server
+
+
+def percentile(values, q):
+    return values[min(len(values) - 1, int(q * len(values)))] * 1000 if values else 0.0
+
+
+class Connection:
+    """keep-alive HTTP/1.1 연결 하나 (httpx 는 클라이언트 CPU 를 많이 써서 서버와 같은 머신에서 측정이 왜곡됨)"""
+    def __init__(self, host, port):
+        self.host, self.port = host, port
+        self.reader = self.writer = None
+
+    async def request(self, method, path, body):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        data = json.dumps(body).encode()
+        self.writer.write(f'{method} {path} HTTP/1.1\r\nHost: {self.host}\r\nContent-Type: application/json\r\n'
+                          f'Content-Length: {len(data)}\r\n\r\n'.encode() + data)
+        head = await self.reader.readuntil(b'\r\n\r\n')
+        lines = head.decode('latin-1').split('\r\n')
+        headers = dict(line.lower().split(': ', 1) for line in lines[1:] if ': ' in line)
+        await self.reader.readexactly(int(headers.get('content-length', 0)))
+        return int(lines[0].split()[1]), headers
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+
+async def run_load(host, port, concurrency, duration, products, timeout):
+    accepted, shed, timeouts, errors = [], [], 0, 0
+    deadline = time.perf_counter() + duration
+
+    async def client_loop(user_id):
+        nonlocal timeouts, errors
+        conn = Connection(host, port)
+        n = 0
+        while time.perf_counter() < deadline:
+            n += 1
+            if n % 3 == 0:
+                method, path, body = 'POST', '/api/order', {'user_id': user_id}
+            else:
+                method, path, body = 'POST', '/api/cart', {'user_id': user_id, 'items': [{'product_id': n % products + 1, 'quantity': 1}]}
+            started = time.perf_counter()
+            try:
+                status, headers = await asyncio.wait_for(conn.request(method, path, body), timeout)
+            except asyncio.TimeoutError:
+                timeouts += 1
+                conn.close()
+                continue
+            except (OSError, asyncio.IncompleteReadError):
+                errors += 1
+                conn.close()
+                continue
+            elapsed = time.perf_counter() - started
+            if status in (429, 503):
+                shed.append(elapsed)
+                # Retry-After 만큼 기다렸다가 다시 요청 (잘 동작하는 클라이언트)
+                await asyncio.sleep(min(float(headers.get('retry-after', 1)), max(0, deadline - time.perf_counter())))
+            elif status >= 500:
+                errors += 1
+            else:
+                accepted.append(elapsed)
+        conn.close()
+
+    await asyncio.gather(*(client_loop(10000 + i) for i in range(concurrency)))
+    accepted.sort()
+    shed.sort()
+    return accepted, shed, timeouts, errors
+
+
+def run(args, enabled, port):
+    db_path = os.path.join(tempfile.mkdtemp(), 'bench.db')
+    proc, base_url = start_server('sync', db_path, port, ADMISSION_ENABLED='1' if enabled else '0')
+    try:
+        with httpx.Client(base_url=base_url) as client:
+            for i in range(args.products):
+                client.post('/api/products', json={'name': f'bench-product-{i}', 'price': 1000 + i})
+        accepted, shed, timeouts, errors = asyncio.run(
+            run_load('127.0.0.1', port, args.concurrency, args.duration, args.products, args.timeout))
+    finally:
+        proc.terminate()
+        proc.wait()
+    label = 'admission' if enabled else 'no limit'
+    print(f'{label:10s} {len(accepted) / args.duration:9.1f} {percentile(accepted, 0.5):8.1f} {percentile(accepted, 0.99):8.1f} '
+          f'{len(shed):7d} {percentile(shed, 0.99):11.1f} {timeouts:9d} {errors:7d}')
+
+
+def main_():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--concurrency', type=int, default=300)
+    parser.add_argument('--duration', type=float, default=15)
+    parser.add_argument('--products', type=int, default=50)
+    parser.add_argument('--timeout', type=float, default=10, help='클라이언트 timeout(초)')
+    parser.add_argument('--port', type=int, default=8104)
+    args = parser.parse_args()
+
+    print(f'concurrency={args.concurrency} duration={args.duration}s client timeout={args.timeout}s')
+    print(f'{"mode":10s} {"ok req/s":>9s} {"p50 ms":>8s} {"p99 ms":>8s} {"shed":>7s} {"shed p99 ms":>11s} {"timeouts":>9s} {"errors":>7s}')
+    run(args, enabled=False, port=args.port)
+    run(args, enabled=True, port=args.port + 1)
+
+
+if __name__ == '__main__':
+    main_()
@@ -0,0 +1,98 @@
+# sync / async DB 모드 처리량(requests/sec) 비교 벤치마크
+# 사용법 : python bench/bench_async.py --concurrency 50 100 200 500 --duration 10
+# 필요 패키지 : pip install uvicorn httpx "sqlalchemy[asyncio]" aiosqlite
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+API_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'api')
+
+
+def start_server(mode, db_path, port, **extra_env):
+    # api 디렉토리에서 uvicorn 실행 (main.py 가 상대 import 를 사용)
+    env = dict(os.environ, DB_ASYNC='1' if mode == 'async' else '0', DATABASE_URL=f'sqlite:///{db_path}', **extra_env)
+    proc = subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'main:app', '--port', str(port), '--log-level', 'warning'],
+        cwd=API_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    base_url = f'http://127.0.0.1:{port}'
+    for _ in range(100):  # 서버가 뜰때까지 대기
+        try:
+            httpx.get(f'{base_url}/api/products', timeout=1)
+            return proc, base_url
+        except httpx.HTTPError:
+            time.sleep(0.1)
+    proc.kill()
+    raise RuntimeError(f'{mode} 서버 시작 실패')
+
+
+def seed(base_url, products):
+    with httpx.Client(base_url=base_url) as client:
+        for i in range(products):
+            client.post('/api/products', json={'name': f'bench-product-{i}', 'price': 1000 + i})
+        client.post('/api/cart', json={'user_id': 1, 'product_id': 1, 'quantity': 1})
+
+
+async def run_load(base_url, concurrency, duration):
+    # concurrency 만큼의 클라이언트가 duration 초 동안 상품목록 / 장바구니를 반복 조회
+    done = 0
+    errors = 0
+    deadline = time.perf_counter() + duration
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        async def worker(n):
+            nonlocal done, errors
+            path = '/api/products' if n % 2 == 0 else '/api/cart/detail?user_id=1'
+            while time.perf_counter() < deadline:
+                try:
+                    response = await client.get(path)
+                    if response.status_code == 200:
+                        done += 1
+                    else:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(n) for n in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    return done / elapsed, errors
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[50, 100, 200, 500])
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--products', type=int, default=100)
+    parser.add_argument('--port', type=int, default=8100)
+    args = parser.parse_args()
+
+    results = {}
+    for mode in ('sync', 'async'):
+        with tempfile.TemporaryDirectory() as tmp:
+            proc, base_url = start_server(mode, os.path.join(tmp, 'bench.db'), args.port)
+            try:
+                seed(base_url, args.products)
+                for concurrency in args.concurrency:
+                    rps, errors = asyncio.run(run_load(base_url, concurrency, args.duration))
+                    results[(mode, concurrency)] = rps
+                    print(f'{mode:5s}  clients={concurrency:4d}  {rps:9.1f} req/s  errors={errors}')
+            finally:
+                proc.terminate()
+                proc.wait()
+
+    print()
+    print('clients    sync req/s   async req/s   ratio')
+    for concurrency in args.concurrency:
+        sync_rps = results[('sync', concurrency)]
+        async_rps = results[('async', concurrency)]
+        print(f'{concurrency:7d}  {sync_rps:11.1f}  {async_rps:12.1f}  {async_rps / sync_rps:6.2f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+# 상품 대량 등록(POST /api/products/bulk) 벤치마크 - 한건씩 등록(POST /api/products)과 비교
+# 사용법 : python bench/bench_bulk_import.py --rows 100000 --single-rows 1000
+import argparse
+import json
+import time
+
+import _bootstrap  # 임시 DB / api 경로 설정 (api 모듈보다 먼저)
+
+from fastapi.testclient import TestClient
+import main
+
+
+def ndjson_body(rows, prefix, batch=1000):
+    # 요청 body 를 한번에 만들지 않고 조금씩 보내는 스트리밍 body
+    for start in range(0, rows, batch):
+        yield ''.join(
+            json.dumps({'name': f'{prefix}-{i}', 'price': 1000 + i}) + '\n'
+            for i in range(start, min(start + batch, rows))
+        ).encode('utf-8')
+
+
+def main_():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--single-rows', type=int, default=1000)
+    args = parser.parse_args()
+
+    client = TestClient(main.app)
+
+    started = time.perf_counter()
+    for i in range(args.single_rows):
+        client.post('/api/products', json={'name': f'single-{i}', 'price': 1000 + i})
+    single = time.perf_counter() - started
+    single_rate = args.single_rows / single
+    print(f'single POST      : {args.single_rows:7d} rows  {single:7.2f} s  {single_rate:9.0f} rows/s'
+          f'  (estimated {args.rows / single_rate:.0f} s for {args.rows} rows)')
+
+    for label, prefix in (('bulk insert', 'bulk'), ('bulk update', 'bulk')):
+        started = time.perf_counter()
+        response = client.post('/api/products/bulk', content=ndjson_body(args.rows, prefix),
+                               headers={'content-type': 'application/x-ndjson'})
+        elapsed = time.perf_counter() - started
+        result = response.json()
+        print(f'{label:17s}: {result["upserted"]:7d} rows  {elapsed:7.2f} s  {result["upserted"] / elapsed:9.0f} rows/s'
+              f'  errors={result["error_count"]}')
+
+
+if __name__ == '__main__':
+    main_()
@@ -0,0 +1,111 @@
+# 주문하기(place_order) 지연시간 벤치마크 + 동시 주문시 중복 주문이 생기지 않는지 확인
+# 사용법 : python bench/bench_checkout.py --lines 1 50 500 --repeat 20 --threads 20
+import argparse
+import statistics
+import sys
+import threading
+import time
+
+import _bootstrap  # 임시 DB / api 경로 설정 (api 모듈보다 먼저)
+
+from fastapi import HTTPException
+import main
+from database import SessionLocal
+from model import Cart, Order, Product
+from schemas import OrderRequest
+
+
+def setup(products):
+    db = SessionLocal()
+    if not db.query(Product).count():
+        db.add_all(Product(name=f'bench-product-{i}', price=1000 + i) for i in range(products))
+        db.commit()
+    db.close()
+
+
+def fill_cart(user_id, lines):
+    db = SessionLocal()
+    db.add_all(Cart(user_id=user_id, product_id=i % 500 + 1, quantity=1) for i in range(lines))
+    db.commit()
+    db.close()
+
+
+def legacy_checkout(user_id):
+    # 변경 전 방식 : 장바구니를 ORM 객체로 읽고 한 줄씩 add / delete
+    db = SessionLocal()
+    try:
+        for item in db.query(Cart).filter(Cart.user_id == user_id).all():
+            db.add(Order(user_id=item.user_id, product_id=item.product_id, quantity=item.quantity))
+            db.delete(item)
+        db.commit()
+    finally:
+        db.close()
+
+
+def set_based_checkout(user_id, key=None):
+    db = SessionLocal()
+    try:
+        return main.place_order(OrderRequest(user_id=user_id, idempotency_key=key), None, db)
+    finally:
+        db.close()
+
+
+def measure(checkout, lines, repeat, user_id):
+    timings = []
+    for _ in range(repeat):
+        fill_cart(user_id, lines)
+        started = time.perf_counter()
+        checkout(user_id)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings), max(timings)
+
+
+def check_no_double_orders(threads, lines, user_id):
+    # 같은 사용자의 주문을 여러 쓰레드에서 동시에 요청 -> 주문은 장바구니 줄 수 만큼만 생겨야 함
+    fill_cart(user_id, lines)
+    barrier = threading.Barrier(threads)
+    results = []
+
+    def worker(n):
+        barrier.wait()
+        try:
+            # 절반은 같은 idempotency key, 절반은 키 없이 요청
+            results.append(set_based_checkout(user_id, 'same-key' if n % 2 else None))
+        except HTTPException as e:
+            results.append(e.status_code)
+
+    workers = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+
+    db = SessionLocal()
+    ordered = db.query(Order).filter(Order.user_id == user_id).count()
+    left = db.query(Cart).filter(Cart.user_id == user_id).count()
+    db.close()
+    ok = ordered == lines and left == 0
+    print(f'concurrent checkout x{threads}: orders={ordered} (expected {lines}) cart_left={left} -> {"OK" if ok else "DUPLICATED"}')
+    return ok
+
+
+def main_():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--lines', type=int, nargs='+', default=[1, 50, 500])
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--threads', type=int, default=20)
+    args = parser.parse_args()
+
+    setup(500)
+    print('lines    legacy p50 ms   set-based p50 ms   (max legacy / set-based)')
+    for n, lines in enumerate(args.lines):
+        legacy_p50, legacy_max = measure(legacy_checkout, lines, args.repeat, user_id=1000 + n)
+        new_p50, new_max = measure(set_based_checkout, lines, args.repeat, user_id=2000 + n)
+        print(f'{lines:5d}  {legacy_p50:13.2f}  {new_p50:17.2f}     ({legacy_max:.2f} / {new_max:.2f})')
+    print()
+    ok = check_no_double_orders(args.threads, 50, user_id=3000)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main_()
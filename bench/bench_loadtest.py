@@ -0,0 +1,276 @@
+# 쇼핑몰 시나리오 부하 테스트
+# 시나리오(가상 사용자 1명) : 회원가입 -> 로그인 -> 상품목록 -> 장바구니 담기 -> 주문 -> 주문목록
+#
+# 사용법
+#   python bench/bench_loadtest.py seed --users 1000 --products 5000 --cart-lines 2000 --orders 20000
+#   python bench/bench_loadtest.py run --vus 50 --duration 30 --out results.json             (in-process, ASGI transport)
+#   python bench/bench_loadtest.py run --uvicorn --vus 50 --duration 30 --out results.json   (uvicorn 실행 후 HTTP)
+#   python bench/bench_loadtest.py run --url http://localhost:8000 ...                       (이미 떠있는 서버)
+#   python bench/bench_loadtest.py run ... --compare baseline.json                           (이전 결과와 비교)
+#
+# --db 를 주지 않으면 api 와 같은 DATABASE_URL (기본 sqlite:///./database.db, api 디렉토리 기준) 사용
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+API_DIR = os.path.join(ROOT, 'api')
+
+
+def use_database(db_path):
+    """api 모듈 import 전에 DB 위치를 지정 (api 는 import 시점에 DATABASE_URL 을 읽음)"""
+    if db_path:
+        os.environ['DATABASE_URL'] = f'sqlite:///{os.path.abspath(db_path)}'
+    else:
+        os.environ.setdefault('DATABASE_URL', f'sqlite:///{os.path.join(API_DIR, "database.db")}')
+    sys.path.insert(0, API_DIR)
+
+
+def seed(args):
+    use_database(args.db)
+    import logging
+    logging.disable(logging.CRITICAL)
+    from sqlalchemy import insert, func, select
+    import main  # 테이블 생성 + 마이그레이션
+    from database import writer_engin
+    from model import User, Product, Cart, Order
+    from sales import backfill
+
+    rng = random.Random(args.seed)
+    now = datetime.utcnow()
+    batch = uuid.uuid4().hex[:8]  # 여러번 seed 해도 이름이 겹치지 않도록
+    started = time.perf_counter()
+    with writer_engin.begin() as conn:
+        first_user = (conn.execute(select(func.max(User.id))).scalar() or 0) + 1
+        first_product = (conn.execute(select(func.max(Product.id))).scalar() or 0) + 1
+        conn.execute(insert(User), [
+            {'username': f'seed-{batch}-{i}', 'email': f'seed-{batch}-{i}@example.com', 'password': 'pw'}
+            for i in range(args.users)
+        ])
+        prices = [rng.randint(1, 500) * 100 for _ in range(args.products)]
+        conn.execute(insert(Product), [
+            {'name': f'seed-{batch}-product-{i}', 'price': price}
+            for i, price in enumerate(prices)
+        ])
+        user_ids = range(first_user, first_user + args.users)
+        product_ids = range(first_product, first_product + args.products)
+        # 장바구니는 (user_id, product_id) 당 한 줄
+        cart_lines = set()
+        while len(cart_lines) < min(args.cart_lines, args.users * args.products):
+            cart_lines.add((rng.choice(user_ids), rng.choice(product_ids)))
+        conn.execute(insert(Cart), [
+            {'user_id': user_id, 'product_id': product_id, 'quantity': rng.randint(1, 3)}
+            for user_id, product_id in cart_lines
+        ])
+        # 주문하기 API 처럼 주문 시점 가격(unit_price) 을 같이 저장
+        orders = []
+        for _ in range(args.orders):
+            product_id = rng.choice(product_ids)
+            orders.append({'user_id': rng.choice(user_ids), 'product_id': product_id, 'quantity': rng.randint(1, 3),
+                           'unit_price': prices[product_id - first_product],
+                           'created_at': now - timedelta(minutes=rng.randint(0, 60 * 24 * 90))})
+        conn.execute(insert(Order), orders)
+    # 직접 넣은 주문은 판매 집계(product_daily_sales) 에 들어가지 않으므로 다시 집계 (sales.py --verify 가 맞도록)
+    backfill(writer_engin)
+    print(f'seeded users={args.users} products={args.products} cart_lines={args.cart_lines} '
+          f'orders={args.orders} in {time.perf_counter() - started:.1f}s ({os.environ["DATABASE_URL"]})')
+
+
+class Recorder:
+    def __init__(self):
+        self.samples = {}  # endpoint -> [지연시간(초)]
+        self.errors = {}
+        self.shed = {}     # admission 에서 거절된 요청 (429 / 503) 수
+
+    def add(self, name, elapsed, status):
+        self.samples.setdefault(name, []).append(elapsed)
+        if status in (429, 503):
+            self.shed[name] = self.shed.get(name, 0) + 1
+        elif status is None or status >= 400:
+            self.errors[name] = self.errors.get(name, 0) + 1
+
+    def report(self, elapsed):
+        result = {}
+        for name, values in sorted(self.samples.items()):
+            values.sort()
+            pick = lambda q: values[min(len(values) - 1, int(q * len(values)))] * 1000
+            result[name] = {
+                'count': len(values),
+                'errors': self.errors.get(name, 0),
+                'shed': self.shed.get(name, 0),
+                'rps': len(values) / elapsed,
+                'p50_ms': pick(0.50),
+                'p95_ms': pick(0.95),
+                'p99_ms': pick(0.99),
+            }
+        return result
+
+
+async def call(client, recorder, name, method, url, **kwargs):
+    started = time.perf_counter()
+    try:
+        response = await client.request(method, url, **kwargs)
+    except Exception:
+        response = None
+    recorder.add(name, time.perf_counter() - started, response.status_code if response is not None else None)
+    return response
+
+
+async def virtual_user(client, recorder, deadline, rng, think_time):
+    # 회원가입 / 로그인은 가상 사용자당 한번, 나머지는 시간이 끝날때까지 반복
+    name = f'vu-{uuid.uuid4().hex[:12]}'
+    await call(client, recorder, 'POST /api/register', 'POST', '/api/register',
+               json={'username': name, 'email': f'{name}@example.com', 'password': 'pw'})
+    response = await call(client, recorder, 'POST /api/login', 'POST', '/api/login',
+                          json={'username': name, 'password': 'pw'})
+    if response is None or response.status_code != 200:
+        return
+    user_id = response.json()['user_id']
+
+    while time.perf_counter() < deadline:
+        response = await call(client, recorder, 'GET /api/products', 'GET', '/api/products',
+                              params={'limit': 50, 'after_id': rng.randint(0, 1000)})
+        products = response.json() if response is not None and response.status_code == 200 else []
+        if not products:
+            response = await call(client, recorder, 'GET /api/products', 'GET', '/api/products', params={'limit': 50})
+            products = response.json() if response is not None and response.status_code == 200 else []
+        if products:
+            # 상품 페이지처럼 여러 상품을 한번에 담기
+            items = [{'product_id': product['id'], 'quantity': rng.randint(1, 3)}
+                     for product in rng.sample(products, min(len(products), rng.randint(1, 3)))]
+            await call(client, recorder, 'POST /api/cart', 'POST', '/api/cart', json={'user_id': user_id, 'items': items})
+        await call(client, recorder, 'GET /api/cart/detail', 'GET', '/api/cart/detail', params={'user_id': user_id})
+        await call(client, recorder, 'POST /api/order', 'POST', '/api/order',
+                   json={'user_id': user_id, 'idempotency_key': uuid.uuid4().hex})
+        await call(client, recorder, 'GET /api/order', 'GET', '/api/order', params={'user_id': user_id, 'limit': 50})
+        if think_time:
+            await asyncio.sleep(rng.uniform(0, think_time))
+
+
+async def run_load(args, client):
+    recorder = Recorder()
+    rng = random.Random(args.seed)
+    started = time.perf_counter()
+    deadline = started + args.duration
+    await asyncio.gather(*(
+        virtual_user(client, recorder, deadline, random.Random(rng.random()), args.think_time)
+        for _ in range(args.vus)
+    ))
+    return recorder.report(time.perf_counter() - started)
+
+
+def run(args):
+    import httpx
+    use_database(args.db)
+    proc = None
+    if args.uvicorn:
+        # 실제 uvicorn 서버를 띄워서 HTTP 로 테스트
+        sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+        from bench_async import start_server
+        db_path = os.environ['DATABASE_URL'].replace('sqlite:///', '', 1)
+        proc, base_url = start_server('async' if os.getenv('DB_ASYNC') == '1' else 'sync', db_path, args.port)
+        transport, label = None, f'uvicorn {base_url}'
+    elif args.url:
+        base_url, transport, label = args.url, None, args.url
+    else:
+        # 같은 프로세스에서 ASGI 로 직접 호출 (네트워크 / 서버 오버헤드 없이 앱만 측정)
+        import logging
+        logging.disable(logging.CRITICAL)
+        import main
+        base_url, transport, label = 'http://loadtest', httpx.ASGITransport(app=main.app), 'in-process ASGI'
+
+    async def go():
+        limits = httpx.Limits(max_connections=args.vus, max_keepalive_connections=args.vus)
+        async with httpx.AsyncClient(base_url=base_url, transport=transport, limits=limits, timeout=30) as client:
+            return await run_load(args, client)
+
+    try:
+        endpoints = asyncio.run(go())
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait()
+
+    total = sum(stat['count'] for stat in endpoints.values())
+    result = {
+        'timestamp': datetime.utcnow().isoformat(),
+        'target': label,
+        'vus': args.vus,
+        'duration': args.duration,
+        'total_requests': total,
+        'total_rps': total / args.duration,
+        'endpoints': endpoints,
+    }
+    print(f'target={label} vus={args.vus} duration={args.duration}s total={total} ({result["total_rps"]:.1f} req/s)')
+    print(f'{"endpoint":24s} {"count":>7s} {"err":>5s} {"shed":>5s} {"rps":>8s} {"p50 ms":>8s} {"p95 ms":>8s} {"p99 ms":>8s}')
+    for name, stat in endpoints.items():
+        print(f'{name:24s} {stat["count"]:7d} {stat["errors"]:5d} {stat["shed"]:5d} {stat["rps"]:8.1f} '
+              f'{stat["p50_ms"]:8.1f} {stat["p95_ms"]:8.1f} {stat["p99_ms"]:8.1f}')
+
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2)
+        print(f'saved {args.out}')
+    if args.compare:
+        return compare(args.compare, result, args.tolerance)
+    return 0
+
+
+def compare(baseline_path, result, tolerance):
+    """이전 결과 대비 p95 가 tolerance 이상 느려졌거나 처리량이 줄어든 엔드포인트를 표시"""
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = json.load(f)
+    regressions = 0
+    print(f'\ncompare with {baseline_path} (tolerance {tolerance:.0%})')
+    for name, stat in result['endpoints'].items():
+        old = baseline['endpoints'].get(name)
+        if not old:
+            continue
+        p95_change = stat['p95_ms'] / old['p95_ms'] - 1 if old['p95_ms'] else 0
+        rps_change = stat['rps'] / old['rps'] - 1 if old['rps'] else 0
+        regressed = p95_change > tolerance or rps_change < -tolerance
+        regressions += regressed
+        print(f'{"REGRESSED" if regressed else "ok":9s} {name:24s} p95 {p95_change:+7.1%}  rps {rps_change:+7.1%}')
+    return 1 if regressions else 0
+
+
+def main_():
+    parser = argparse.ArgumentParser()
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    seed_parser = sub.add_parser('seed', help='테스트 데이터 생성')
+    seed_parser.add_argument('--users', type=int, default=1000)
+    seed_parser.add_argument('--products', type=int, default=5000)
+    seed_parser.add_argument('--cart-lines', type=int, default=2000)
+    seed_parser.add_argument('--orders', type=int, default=20000)
+
+    run_parser = sub.add_parser('run', help='시나리오 부하 테스트')
+    run_parser.add_argument('--vus', type=int, default=20, help='동시 가상 사용자 수')
+    run_parser.add_argument('--duration', type=float, default=30)
+    run_parser.add_argument('--think-time', type=float, default=0, help='반복 사이 최대 대기(초)')
+    run_parser.add_argument('--uvicorn', action='store_true', help='uvicorn 을 띄워서 HTTP 로 테스트')
+    run_parser.add_argument('--url', help='이미 실행중인 API 서버 주소')
+    run_parser.add_argument('--port', type=int, default=8102)
+    run_parser.add_argument('--out', help='결과 JSON 저장 경로')
+    run_parser.add_argument('--compare', help='비교할 이전 결과 JSON')
+    run_parser.add_argument('--tolerance', type=float, default=0.1)
+
+    for p in (seed_parser, run_parser):
+        p.add_argument('--db', help='sqlite 파일 경로 (기본: api/database.db)')
+        p.add_argument('--seed', type=int, default=42)
+
+    args = parser.parse_args()
+    if args.command == 'seed':
+        seed(args)
+    else:
+        sys.exit(run(args))
+
+
+if __name__ == '__main__':
+    main_()
@@ -0,0 +1,67 @@
+# 로깅 켜기/끄기에 따른 Flask 요청당 오버헤드 마이크로벤치마크
+# off   : LOG_LEVEL=WARNING (DEBUG/INFO 로그 없음)
+# sync  : 변경 전 방식 - 요청 쓰레드에서 바로 콘솔/파일에 쓰는 핸들러 + DEBUG
+# queue : 현재 방식 - QueueHandler 로 넘기고 백그라운드 쓰레드가 출력 + DEBUG
+# 사용법 : python bench/bench_logging.py --requests 5000
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+from logging.handlers import TimedRotatingFileHandler
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'frontend'))
+
+# 콘솔 출력은 버림 (출력 속도가 결과에 섞이지 않도록)
+_stdout = sys.stdout
+sys.stdout = open(os.devnull, 'w')
+import app as frontend
+sys.stdout = _stdout
+
+
+def run(client, requests):
+    paths = ['/', '/login', '/products']
+    started = time.perf_counter()
+    for i in range(requests):
+        client.get(paths[i % len(paths)])
+    return (time.perf_counter() - started) / requests * 1e6
+
+
+def main_():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--requests', type=int, default=5000)
+    args = parser.parse_args()
+
+    root = logging.getLogger()
+    queue_handlers = root.handlers[:]
+    client = frontend.app.test_client()
+    run(client, 200)  # warm up
+
+    results = {}
+    root.setLevel(logging.WARNING)
+    results['off'] = run(client, args.requests)
+
+    root.setLevel(logging.DEBUG)
+    results['queue'] = run(client, args.requests)
+
+    # 변경 전과 같은 동기 핸들러로 교체
+    with tempfile.TemporaryDirectory() as tmp, open(os.devnull, 'w') as devnull:
+        formatter = logging.Formatter('%(asctime)s - %(levelname)s - [%(filename)s:%(lineno)d] - %(message)s')
+        sync_handlers = [logging.StreamHandler(devnull),
+                         TimedRotatingFileHandler(os.path.join(tmp, 'sync.log'), when='midnight', encoding='utf-8')]
+        for handler in sync_handlers:
+            handler.setFormatter(formatter)
+        root.handlers[:] = sync_handlers
+        results['sync'] = run(client, args.requests)
+        for handler in sync_handlers:
+            handler.close()
+        root.handlers[:] = queue_handlers
+
+    for mode in ('off', 'sync', 'queue'):
+        print(f'{mode:6s} {results[mode]:8.1f} us/request  (+{results[mode] - results["off"]:.1f} us vs off)')
+
+
+if __name__ == '__main__':
+    main_()
@@ -0,0 +1,116 @@
+# 주문 상태 SSE 벤치마크 - 대기중인 구독자 수천개를 연결해두고 서버 메모리 / 이벤트 전달 확인
+# 1. uvicorn 서버 실행, 주문 하나 생성
+# 2. --subscribers 개의 SSE 연결을 열어두고 (이벤트 없이 대기) 서버 RSS 증가량 측정
+# 3. 주문 상태를 바꾸면 같은 사용자의 구독자 전부에게 이벤트가 가는지 확인
+# 4. 연결을 끊으면 구독자가 0 으로 돌아오는지, 상한(ORDER_EVENTS_MAX_SUBSCRIBERS)을 넘으면 503 인지 확인
+# 사용법 : python bench/bench_order_events.py --subscribers 5000
+import argparse
+import asyncio
+import os
+import resource
+import sys
+import tempfile
+import time
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from bench_async import start_server
+
+
+def rss_kb(pid):
+    with open(f'/proc/{pid}/status') as f:
+        for line in f:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1])
+    return 0
+
+
+async def open_stream(host, port, user_id):
+    # httpx 클라이언트 수천개 대신 소켓으로 직접 요청 (클라이언트 쪽 메모리를 줄이기 위해)
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(f'GET /api/order/events?user_id={user_id} HTTP/1.1\r\nHost: {host}\r\nAccept: text/event-stream\r\n\r\n'.encode())
+    await writer.drain()
+    status = (await reader.readline()).split()[1]
+    if status == b'200':
+        await reader.readuntil(b'retry: 3000\n\n')
+    return int(status), reader, writer
+
+
+async def wait_for_event(reader):
+    while True:
+        line = await reader.readline()
+        if line.startswith(b'data: '):
+            return line
+
+
+async def run(args):
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+    db_path = os.path.join(tempfile.mkdtemp(), 'bench.db')
+    proc, base_url = start_server('sync', db_path, args.port,
+                                  ORDER_EVENTS_MAX_SUBSCRIBERS=str(args.subscribers), ORDER_EVENTS_KEEPALIVE='5')
+    try:
+        async with httpx.AsyncClient(base_url=base_url) as client:
+            await client.post('/api/products', json={'name': 'sse-product', 'price': 1000})
+            await client.post('/api/cart', json={'user_id': 1, 'product_id': 1, 'quantity': 1})
+            await client.post('/api/order', json={'user_id': 1})
+            order_id = (await client.get('/api/order', params={'user_id': 1})).json()[0]['id']
+
+            before = rss_kb(proc.pid)
+            started = time.perf_counter()
+            # 구독자 절반은 user 1 (이벤트를 받음), 나머지는 다른 사용자들
+            streams = []
+            for n in range(0, args.subscribers, 500):
+                streams += await asyncio.gather(*(
+                    open_stream('127.0.0.1', args.port, 1 if i % 2 == 0 else 1000 + i)
+                    for i in range(n, min(n + 500, args.subscribers))
+                ))
+            connected = sum(1 for status, _, _ in streams if status == 200)
+            print(f'connected {connected}/{args.subscribers} subscribers in {time.perf_counter() - started:.1f}s')
+            await asyncio.sleep(1)
+            after = rss_kb(proc.pid)
+            print(f'server RSS {before / 1024:.1f} MB -> {after / 1024:.1f} MB '
+                  f'({(after - before) / max(connected, 1):.1f} KB per idle subscriber)')
+
+            # 상한을 넘으면 503
+            status, _, writer = await open_stream('127.0.0.1', args.port, 1)
+            writer.close()
+            print(f'subscriber over limit -> {status}')
+
+            # 상태 변경 이벤트가 user 1 구독자 전부에게 전달되는지
+            started = time.perf_counter()
+            await client.put(f'/api/orders/{order_id}/status', params={'status': 'processing'})
+            user1 = [reader for i, (code, reader, _) in enumerate(streams) if i % 2 == 0 and code == 200]
+            events = await asyncio.wait_for(asyncio.gather(*(wait_for_event(reader) for reader in user1)), 30)
+            print(f'fan-out to {len(events)} subscribers in {(time.perf_counter() - started) * 1000:.0f} ms: {events[0].decode().strip()}')
+
+            # 새로 조회하면 상태가 저장되어 있어야 함
+            order = (await client.get(f'/api/orders/{order_id}')).json()
+            print(f'persisted status: {order["status"]}')
+
+            for _, _, writer in streams:
+                writer.close()
+            await asyncio.sleep(2)
+            stats = (await client.get('/api/order/events/stats')).json()
+            print(f'after disconnect: {stats}')
+            ok = (connected == args.subscribers and status == 503 and len(events) == len(user1)
+                  and order['status'] == 'processing' and stats['subscribers'] == 0)
+            return ok
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def main_():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--subscribers', type=int, default=5000)
+    parser.add_argument('--port', type=int, default=8103)
+    args = parser.parse_args()
+    ok = asyncio.run(run(args))
+    print('OK' if ok else 'FAILED')
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main_()
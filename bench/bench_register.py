@@ -0,0 +1,106 @@
+# 회원가입(register_user) 지연시간 벤치마크 + 같은 이름으로 동시에 가입할때 한명만 성공하는지 확인
+# 사용법 : python bench/bench_register.py --repeat 500 --threads 200
+import argparse
+import statistics
+import sys
+import threading
+import time
+import uuid
+
+import _bootstrap  # 임시 DB / api 경로 설정 (api 모듈보다 먼저)
+
+from fastapi import HTTPException
+import main
+from database import SessionLocal
+from model import User
+from schemas import RegisterRequest
+
+
+def legacy_register(user):
+    # 변경 전 방식 : SELECT 로 확인 후 INSERT
+    db = SessionLocal()
+    try:
+        if db.query(User).filter(User.username == user.username).first():
+            raise HTTPException(status_code=400)
+        new_user = User(username=user.username, email=user.email, password=user.password)
+        db.add(new_user)
+        db.commit()
+        db.refresh(new_user)
+        return new_user.id
+    finally:
+        db.close()
+
+
+def single_statement_register(user):
+    db = SessionLocal()
+    try:
+        return main.register_user(user, db)['user_id']
+    finally:
+        db.close()
+
+
+def measure(register, repeat):
+    timings = []
+    for _ in range(repeat):
+        name = uuid.uuid4().hex
+        started = time.perf_counter()
+        register(RegisterRequest(username=name, email=f'{name}@example.com', password='pw'))
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return statistics.median(timings), timings[int(len(timings) * 0.99) - 1]
+
+
+def check_concurrent(threads, same_username, same_email):
+    # 여러 쓰레드가 동시에 가입 -> 한명만 성공하고 나머지는 전부 409 (500 이 있으면 실패)
+    tag = uuid.uuid4().hex[:8]
+    barrier = threading.Barrier(threads)
+    results = []
+
+    def worker(n):
+        username = f'race-{tag}' if same_username else f'race-{tag}-{n}'
+        email = f'race-{tag}@example.com' if same_email else f'race-{tag}-{n}@example.com'
+        barrier.wait()
+        try:
+            single_statement_register(RegisterRequest(username=username, email=email, password='pw'))
+            results.append(200)
+        except HTTPException as e:
+            results.append(e.status_code)
+        except Exception:
+            results.append(500)
+
+    workers = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+
+    created = results.count(200)
+    conflicts = results.count(409)
+    ok = created == 1 and conflicts == threads - 1
+    label = 'same username' if same_username and not same_email else 'same email' if same_email and not same_username else 'same both'
+    print(f'concurrent register x{threads} ({label}): created={created} conflicts={conflicts} '
+          f'other={threads - created - conflicts} -> {"OK" if ok else "FAILED"}')
+    return ok
+
+
+def main_():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--repeat', type=int, default=500)
+    parser.add_argument('--threads', type=int, default=200)
+    args = parser.parse_args()
+
+    legacy_p50, legacy_p99 = measure(legacy_register, args.repeat)
+    new_p50, new_p99 = measure(single_statement_register, args.repeat)
+    print(f'select + insert     p50 {legacy_p50:.2f} ms  p99 {legacy_p99:.2f} ms')
+    print(f'insert on conflict  p50 {new_p50:.2f} ms  p99 {new_p99:.2f} ms')
+    print()
+    ok = all([
+        check_concurrent(args.threads, same_username=True, same_email=False),
+        check_concurrent(args.threads, same_username=False, same_email=True),
+        check_concurrent(args.threads, same_username=True, same_email=True),
+    ])
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main_()
@@ -0,0 +1,81 @@
+# 판매 리포트 벤치마크 - orders 전체를 집계하는 방식과 일별 집계 테이블(product_daily_sales) 조회 비교
+# 주문 수를 늘려도 집계 테이블 조회 시간은 (일수 x 상품수) 에만 비례해야 함
+# 사용법 : python bench/bench_sales_report.py --orders 10000 100000 500000 --products 500 --days 90
+import argparse
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+
+import _bootstrap  # 임시 DB / api 경로 설정 (api 모듈보다 먼저)
+
+from sqlalchemy import select, func, desc, insert
+import main
+from database import writer_engin
+from model import Order, Product
+from queries import sales_top_query
+from sales import backfill, verify
+
+
+def scan_top_query(date_from, date_to, limit):
+    # 변경 전 방식 : orders 를 직접 JOIN / GROUP BY
+    units = func.sum(Order.quantity).label('units')
+    return select(Order.product_id, Product.name, units) \
+        .join(Product, Product.id == Order.product_id) \
+        .where(Order.created_at >= date_from, Order.created_at < date_to + timedelta(days=1), Order.status != 'cancelled') \
+        .group_by(Order.product_id, Product.name) \
+        .order_by(desc(units)) \
+        .limit(limit)
+
+
+def add_orders(count, products, days, rng):
+    now = datetime.utcnow()
+    rows = []
+    for _ in range(count):
+        product_id = rng.randint(1, products)
+        rows.append({'user_id': rng.randint(1, 1000), 'product_id': product_id, 'quantity': rng.randint(1, 3),
+                     'unit_price': 1000 + product_id - 1, 'created_at': now - timedelta(minutes=rng.randint(0, days * 24 * 60))})
+    with writer_engin.begin() as conn:
+        conn.execute(insert(Order), rows)
+
+
+def timed(stmt, repeat):
+    timings = []
+    with writer_engin.connect() as conn:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            conn.execute(stmt).all()
+            timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def main_():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--orders', type=int, nargs='+', default=[10000, 100000, 500000])
+    parser.add_argument('--products', type=int, default=500)
+    parser.add_argument('--days', type=int, default=90)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    with writer_engin.begin() as conn:
+        conn.execute(insert(Product), [{'name': f'bench-product-{i}', 'price': 1000 + i} for i in range(args.products)])
+    date_to = datetime.utcnow().date()
+    date_from = date_to - timedelta(days=29)
+
+    print('orders     backfill s   scan top10 ms   aggregate top10 ms   verify')
+    total = 0
+    for target in args.orders:
+        add_orders(target - total, args.products, args.days, rng)
+        total = target
+        started = time.perf_counter()
+        backfill(writer_engin)
+        backfill_s = time.perf_counter() - started
+        scan_ms = timed(scan_top_query(date_from, date_to, 10), args.repeat)
+        aggregate_ms = timed(sales_top_query(date_from, date_to, 10), args.repeat)
+        ok, _, _ = verify(writer_engin)
+        print(f'{total:8d}  {backfill_s:10.2f}  {scan_ms:14.2f}  {aggregate_ms:19.2f}   {"OK" if ok else "MISMATCH"}')
+
+
+if __name__ == '__main__':
+    main_()
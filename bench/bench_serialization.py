@@ -0,0 +1,74 @@
+# 10k 행 목록 응답의 조회 + 직렬화 시간 비교
+# before : ORM 객체 -> pydantic(ProductOut / OrderOut) 검증 -> jsonable_encoder -> 표준 json
+# after  : 컬럼 튜플 -> dict -> fast_json.dumps (orjson)
+# 사용법 : python bench/bench_serialization.py --rows 10000 --repeat 5
+import argparse
+import json
+import statistics
+import time
+from datetime import datetime
+
+import _bootstrap  # 임시 DB / api 경로 설정 (api 모듈보다 먼저)
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import insert, select
+from sqlalchemy.orm import joinedload
+import main  # 테이블 생성
+from database import SessionLocal, writer_engin
+from fast_json import dumps, orjson
+from model import Order, Product
+from queries import order_list_query, order_rows_to_dicts, product_list_query
+from schemas import OrderOut, ProductOut
+
+
+def seed(rows):
+    now = datetime.utcnow()
+    with writer_engin.begin() as conn:
+        conn.execute(insert(Product), [{'name': f'bench-product-{i}', 'price': 1000 + i} for i in range(rows)])
+        conn.execute(insert(Order), [{'user_id': 1, 'product_id': i % rows + 1, 'quantity': 1, 'created_at': now}
+                                     for i in range(rows)])
+
+
+def timed(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        body = func()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings), len(body)
+
+
+def main_():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    seed(args.rows)
+    db = SessionLocal()
+
+    def products_before():
+        products = db.execute(select(Product).order_by(Product.id).limit(args.rows)).scalars().all()
+        return json.dumps(jsonable_encoder([ProductOut.model_validate(p) for p in products])).encode()
+
+    def products_after():
+        return dumps([dict(row) for row in db.execute(product_list_query(limit=args.rows)).mappings()])
+
+    def orders_before():
+        orders = db.execute(select(Order).options(joinedload(Order.product))
+                            .where(Order.user_id == 1).order_by(Order.id).limit(args.rows)).scalars().all()
+        return json.dumps(jsonable_encoder([OrderOut.model_validate(o) for o in orders])).encode()
+
+    def orders_after():
+        return dumps(order_rows_to_dicts(db.execute(order_list_query(1, limit=args.rows))))
+
+    print(f'encoder: {"orjson" if orjson else "json (orjson not installed)"}  rows: {args.rows}')
+    for label, before, after in (('products', products_before, products_after), ('orders', orders_before, orders_after)):
+        db.expunge_all()
+        before_ms, _ = timed(lambda: (db.expunge_all(), before())[1], args.repeat)
+        after_ms, size = timed(after, args.repeat)
+        print(f'{label:9s} before {before_ms:8.1f} ms   after {after_ms:8.1f} ms   {before_ms / after_ms:5.1f}x  ({size} bytes)')
+    db.close()
+
+
+if __name__ == '__main__':
+    main_()
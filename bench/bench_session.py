@@ -0,0 +1,86 @@
+# Flask 세션 처리 비용 벤치마크 (요청당 open_session + save_session 시간, Set-Cookie 발생 횟수)
+# legacy : 서명 쿠키 + 모든 요청에서 session.permanent = True (변경 전)
+# cookie : 서명 쿠키, 수정될때만 저장
+# memory / sqlite : 서버 저장 세션
+# 사용법 : python bench/bench_session.py --requests 20000
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_tmp = tempfile.mkdtemp()
+os.environ.setdefault('SESSION_DB_PATH', os.path.join(_tmp, 'sessions.db'))
+sys.path.insert(0, os.path.join(ROOT, 'frontend'))
+
+import logging
+logging.disable(logging.CRITICAL)
+
+from flask.sessions import SecureCookieSessionInterface
+import app as frontend
+from session_store import ServerSessionInterface, MemorySessionStore, SqliteSessionStore
+
+app = frontend.app
+
+
+def login_cookie(interface):
+    # 로그인 요청 한번으로 세션을 만들고 쿠키 값을 받음
+    with app.test_request_context('/login'):
+        session = interface.open_session(app, frontend.request)
+        session['user_id'] = 1
+        session['username'] = 'bench'
+        session.permanent = True
+        response = app.response_class()
+        interface.save_session(app, session, response)
+    return response.headers['Set-Cookie'].split(';', 1)[0]
+
+
+def measure(interface, requests, legacy=False):
+    cookie = login_cookie(interface)
+    set_cookies = 0
+    started = time.perf_counter()
+    for _ in range(requests):
+        # 로그인 상태로 페이지 요청 (세션은 읽기만 함)
+        with app.test_request_context('/products', headers={'Cookie': cookie}):
+            session = interface.open_session(app, frontend.request)
+            if legacy:
+                session.permanent = True
+            session.get('user_id')
+            response = app.response_class()
+            interface.save_session(app, session, response)
+            set_cookies += 'Set-Cookie' in response.headers
+    elapsed = time.perf_counter() - started
+    return elapsed / requests * 1e6, set_cookies, len(cookie.split('=', 1)[1])
+
+
+def baseline(requests):
+    # 세션 처리 없이 요청 컨텍스트만 만드는 비용 (결과에서 빼서 세션 비용만 표시)
+    started = time.perf_counter()
+    for _ in range(requests):
+        with app.test_request_context('/products', headers={'Cookie': 'session=x'}):
+            app.response_class()
+    return (time.perf_counter() - started) / requests * 1e6
+
+
+def main_():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--requests', type=int, default=20000)
+    args = parser.parse_args()
+
+    cases = [
+        ('legacy', SecureCookieSessionInterface(), True),
+        ('cookie', SecureCookieSessionInterface(), False),
+        ('memory', ServerSessionInterface(MemorySessionStore()), False),
+        ('sqlite', ServerSessionInterface(SqliteSessionStore(os.environ['SESSION_DB_PATH'])), False),
+    ]
+    overhead = baseline(args.requests)
+    print(f'request context only: {overhead:.1f} us/request (subtracted below)')
+    print(f'{"backend":8s} {"us/request":>11s} {"set-cookie":>11s} {"cookie bytes":>13s}')
+    for name, interface, legacy in cases:
+        per_request, set_cookies, cookie_size = measure(interface, args.requests, legacy)
+        print(f'{name:8s} {per_request - overhead:11.1f} {set_cookies:11d} {cookie_size:13d}')
+
+
+if __name__ == '__main__':
+    main_()
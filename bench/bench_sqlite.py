@@ -0,0 +1,81 @@
+# sqlite 기본 설정 vs 튜닝 모드(WAL + pragma + writer 커넥션) 읽기/쓰기 처리량 비교
+# 사용법 : python bench/bench_sqlite.py --readers 50 --writers 20 --duration 10
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+import httpx
+
+from bench_async import start_server, seed
+
+
+async def run_mixed(base_url, readers, writers, duration, products):
+    # 읽기 클라이언트는 상품목록 조회, 쓰기 클라이언트는 장바구니 담기 / 주문을 반복
+    counts = {'read': 0, 'write': 0, 'read_errors': 0, 'write_errors': 0}
+    deadline = time.perf_counter() + duration
+    total = readers + writers
+    limits = httpx.Limits(max_connections=total, max_keepalive_connections=total)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        async def reader():
+            while time.perf_counter() < deadline:
+                try:
+                    response = await client.get('/api/products')
+                    counts['read' if response.status_code == 200 else 'read_errors'] += 1
+                except httpx.HTTPError:
+                    counts['read_errors'] += 1
+
+        async def writer(user_id):
+            n = 0
+            while time.perf_counter() < deadline:
+                n += 1
+                try:
+                    if n % 5 == 0:
+                        response = await client.post('/api/order', json={'user_id': user_id})
+                    else:
+                        response = await client.post('/api/cart', json={
+                            'user_id': user_id, 'product_id': n % products + 1, 'quantity': 1})
+                    if response.status_code == 200:
+                        counts['write'] += 1
+                    else:
+                        counts['write_errors'] += 1
+                except httpx.HTTPError:
+                    counts['write_errors'] += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*[reader() for _ in range(readers)],
+                             *[writer(user_id) for user_id in range(1, writers + 1)])
+        elapsed = time.perf_counter() - started
+    return {
+        'read_rps': counts['read'] / elapsed,
+        'write_rps': counts['write'] / elapsed,
+        'read_errors': counts['read_errors'],
+        'write_errors': counts['write_errors'],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--readers', type=int, default=50)
+    parser.add_argument('--writers', type=int, default=20)
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--products', type=int, default=100)
+    parser.add_argument('--port', type=int, default=8101)
+    args = parser.parse_args()
+
+    for label, tuned in (('default', '0'), ('tuned', '1')):
+        with tempfile.TemporaryDirectory() as tmp:
+            proc, base_url = start_server('sync', os.path.join(tmp, 'bench.db'), args.port, SQLITE_TUNED=tuned)
+            try:
+                seed(base_url, args.products)
+                result = asyncio.run(run_mixed(base_url, args.readers, args.writers, args.duration, args.products))
+            finally:
+                proc.terminate()
+                proc.wait()
+        print(f"{label:8s} read {result['read_rps']:8.1f} req/s  write {result['write_rps']:8.1f} req/s  "
+              f"errors read={result['read_errors']} write={result['write_errors']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1 @@
+# api / frontend 가 같이 사용하는 모듈
@@ -0,0 +1,122 @@
+# api / frontend 공용 로깅 설정
+# - 요청 쓰레드는 QueueHandler 로 큐에 넣기만 하고, 실제 출력(콘솔/파일)은 QueueListener 백그라운드 쓰레드가 처리
+# - 메시지 포맷팅(% 인자 합치기, JSON 직렬화)도 백그라운드 쓰레드에서 실행 (logger.debug('..%s', x) 형태로 사용)
+# - 환경변수
+#     LOG_LEVEL         : DEBUG / INFO / WARNING ... (기본 INFO)
+#     LOG_FORMAT        : json / text (기본 json)
+#     LOG_SAMPLE_RATES  : 경로별 WARNING 미만 로그 샘플링 비율  예) /api/products=0.01,/static=0
+#     LOG_SAMPLE_DEFAULT: 나머지 경로의 샘플링 비율 (기본 1 = 전부 기록)
+import contextvars
+import json
+import logging
+import os
+import queue
+import random
+import sys
+import atexit
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, TimedRotatingFileHandler
+
+# 현재 요청이 샘플링 되었는지 (요청 시작할때 한번 결정)
+_sampled = contextvars.ContextVar('log_sampled', default=True)
+_listener = None
+
+def _parse_sample_rates(value):
+    rates = {}
+    for item in filter(None, (part.strip() for part in value.split(','))):
+        prefix, _, rate = item.partition('=')
+        rates[prefix.strip()] = float(rate)
+    # 긴 prefix 가 먼저 매칭되도록 정렬
+    return sorted(rates.items(), key=lambda item: len(item[0]), reverse=True)
+
+SAMPLE_RATES = _parse_sample_rates(os.getenv('LOG_SAMPLE_RATES', ''))
+SAMPLE_DEFAULT = float(os.getenv('LOG_SAMPLE_DEFAULT', '1'))
+
+def sample_rate(path):
+    for prefix, rate in SAMPLE_RATES:
+        if path.startswith(prefix):
+            return rate
+    return SAMPLE_DEFAULT
+
+def begin_request(path):
+    """요청 시작시 호출 - 이 요청의 WARNING 미만 로그를 기록할지 경로별 비율로 결정"""
+    rate = sample_rate(path)
+    return _sampled.set(rate >= 1 or random.random() < rate)
+
+def end_request(token):
+    _sampled.reset(token)
+
+class SamplingFilter(logging.Filter):
+    def filter(self, record):
+        return record.levelno >= logging.WARNING or _sampled.get()
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        data = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+            'file': f'{record.filename}:{record.lineno}',
+            'thread': record.threadName,
+        }
+        if record.exc_info:
+            data['exc'] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False)
+
+class DeferredQueueHandler(QueueHandler):
+    """기본 QueueHandler 는 큐에 넣기 전에 메시지를 포맷팅함 -> 포맷팅을 listener 쓰레드로 미룸
+    (같은 프로세스 안의 큐라서 record 를 그대로 넘겨도 됨. 로그 인자로 나중에 바뀔 객체는 넘기지 말 것)"""
+    def prepare(self, record):
+        return record
+
+def setup_logging(log_file):
+    """루트 로거를 QueueHandler 하나로 설정. 여러번 호출해도 처음 한번만 적용 (통합 모드에서 핸들러 중복 방지)"""
+    global _listener
+    if _listener is not None:
+        return _listener
+
+    level = getattr(logging, os.getenv('LOG_LEVEL', 'INFO').upper(), logging.INFO)
+    if os.getenv('LOG_FORMAT', 'json') == 'json':
+        formatter = JsonFormatter()
+    else:
+        formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - [%(filename)s:%(lineno)d] - %(message)s')
+
+    os.makedirs(os.path.dirname(log_file), exist_ok=True)
+    handlers = [
+        # 콘솔 출력
+        logging.StreamHandler(sys.stdout),
+        # 파일 출력 (매일 자정에 새 파일, 30일치 유지)
+        TimedRotatingFileHandler(filename=log_file, when='midnight', interval=1, backupCount=30, encoding='utf-8'),
+    ]
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = DeferredQueueHandler(log_queue)
+    queue_handler.addFilter(SamplingFilter())
+
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)  # 종료할때 큐에 남은 로그를 모두 기록
+    return _listener
+
+class LogSamplingMiddleware:
+    """ASGI 미들웨어 - 요청마다 begin_request / end_request 호출"""
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            return await self.app(scope, receive, send)
+        token = begin_request(scope['path'])
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            end_request(token)
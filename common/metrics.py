@@ -0,0 +1,178 @@
+# api / frontend 공용 메트릭 (Prometheus text format 으로 /metrics 에서 노출)
+# - 경로별 요청 수 / 상태코드 / 처리중인 요청 수 / 지연시간 히스토그램
+# - 요청당 DB 쿼리 수 / DB 시간 (SQLAlchemy cursor 이벤트) -> N+1 쿼리가 바로 보임
+# 외부 라이브러리 없이 dict + lock 으로만 구현해서 요청당 오버헤드를 최소화
+import contextvars
+import threading
+import time
+from bisect import bisect_left
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 500)
+
+def _label_str(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join('%s="%s"' % (k, str(v).replace('\\', '\\\\').replace('"', '\\"')) for k, v in labels) + '}'
+
+class Counter:
+    def __init__(self, name, help_text):
+        self.name, self.help, self.type = name, help_text, 'counter'
+        self.values = {}
+
+    def inc(self, labels=(), amount=1):
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def render(self):
+        return [f'{self.name}{_label_str(labels)} {value}' for labels, value in self.values.items()]
+
+class Gauge(Counter):
+    def __init__(self, name, help_text):
+        super().__init__(name, help_text)
+        self.type = 'gauge'
+
+    def set(self, labels, value):
+        self.values[labels] = value
+
+class Histogram:
+    def __init__(self, name, help_text, buckets):
+        self.name, self.help, self.type = name, help_text, 'histogram'
+        self.buckets = buckets
+        self.values = {}  # labels -> [bucket counts..., +Inf count, sum]
+
+    def observe(self, labels, value):
+        data = self.values.get(labels)
+        if data is None:
+            data = self.values[labels] = [0] * (len(self.buckets) + 2)
+        data[bisect_left(self.buckets, value)] += 1
+        data[-1] += value
+
+    def render(self):
+        lines = []
+        for labels, data in self.values.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + ('+Inf',), data[:-1]):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{_label_str(labels + (("le", bound),))} {cumulative}')
+            lines.append(f'{self.name}_sum{_label_str(labels)} {data[-1]}')
+            lines.append(f'{self.name}_count{_label_str(labels)} {cumulative}')
+        return lines
+
+class Registry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.metrics = []
+        self.collectors = []  # render 할때 호출해서 gauge 값을 채우는 함수 (풀 / 캐시 상태 등)
+
+    def add(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self):
+        for collect in self.collectors:
+            collect()
+        lines = []
+        with self.lock:
+            for metric in self.metrics:
+                lines.append(f'# HELP {metric.name} {metric.help}')
+                lines.append(f'# TYPE {metric.name} {metric.type}')
+                lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+registry = Registry()
+REQUESTS = registry.add(Counter('http_requests_total', 'HTTP requests by route, method and status'))
+IN_PROGRESS = registry.add(Gauge('http_requests_in_progress', 'HTTP requests currently being served'))
+LATENCY = registry.add(Histogram('http_request_duration_seconds', 'HTTP request latency', LATENCY_BUCKETS))
+DB_TIME = registry.add(Histogram('db_time_per_request_seconds', 'Time spent in DB queries per request', LATENCY_BUCKETS))
+DB_QUERIES = registry.add(Histogram('db_queries_per_request', 'DB queries executed per request', QUERY_COUNT_BUCKETS))
+SHED = registry.add(Counter('http_requests_shed_total', 'Requests rejected by admission control (429 / 503) by route and reason'))
+API_CALL_LATENCY = registry.add(Histogram('api_client_request_duration_seconds', 'Frontend to API call latency by method and path', LATENCY_BUCKETS))
+API_CALL_ERRORS = registry.add(Counter('api_client_errors_total', 'Frontend to API calls that failed (connection error / 5xx) by method and path'))
+
+class RequestDbStats:
+    __slots__ = ('queries', 'seconds')
+
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+
+# 현재 요청의 DB 통계 (쓰레드풀로 넘어가도 contextvar 가 복사되므로 같은 객체에 누적됨)
+_db_stats = contextvars.ContextVar('db_stats', default=None)
+
+def request_started(service, method):
+    # 처리중 요청 수는 라우팅 전에 올리므로 route 라벨 없이 기록
+    with registry.lock:
+        IN_PROGRESS.inc((('service', service), ('method', method)))
+    stats = RequestDbStats()
+    return time.perf_counter(), stats, _db_stats.set(stats)
+
+def request_finished(service, route, method, status, started, stats, token):
+    elapsed = time.perf_counter() - started
+    _db_stats.reset(token)
+    labels = (('service', service), ('route', route), ('method', method))
+    with registry.lock:
+        IN_PROGRESS.inc((('service', service), ('method', method)), -1)
+        REQUESTS.inc(labels + (('status', status),))
+        LATENCY.observe(labels, elapsed)
+        if stats.queries:
+            DB_TIME.observe(labels, stats.seconds)
+        DB_QUERIES.observe(labels, stats.queries)
+
+def record_shed(service, route, reason):
+    with registry.lock:
+        SHED.inc((('service', service), ('route', route), ('reason', reason)))
+
+def record_api_call(method, path, elapsed, error):
+    # path 는 쿼리스트링을 뺀 호출 경로 (id 가 들어간 경로는 라벨이 계속 늘어나므로 템플릿 경로로 호출)
+    labels = (('method', method), ('path', path.split('?', 1)[0]))
+    with registry.lock:
+        API_CALL_LATENCY.observe(labels, elapsed)
+        if error:
+            API_CALL_ERRORS.inc(labels)
+
+def instrument_engine(engine):
+    """SQLAlchemy 엔진의 쿼리 시간 / 횟수를 현재 요청에 누적"""
+    from sqlalchemy import event
+
+    # 시작 시간은 쿼리 실행마다 새로 만들어지는 context 에 저장 (커넥션에 저장하면 실패한 쿼리의 값이 계속 쌓임)
+    @event.listens_for(engine, 'before_cursor_execute')
+    def before(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._metrics_start = time.perf_counter()
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def after(conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, '_metrics_start', None)
+        if started is None:
+            return
+        stats = _db_stats.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.seconds += time.perf_counter() - started
+
+class MetricsMiddleware:
+    """ASGI 미들웨어 - FastAPI 요청별 메트릭 기록. route 라벨은 경로 템플릿(/api/products/{product_id}) 사용"""
+    def __init__(self, app, service='api'):
+        self.app = app
+        self.service = service
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            return await self.app(scope, receive, send)
+        status = [500]
+
+        async def send_wrapper(message):
+            if message['type'] == 'http.response.start':
+                status[0] = message['status']
+            await send(message)
+
+        method = scope['method']
+        started, stats, token = request_started(self.service, method)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # 라우팅이 끝나면 scope['route'] 에 매칭된 라우트가 들어있음 (Mount 는 path 가 '' 라서 '/')
+            # 라우팅 전에 admission 에서 거절된 요청은 shed_route 로 기록
+            route = scope.get('route')
+            route_label = getattr(route, 'path', None) or ('/' if route is not None else scope.get('shed_route', 'unmatched'))
+            request_finished(self.service, route_label, method, status[0], started, stats, token)
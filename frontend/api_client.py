@@ -0,0 +1,100 @@
+# FastAPI 서버 호출용 공용 클라이언트
+# - requests.Session 커넥션 풀 (keep-alive 로 TCP 연결 재사용)
+# - 연결/응답 timeout, 연결 실패시 제한된 횟수만 재시도
+# - 서킷 브레이커 : 연속으로 실패하면 일정 시간 동안 API 를 호출하지 않고 바로 실패
+# - 호출별 지연시간 기록 (common.metrics 히스토그램 -> 프론트엔드 /metrics 에서 노출)
+import logging
+import os
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from common.metrics import record_api_call
+
+API_BASE_URL = os.getenv('API_BASE_URL', 'http://localhost:8000')
+CONNECT_TIMEOUT = float(os.getenv('API_CONNECT_TIMEOUT', '2'))   # 연결 timeout(초)
+READ_TIMEOUT = float(os.getenv('API_READ_TIMEOUT', '5'))         # 응답 timeout(초)
+MAX_RETRIES = int(os.getenv('API_MAX_RETRIES', '2'))             # 연결 실패시 재시도 횟수
+POOL_SIZE = int(os.getenv('API_POOL_SIZE', '20'))                # keep-alive 커넥션 수
+BREAKER_THRESHOLD = int(os.getenv('API_BREAKER_THRESHOLD', '5')) # 연속 실패 몇번이면 차단할지
+BREAKER_COOLDOWN = float(os.getenv('API_BREAKER_COOLDOWN', '30'))  # 차단 유지 시간(초)
+
+logger = logging.getLogger(__name__)
+
+class CircuitOpenError(requests.ConnectionError):
+    """서킷 브레이커가 열려있어서 API 를 호출하지 않음"""
+
+class CircuitBreaker:
+    def __init__(self, threshold=BREAKER_THRESHOLD, cooldown=BREAKER_COOLDOWN):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            # cooldown 이 지나면 한번 시도해보고 (half-open) 성공하면 다시 닫음
+            if time.monotonic() - self.opened_at >= self.cooldown:
+                self.opened_at = time.monotonic()
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.threshold:
+                if self.opened_at is None:
+                    logger.warning('API circuit opened after %d failures', self.failures)
+                self.opened_at = time.monotonic()
+
+class ApiClient:
+    def __init__(self, base_url=API_BASE_URL):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = (CONNECT_TIMEOUT, READ_TIMEOUT)
+        self.breaker = CircuitBreaker()
+        self.session = requests.Session()
+        # 연결 자체가 실패한 경우만 재시도 (요청이 전달된 뒤에는 POST 가 중복되지 않도록 재시도하지 않음)
+        retry = Retry(total=MAX_RETRIES, connect=MAX_RETRIES, read=0, status=0, other=0, backoff_factor=0.1)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_SIZE, max_retries=retry)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def request(self, method, path, **kwargs):
+        if not self.breaker.allow():
+            raise CircuitOpenError(f'API circuit open: {method} {path}')
+        kwargs.setdefault('timeout', self.timeout)
+        started = time.perf_counter()
+        try:
+            response = self.session.request(method, self.base_url + path, **kwargs)
+        except requests.RequestException:
+            self.breaker.record_failure()
+            self._record(method, path, time.perf_counter() - started, error=True)
+            raise
+        # 5xx 는 API 쪽 장애로 보고 실패로 카운트, 4xx 는 정상 응답
+        if response.status_code >= 500:
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+        self._record(method, path, time.perf_counter() - started, error=response.status_code >= 500)
+        return response
+
+    def get(self, path, **kwargs):
+        return self.request('GET', path, **kwargs)
+
+    def post(self, path, **kwargs):
+        return self.request('POST', path, **kwargs)
+
+    def _record(self, method, path, elapsed, error):
+        record_api_call(method, path, elapsed, error)
+        logger.debug('API %s %s took %.1f ms', method, path, elapsed * 1000)
+
+api_client = ApiClient()
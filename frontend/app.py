@@ -1,10 +1,9 @@
-from flask import Flask, render_template, request, redirect, url_for, session, jsonify
-import requests
+from flask import Flask, render_template, request, redirect, url_for, session, jsonify, g
+from session_store import create_session_interface
 import json
 from functools import wraps
 import logging
 import sys
-from logging.handlers import TimedRotatingFileHandler
 import os
 from datetime import datetime
 
@@ -15,74 +14,90 @@ project_root = os.path.dirname(current_dir)
 # 로그 디렉토리 경로
 log_dir = os.path.join(project_root, 'logs')
 
-# 로그 디렉토리 생성
-if not os.path.exists(log_dir):
-    os.makedirs(log_dir)
-    print(f'Created log directory at: {log_dir}')
-
 # 로그 파일 경로 설정
 log_file = os.path.join(log_dir, 'app.log')
-print(f'Log file will be saved at: {log_file}')
-
-# 로깅 설정
-logging.basicConfig(
-    level=logging.DEBUG,
-    format='%(asctime)s - %(levelname)s - [%(filename)s:%(lineno)d] - %(message)s',
-    handlers=[
-        # 콘솔 출력
-        logging.StreamHandler(sys.stdout),
-        # 파일 출력 (날짜별 로테이션)
-        TimedRotatingFileHandler(
-            filename=log_file,
-            when='midnight',  # 매일 자정에 새로운 파일 생성
-            interval=1,       # 1일 간격
-            backupCount=30,   # 30일치 로그 파일 유지
-            encoding='utf-8'
-        )
-    ]
-)
+
+# 로깅 설정 (QueueHandler + 백그라운드 쓰레드에서 출력, LOG_LEVEL / LOG_FORMAT / LOG_SAMPLE_RATES 환경변수)
+sys.path.insert(0, project_root)
+from common.log_setup import setup_logging, begin_request, end_request
+from common.metrics import registry, request_started, request_finished
+from api_client import api_client  # common.metrics 를 사용하므로 project_root 를 경로에 넣은 뒤에 import
+setup_logging(log_file)
 
 # 로거 설정
 logger = logging.getLogger(__name__)
-logger.info(f'Logging initialized. Log directory: {log_dir}')
+logger.info('Logging initialized. Log file: %s', log_file)
 
 # Flask 애플리케이션 설정
 app = Flask(__name__)
 app.secret_key = 'your-secret-key-here'  # 실제 운영 환경에서는 안전한 키로 변경해야 합니다
-app.config['SESSION_TYPE'] = 'filesystem'
 app.config['PERMANENT_SESSION_LIFETIME'] = 3600  # 세션 유효 시간을 1시간으로 설정
-
-# Flask 로거 설정
-app.logger.setLevel(logging.DEBUG)
-# Flask의 기본 로거 핸들러 제거
+# 서버 저장 세션 (SESSION_BACKEND=sqlite / memory / cookie) - 쿠키에는 세션 id 만 저장
+session_interface = create_session_interface()
+if session_interface is not None:
+    app.session_interface = session_interface
+# 브라우저(템플릿 ajax)가 호출할 API 주소. 통합 모드(FastAPI 에 mount)에서는 '' 로 같은 origin 사용
+app.config['API_BASE'] = os.getenv('API_PUBLIC_URL', 'http://localhost:8000')
+
+@app.context_processor
+def inject_api_base():
+    return {'api_base': app.config['API_BASE']}
+
+# 로그인/회원가입 처리 백엔드
+# 기본은 API 서버를 HTTP 로 호출하고, 통합 모드에서는 api/main.py 가 in-process 백엔드로 교체함
+class HttpUserBackend:
+    def login(self, credentials):
+        response = api_client.post('/api/login', json=credentials)
+        return response.status_code, response.json()
+
+    def register(self, user):
+        response = api_client.post('/api/register', json=user)
+        return response.status_code, response.json()
+
+user_backend = HttpUserBackend()
+
+# Flask 로거 설정 - 핸들러는 루트 로거(QueueHandler) 하나만 사용하고 레벨도 루트를 따름
 for handler in app.logger.handlers[:]:
     app.logger.removeHandler(handler)
-# 우리가 만든 로거 핸들러 추가
-app.logger.addHandler(logging.StreamHandler(sys.stdout))
-app.logger.addHandler(TimedRotatingFileHandler(
-    filename=log_file,
-    when='midnight',
-    interval=1,
-    backupCount=30,
-    encoding='utf-8'
-))
-
-# 세션 설정을 위한 before_request 핸들러
+app.logger.setLevel(logging.NOTSET)
+
+# 요청 시작 처리 (세션은 로그인 / 로그아웃처럼 수정될때만 저장)
 @app.before_request
 def before_request():
-    session.permanent = True  # 모든 요청에서 세션을 영구적으로 설정
-    app.logger.debug(f'Request path: {request.path}')
-    app.logger.debug(f'Request method: {request.method}')
-    app.logger.debug(f'Current session: {dict(session)}')
+    g.log_token = begin_request(request.path)  # 경로별 로그 샘플링
+    g.metrics = request_started('frontend', request.method)  # 요청 메트릭 시작
+    app.logger.debug('Request %s %s', request.method, request.path)
+    # dict(session) 복사는 DEBUG 가 켜져 있을때만
+    if app.logger.isEnabledFor(logging.DEBUG):
+        app.logger.debug('Current session: %s', dict(session))
+
+@app.after_request
+def record_status(response):
+    g.status = response.status_code
+    return response
+
+@app.teardown_request
+def teardown_request(exc):
+    metrics = g.pop('metrics', None)
+    if metrics is not None:
+        # route 라벨은 URL 규칙(/products) 사용, 없는 경로는 unmatched
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        request_finished('frontend', route, request.method, g.get('status', 500), *metrics)
+    token = g.pop('log_token', None)
+    if token is not None:
+        end_request(token)
+
+# Prometheus 메트릭
+@app.route('/metrics')
+def metrics():
+    return registry.render(), 200, {'Content-Type': 'text/plain; version=0.0.4'}
 
 # 로그인 체크 데코레이터
 def login_required(f):
     @wraps(f)
     def decorated_function(*args, **kwargs):
         if 'user_id' not in session:
-            app.logger.debug(f'Protected URL: {request.url}')
-            app.logger.debug(f'Request path: {request.path}')
-            app.logger.debug(f'Request full path: {request.full_path}')
+            app.logger.debug('Protected URL: %s', request.url)
             return redirect(url_for('login', next=request.path))
         return f(*args, **kwargs)
     return decorated_function
@@ -94,36 +109,31 @@ def index():
 
 @app.route('/login', methods=['GET', 'POST'])
 def login():
-    app.logger.debug(f'Login request method: {request.method}')
-    app.logger.debug(f'Login next parameter: {request.args.get("next")}')
-    app.logger.debug(f'Current session: {dict(session)}')
+    app.logger.debug('Login request method: %s, next: %s', request.method, request.args.get('next'))
     
     if request.method == 'POST':
         try:
-            app.logger.debug(f'Login request data: {request.get_json()}')
-            response = requests.post('http://localhost:8000/api/login',             
-                                   json=request.get_json())
-            app.logger.debug(f'Login API response status: {response.status_code}')
-            app.logger.debug(f'Login API response data: {response.json()}')
+            status_code, data = user_backend.login(request.get_json())
+            app.logger.debug('Login API response status: %s', status_code)
             
-            if response.status_code == 200:
-                data = response.json()
+            if status_code == 200:
+                if hasattr(session, 'regenerate'):
+                    session.regenerate()  # 로그인하면 세션 id 새로 발급
                 session['user_id'] = data['user_id']
                 session['username'] = request.get_json()['username']
                 session.permanent = True  # 세션을 영구적으로 설정
                 
-                app.logger.info(f'Login successful for user: {session["username"]}')
-                app.logger.debug(f'Updated session: {dict(session)}')
+                app.logger.info('Login successful for user: %s', session['username'])
                 
                 return jsonify({
                     "success": True,
                     "redirect": url_for('index')
                 })
             else:
-                app.logger.warning(f'Login failed with status: {response.status_code}')
+                app.logger.warning('Login failed with status: %s', status_code)
                 return jsonify({"success": False, "message": "로그인에 실패했습니다."}), 400
         except Exception as e:
-            app.logger.error(f'Login error: {str(e)}', exc_info=True)
+            app.logger.error('Login error: %s', e, exc_info=True)
             return jsonify({"success": False, "message": "서버 오류가 발생했습니다."}), 500
     
     return render_template('login.html', next=request.args.get('next', ''))
@@ -131,7 +141,7 @@ def login():
 @app.route('/logout')
 def logout():
     username = session.get('username', 'unknown')
-    app.logger.info(f'User logged out: {username}')
+    app.logger.info('User logged out: %s', username)
     session.clear()
     return redirect(url_for('index'))
 
@@ -142,20 +152,23 @@ def register():
         email = request.form.get('email')
         password = request.form.get('password')
         
-        app.logger.debug(f'Registration attempt for user: {username}')
+        app.logger.debug('Registration attempt for user: %s', username)
         
         try:
-            response = requests.post('http://localhost:8000/api/register', 
-                                   json={'username': username, 'email': email, 'password': password})
+            status_code, data = user_backend.register({'username': username, 'email': email, 'password': password})
             
-            if response.status_code == 200:
-                app.logger.info(f'Registration successful for user: {username}')
+            if status_code == 200:
+                app.logger.info('Registration successful for user: %s', username)
                 return redirect(url_for('login'))
+            elif status_code == 409:
+                app.logger.info('Registration conflict for user: %s', username)
+                conflicts = data.get('detail', {}).get('conflicts', {})
+                return render_template('register.html', error=' '.join(conflicts.values()) or '이미 존재하는 사용자입니다.')
             else:
-                app.logger.warning(f'Registration failed for user: {username}')
+                app.logger.warning('Registration failed for user: %s', username)
                 return render_template('register.html', error='회원가입에 실패했습니다.')
         except Exception as e:
-            app.logger.error(f'Registration error: {str(e)}', exc_info=True)
+            app.logger.error('Registration error: %s', e, exc_info=True)
             return render_template('register.html', error='서버 오류가 발생했습니다.')
     
     return render_template('register.html')
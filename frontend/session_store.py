@@ -0,0 +1,231 @@
+# 서버 저장 Flask 세션
+# - 쿠키에는 랜덤 세션 id (고정 길이, 내용 없음) 만 넣고 세션 데이터는 서버(메모리 LRU / SQLite)에 저장
+# - 세션이 수정된 경우에만 저장 + Set-Cookie (템플릿 페이지 요청마다 쿠키를 다시 발급하지 않음)
+# - 만료는 마지막 저장 시점 기준. 만료가 절반 이상 지난 세션에 요청이 오면 그때만 만료시간을 연장
+# - 만료된 세션은 SWEEP_INTERVAL 마다 요청 처리중에 한번씩 정리 (별도 쓰레드 없음)
+# - 환경변수
+#     SESSION_BACKEND        : sqlite / memory / cookie (기본 sqlite, cookie 는 Flask 기본 서명 쿠키)
+#     SESSION_DB_PATH        : sqlite 파일 경로 (기본 frontend/sessions.db, -wal / -shm 파일과 함께 .gitignore 에 포함)
+#     SESSION_DB_POOL_SIZE   : sqlite 백엔드에서 재사용할 연결 수 (더 필요하면 열었다가 사용 후 닫음)
+#     SESSION_MAX_ENTRIES    : memory 백엔드 최대 세션 수 (LRU)
+#     SESSION_SWEEP_INTERVAL : 만료 세션 정리 주기(초)
+# memory 백엔드는 프로세스마다 따로라서 워커가 여러개면 sqlite 를 사용
+import json
+import logging
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from flask.sessions import SessionInterface, SessionMixin
+from werkzeug.datastructures import CallbackDict
+
+SESSION_BACKEND = os.getenv('SESSION_BACKEND', 'sqlite')
+SESSION_DB_PATH = os.getenv('SESSION_DB_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sessions.db'))
+SESSION_DB_POOL_SIZE = int(os.getenv('SESSION_DB_POOL_SIZE', '8'))
+SESSION_MAX_ENTRIES = int(os.getenv('SESSION_MAX_ENTRIES', '10000'))
+SWEEP_INTERVAL = float(os.getenv('SESSION_SWEEP_INTERVAL', '300'))
+SID_BYTES = 32  # token_urlsafe(32) -> 항상 43자
+
+logger = logging.getLogger(__name__)
+
+class ServerSession(CallbackDict, SessionMixin):
+    def __init__(self, data=None, sid=None, expires=None):
+        def on_update(self):
+            self.modified = True
+        super().__init__(data, on_update)
+        self.sid = sid
+        self.expires = expires  # 저장된 만료시각 (time.time()), 새 세션이면 None
+        self.modified = False
+
+    def regenerate(self):
+        """로그인 등 권한이 바뀔때 세션 id 를 새로 발급 (세션 고정 공격 방지)"""
+        self.old_sid = self.sid
+        self.sid = None
+        self.modified = True
+
+class MemorySessionStore:
+    """프로세스 메모리 LRU 저장소"""
+    def __init__(self, max_entries=SESSION_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._data = OrderedDict()  # sid -> (data, expires)
+        self._lock = threading.Lock()
+
+    def get(self, sid):
+        with self._lock:
+            entry = self._data.get(sid)
+            if entry is None:
+                return None
+            if entry[1] <= time.time():
+                del self._data[sid]
+                return None
+            self._data.move_to_end(sid)
+            return dict(entry[0]), entry[1]
+
+    def set(self, sid, data, expires):
+        with self._lock:
+            self._data[sid] = (dict(data), expires)
+            self._data.move_to_end(sid)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)  # 가장 오래 사용하지 않은 세션 제거
+
+    def delete(self, sid):
+        with self._lock:
+            self._data.pop(sid, None)
+
+    def sweep(self, now):
+        with self._lock:
+            expired = [sid for sid, (_, expires) in self._data.items() if expires <= now]
+            for sid in expired:
+                del self._data[sid]
+        return len(expired)
+
+    def __len__(self):
+        return len(self._data)
+
+class SqliteSessionStore:
+    """SQLite 저장소 - 재시작 후에도 유지되고 여러 워커 프로세스가 같이 사용
+    Werkzeug threaded 서버는 요청마다 새 쓰레드를 만들기 때문에 쓰레드별 연결 대신 lock 으로 보호하는 연결 풀을 사용"""
+    def __init__(self, path=SESSION_DB_PATH, pool_size=SESSION_DB_POOL_SIZE):
+        self.path = path
+        self.pool_size = pool_size
+        self._pool = []  # 쉬고 있는 연결
+        self._lock = threading.Lock()
+        with self._conn() as conn, conn:
+            conn.execute('CREATE TABLE IF NOT EXISTS sessions (sid TEXT PRIMARY KEY, data TEXT NOT NULL, expires REAL NOT NULL)')
+            conn.execute('CREATE INDEX IF NOT EXISTS ix_sessions_expires ON sessions (expires)')
+
+    def _connect(self):
+        # 풀에 돌려놓은 연결은 다른 쓰레드가 꺼내 쓰므로 check_same_thread 끔 (한번에 한 쓰레드만 사용)
+        conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+
+    @contextmanager
+    def _conn(self):
+        """풀에서 연결을 하나 빌려주고 끝나면 돌려놓음 (풀이 가득 차 있으면 닫음)"""
+        with self._lock:
+            conn = self._pool.pop() if self._pool else None
+        if conn is None:
+            conn = self._connect()
+        try:
+            yield conn
+        finally:
+            with self._lock:
+                if len(self._pool) < self.pool_size:
+                    self._pool.append(conn)
+                    conn = None
+            if conn is not None:
+                conn.close()
+
+    def get(self, sid):
+        with self._conn() as conn:
+            row = conn.execute('SELECT data, expires FROM sessions WHERE sid = ? AND expires > ?', (sid, time.time())).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0]), row[1]
+
+    def set(self, sid, data, expires):
+        with self._conn() as conn, conn:
+            conn.execute('INSERT OR REPLACE INTO sessions (sid, data, expires) VALUES (?, ?, ?)', (sid, json.dumps(data), expires))
+
+    def delete(self, sid):
+        with self._conn() as conn, conn:
+            conn.execute('DELETE FROM sessions WHERE sid = ?', (sid,))
+
+    def sweep(self, now):
+        with self._conn() as conn, conn:
+            return conn.execute('DELETE FROM sessions WHERE expires <= ?', (now,)).rowcount
+
+    def __len__(self):
+        with self._conn() as conn:
+            return conn.execute('SELECT COUNT(*) FROM sessions').fetchone()[0]
+
+class ServerSessionInterface(SessionInterface):
+    def __init__(self, store, sweep_interval=SWEEP_INTERVAL):
+        self.store = store
+        self.sweep_interval = sweep_interval
+        self._next_sweep = time.monotonic() + sweep_interval
+        self._sweep_lock = threading.Lock()
+        self.stats = {'loads': 0, 'writes': 0, 'deletes': 0, 'swept': 0}
+
+    def _maybe_sweep(self):
+        if time.monotonic() < self._next_sweep or not self._sweep_lock.acquire(blocking=False):
+            return
+        try:
+            self._next_sweep = time.monotonic() + self.sweep_interval
+            swept = self.store.sweep(time.time())
+            self.stats['swept'] += swept
+            if swept:
+                logger.debug('Swept %d expired sessions', swept)
+        finally:
+            self._sweep_lock.release()
+
+    def open_session(self, app, request):
+        self._maybe_sweep()
+        sid = request.cookies.get(self.get_cookie_name(app))
+        # 형식이 다른 쿠키(이전 서명 쿠키 등)는 저장소를 조회하지 않고 새 세션으로 처리
+        if sid and len(sid) == 43:
+            found = self.store.get(sid)
+            if found is not None:
+                self.stats['loads'] += 1
+                data, expires = found
+                return ServerSession(data, sid=sid, expires=expires)
+        return ServerSession()
+
+    def save_session(self, app, session, response):
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+        if session.accessed:
+            response.vary.add('Cookie')
+
+        old_sid = getattr(session, 'old_sid', None)
+        if old_sid:
+            self.store.delete(old_sid)
+
+        # 비워진 세션(로그아웃)은 저장소와 쿠키 모두 삭제
+        if not session:
+            if session.modified and (session.sid or old_sid):
+                if session.sid:
+                    self.store.delete(session.sid)
+                self.stats['deletes'] += 1
+                response.delete_cookie(name, domain=domain, path=path)
+            return
+
+        lifetime = app.permanent_session_lifetime.total_seconds()
+        now = time.time()
+        # 수정되지 않았고 만료까지 절반 이상 남았으면 아무것도 하지 않음 (Set-Cookie 없음)
+        if not session.modified and session.expires is not None and session.expires - now > lifetime / 2:
+            return
+
+        if session.sid is None:
+            session.sid = secrets.token_urlsafe(SID_BYTES)
+        session.expires = now + lifetime
+        self.store.set(session.sid, dict(session), session.expires)
+        self.stats['writes'] += 1
+        response.set_cookie(
+            name,
+            session.sid,
+            expires=datetime.fromtimestamp(session.expires, timezone.utc) if session.permanent else None,
+            httponly=self.get_cookie_httponly(app),
+            domain=domain,
+            path=path,
+            secure=self.get_cookie_secure(app),
+            samesite=self.get_cookie_samesite(app),
+        )
+        response.vary.add('Cookie')
+
+def create_session_interface(backend=SESSION_BACKEND):
+    """SESSION_BACKEND 에 맞는 세션 인터페이스 (cookie 면 None -> Flask 기본 서명 쿠키 사용)"""
+    if backend == 'memory':
+        return ServerSessionInterface(MemorySessionStore())
+    if backend == 'sqlite':
+        return ServerSessionInterface(SqliteSessionStore())
+    if backend == 'cookie':
+        return None
+    raise ValueError(f'unknown SESSION_BACKEND: {backend}')
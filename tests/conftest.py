@@ -0,0 +1,31 @@
+# 테스트 공용 설정 - api 모듈은 import 시점에 DATABASE_URL 을 읽으므로 임시 DB 를 먼저 지정
+# 실행 : python -m pytest -q   (프로젝트 루트에서)
+import logging
+import os
+import sys
+import tempfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+os.environ['DATABASE_URL'] = f'sqlite:///{os.path.join(tempfile.mkdtemp(), "test.db")}'
+sys.path.insert(0, os.path.join(ROOT, 'api'))
+logging.disable(logging.CRITICAL)
+
+import main  # 테이블 생성 + 마이그레이션 적용
+from database import writer_engin
+
+
+@pytest.fixture
+def engine():
+    return writer_engin
+
+
+@pytest.fixture(scope='session')
+def product_ids():
+    """테스트용 상품 10개 (세션 전체에서 한번만 생성)"""
+    from sqlalchemy import insert, select
+    from model import Product
+    with writer_engin.begin() as conn:
+        conn.execute(insert(Product), [{'name': f'test-product-{i}', 'price': 100 * (i + 1)} for i in range(10)])
+        return list(conn.execute(select(Product.id).where(Product.name.startswith('test-product-')).order_by(Product.id)).scalars())
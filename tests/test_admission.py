@@ -0,0 +1,75 @@
+# 요청 수락 제어 - 사용자별 rate limit, Content-Length 없는 큰 body 는 끝까지 읽지 않고 그대로 통과시키는지
+import asyncio
+import json
+
+from admission import AdmissionController, AdmissionMiddleware, MAX_BODY_PEEK
+
+RULES = {'POST /api/cart': {'user_rate': 1, 'user_burst': 2}}
+
+
+def make_app(received):
+    """받은 body 와 앱이 시작될때까지 미들웨어가 읽어간 chunk 수를 received 에 기록하는 앱"""
+    async def app(scope, receive, send):
+        read_before_app = scope['chunks_read']()
+        body = b''
+        while True:
+            message = await receive()
+            body += message.get('body', b'')
+            if not message.get('more_body'):
+                break
+        received.append((body, read_before_app))
+        await send({'type': 'http.response.start', 'status': 200, 'headers': []})
+        await send({'type': 'http.response.body', 'body': b'ok'})
+    return AdmissionMiddleware(app, AdmissionController(rules=RULES, max_inflight=0))
+
+
+def request(app, chunks, content_length=True):
+    headers = [(b'content-type', b'application/json')]
+    if content_length:
+        headers.append((b'content-length', str(sum(map(len, chunks))).encode()))
+    pending = list(chunks)
+    statuses = []
+    scope = {'type': 'http', 'method': 'POST', 'path': '/api/cart', 'query_string': b'', 'headers': headers,
+             'chunks_read': lambda: len(chunks) - len(pending)}
+
+    async def receive():
+        chunk = pending.pop(0)
+        return {'type': 'http.request', 'body': chunk, 'more_body': bool(pending)}
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            statuses.append(message['status'])
+
+    asyncio.run(app(scope, receive, send))
+    return statuses[0]
+
+
+def test_user_rate_limit_uses_json_body():
+    received = []
+    app = make_app(received)
+    body = json.dumps({'user_id': 7, 'product_id': 1, 'quantity': 1}).encode()
+    assert [request(app, [body]) for _ in range(3)] == [200, 200, 429]
+    # 다른 사용자는 영향 없음
+    assert request(app, [json.dumps({'user_id': 8}).encode()]) == 200
+    assert received[0][0] == body
+
+
+def test_small_chunked_body_is_peeked():
+    received = []
+    app = make_app(received)
+    chunks = [b'{"user_id": ', b'9}']
+    assert [request(app, chunks, content_length=False) for _ in range(3)] == [200, 200, 429]
+    assert [body for body, _ in received] == [b'{"user_id": 9}'] * 2
+
+
+def test_large_chunked_body_peek_is_capped():
+    received = []
+    app = make_app(received)
+    chunk = b' ' * 1024
+    chunks = [b'{"user_id": 7, "pad": "'] + [chunk] * (4 * MAX_BODY_PEEK // len(chunk)) + [b'"}']
+    # user_id 를 찾지 못했으므로 사용자별 제한(burst 2) 없이 전부 통과
+    assert [request(app, chunks, content_length=False) for _ in range(3)] == [200, 200, 200]
+    for body, read_before_app in received:
+        assert body == b''.join(chunks)
+        # MAX_BODY_PEEK 를 넘은 chunk 까지만 미리 읽고 나머지는 앱이 직접 읽음
+        assert read_before_app * len(chunk) <= MAX_BODY_PEEK + 2 * len(chunk)
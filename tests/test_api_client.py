@@ -0,0 +1,21 @@
+# 프론트엔드 API 클라이언트 - 호출 지연시간 / 실패가 공용 메트릭(/metrics) 에 기록되는지
+import os
+import sys
+
+import pytest
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'frontend'))
+from api_client import ApiClient
+from common.metrics import registry
+
+
+def test_failed_call_is_recorded_in_shared_registry():
+    client = ApiClient('http://127.0.0.1:9')  # 연결이 거부되는 주소
+    with pytest.raises(requests.ConnectionError):
+        client.get('/api/metrics-test?user_id=1')
+
+    lines = registry.render().splitlines()
+    labels = '{method="GET",path="/api/metrics-test"}'
+    assert f'api_client_request_duration_seconds_count{labels} 1' in lines
+    assert f'api_client_errors_total{labels} 1' in lines
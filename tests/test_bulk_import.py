@@ -0,0 +1,64 @@
+# 상품 대량 등록 - 잘못된 줄(JSON / UTF-8)은 에러 목록에 기록하고 나머지 줄은 계속 처리되는지
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from bulk_import import iter_rows
+
+
+@pytest.fixture
+def client():
+    return TestClient(main.app)
+
+
+def test_bad_utf8_line_is_reported_per_row(client):
+    body = b'{"name": "bulk-utf8-1", "price": 1}\n{"name": "bulk-\xff\xfe", "price": 2}\n{"name": "bulk-utf8-3", "price": 3}\n'
+    response = client.post('/api/products/bulk', content=body, headers={'content-type': 'application/x-ndjson'})
+    assert response.status_code == 200
+    result = response.json()
+    assert result['processed'] == 3
+    assert result['upserted'] == 2
+    assert result['error_count'] == 1
+    assert result['errors'][0]['line'] == 2
+    assert 'UTF-8' in result['errors'][0]['error']
+
+
+def test_csv_bad_rows_do_not_stop_import(client):
+    body = 'name,price\nbulk-csv-1,10\nbulk-csv-2,abc\nbulk-csv-3\nbulk-csv-4,40'.encode('utf-8')
+    response = client.post('/api/products/bulk', params={'format': 'csv'}, content=body)
+    result = response.json()
+    assert (result['upserted'], result['error_count']) == (2, 2)
+    assert [error['line'] for error in result['errors']] == [3, 4]
+
+
+def test_csv_quoted_newline_stays_in_one_row(client):
+    # 따옴표 안의 줄바꿈은 값의 일부 - 에러 줄번호는 레코드가 시작한 줄
+    body = 'name,price\n"bulk-csv-multi\nline",10\nbulk-csv-5,abc\n"bulk-csv-open,1\n'.encode('utf-8')
+    response = client.post('/api/products/bulk', params={'format': 'csv'}, content=body)
+    result = response.json()
+    assert (result['processed'], result['upserted']) == (3, 1)
+    assert [error['line'] for error in result['errors']] == [4, 5]
+    assert '따옴표' in result['errors'][1]['error']
+    assert 'bulk-csv-multi\nline' in {product['name'] for product in client.get('/api/products', params={'limit': 100, 'name_prefix': 'bulk-csv-multi'}).json()}
+
+
+def test_csv_header_bom_is_ignored(client):
+    body = '\ufeffname,price\r\nbulk-csv-bom,10\r\n'.encode('utf-8')
+    response = client.post('/api/products/bulk', params={'format': 'csv'}, content=body)
+    assert response.json() == {'success': True, 'processed': 1, 'upserted': 1, 'error_count': 0, 'errors': []}
+
+
+def test_csv_record_split_across_body_chunks():
+    # 요청 body 가 레코드 중간(따옴표 안)에서 잘려서 와도 같은 결과
+    body = b'name,price\n"a\nb",1\nc,2\n'
+
+    async def stream():
+        for i in range(len(body)):
+            yield body[i:i + 1]
+
+    async def collect():
+        return [row async for row in iter_rows(stream(), 'csv')]
+
+    assert asyncio.run(collect()) == [(2, {'name': 'a\nb', 'price': '1'}), (4, {'name': 'c', 'price': '2'})]
@@ -0,0 +1,40 @@
+# 장바구니 담기 - 같은 상품은 한 줄로 합쳐지고, 0 이하 수량으로 기존 줄을 줄일 수 없는지
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+
+
+@pytest.fixture
+def client():
+    return TestClient(main.app)
+
+
+def cart(client, user_id):
+    return {line['product_id']: line['quantity'] for line in client.get('/api/cart', params={'user_id': user_id}).json()}
+
+
+def test_repeated_adds_merge_into_one_line(client, product_ids):
+    user_id, product_id = 9101, product_ids[0]
+    first = client.post('/api/cart', json={'user_id': user_id, 'product_id': product_id, 'quantity': 2}).json()
+    again = client.post('/api/cart', json={'user_id': user_id, 'items': [{'product_id': product_id, 'quantity': 1},
+                                                                          {'product_id': product_id, 'quantity': 1}]}).json()
+    assert again['cart_ids'] == [first['cart_id']]
+    assert cart(client, user_id) == {product_id: 4}
+
+
+@pytest.mark.parametrize('user_id,body', [
+    (9102, {'product_id': 0, 'quantity': -3}),
+    (9103, {'product_id': 0, 'quantity': 0}),
+    (9104, {'items': [{'product_id': 0, 'quantity': -3}]}),
+], ids=['single_negative', 'single_zero', 'batch_negative'])
+def test_non_positive_quantity_is_rejected(client, product_ids, user_id, body):
+    product_id = product_ids[1]
+    client.post('/api/cart', json={'user_id': user_id, 'product_id': product_id, 'quantity': 2})
+    body = dict(body, user_id=user_id)
+    if 'items' in body:
+        body['items'] = [dict(line, product_id=product_id) for line in body['items']]
+    else:
+        body['product_id'] = product_id
+    assert client.post('/api/cart', json=body).status_code == 422
+    assert cart(client, user_id) == {product_id: 2}
@@ -0,0 +1,71 @@
+# 주문하기(place_order) - 동시에 주문해도 장바구니가 한번만 주문으로 옮겨지는지, 같은 키로 다시 요청하면 처음 결과를 주는지
+import threading
+
+from fastapi import HTTPException
+
+import main
+from database import SessionLocal
+from model import Cart, Order
+from schemas import OrderRequest
+
+
+def fill_cart(user_id, product_ids):
+    db = SessionLocal()
+    db.add_all(Cart(user_id=user_id, product_id=product_id, quantity=1) for product_id in product_ids)
+    db.commit()
+    db.close()
+
+
+def checkout(user_id, key=None):
+    db = SessionLocal()
+    try:
+        return main.place_order(OrderRequest(user_id=user_id, idempotency_key=key), None, db)
+    finally:
+        db.close()
+
+
+def counts(user_id):
+    db = SessionLocal()
+    try:
+        return (db.query(Order).filter(Order.user_id == user_id).count(),
+                db.query(Cart).filter(Cart.user_id == user_id).count())
+    finally:
+        db.close()
+
+
+def test_concurrent_checkout_does_not_double_order(product_ids):
+    user_id, threads = 9001, 20
+    fill_cart(user_id, product_ids)
+    barrier = threading.Barrier(threads)
+    results = []
+
+    def worker(n):
+        barrier.wait()
+        try:
+            # 절반은 같은 idempotency key, 절반은 키 없이 요청
+            results.append(checkout(user_id, 'same-key' if n % 2 else None)['order_count'])
+        except HTTPException as e:
+            results.append(e.status_code)
+
+    workers = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+
+    assert counts(user_id) == (len(product_ids), 0)
+    # 실제로 주문한 요청은 하나, 나머지는 빈 장바구니(400) 이거나 같은 키의 처음 결과
+    assert len(results) == threads
+    assert set(results) <= {len(product_ids), 400}
+
+
+def test_same_idempotency_key_returns_first_checkout(product_ids):
+    user_id = 9002
+    fill_cart(user_id, product_ids[:3])
+    first = checkout(user_id, 'key-1')
+    fill_cart(user_id, product_ids[:3])
+    again = checkout(user_id, 'key-1')
+    assert again['checkout_id'] == first['checkout_id']
+    assert again['order_count'] == first['order_count'] == 3
+    # 두번째 요청은 주문하지 않으므로 장바구니가 그대로 남아있음
+    assert counts(user_id) == (3, 3)
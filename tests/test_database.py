@@ -0,0 +1,31 @@
+# DB 엔진 설정 - 실패한 쿼리 뒤에 statement timeout 타이머 / 메트릭 상태가 커넥션에 남지 않는지
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from database import writer_engin
+
+
+def test_failed_statement_stops_timeout_timer():
+    with writer_engin.connect() as conn:
+        for _ in range(3):
+            with pytest.raises(OperationalError):
+                conn.execute(text('SELECT * FROM no_such_table'))
+        assert conn.connection.info['statement_timer']['started'] is None
+
+
+def test_failed_statements_leave_no_metrics_state():
+    from common.metrics import RequestDbStats, _db_stats
+    stats = RequestDbStats()
+    token = _db_stats.set(stats)
+    try:
+        with writer_engin.connect() as conn:
+            for _ in range(5):
+                with pytest.raises(OperationalError):
+                    conn.execute(text('SELECT * FROM no_such_table'))
+            conn.execute(text('SELECT 1'))
+            assert not conn.info.get('metrics_query_start')
+    finally:
+        _db_stats.reset(token)
+    # 실패한 쿼리는 세지 않고 성공한 쿼리만 기록
+    assert stats.queries == 1
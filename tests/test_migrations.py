@@ -0,0 +1,74 @@
+# 마이그레이션 - 처음 버전 스키마의 DB 를 최신으로 올리고, 기존 주문이 판매 집계에 백필되는지
+import os
+import tempfile
+
+import pytest
+from sqlalchemy import create_engine, insert, inspect, table, column, text
+from sqlalchemy.exc import OperationalError
+
+import database
+import migrations
+from migrations import MIGRATIONS, run_migrations, migration_engine
+from sales import verify
+
+LEGACY_SCHEMA = [
+    'CREATE TABLE users (id INTEGER PRIMARY KEY, username VARCHAR UNIQUE, email VARCHAR UNIQUE, password VARCHAR)',
+    'CREATE TABLE products (id INTEGER PRIMARY KEY, name VARCHAR UNIQUE, price INTEGER)',
+    'CREATE TABLE cart (id INTEGER PRIMARY KEY, user_id INTEGER, product_id INTEGER, quantity INTEGER)',
+    'CREATE TABLE orders (id INTEGER PRIMARY KEY, user_id INTEGER, product_id INTEGER, quantity INTEGER, created_at DATETIME)',
+    "INSERT INTO products (id, name, price) VALUES (1, 'a', 100), (2, 'b', 250)",
+    "INSERT INTO cart (user_id, product_id, quantity) VALUES (1, 1, 1), (1, 1, 2), (1, 2, 1)",
+    "INSERT INTO orders (user_id, product_id, quantity, created_at) VALUES "
+    "(1, 1, 2, '2025-01-01 10:00:00'), (1, 2, 1, '2025-01-01 11:00:00'), (2, 1, 3, '2025-01-02 09:00:00')",
+]
+
+
+def legacy_database(extra_orders=0):
+    url = f'sqlite:///{os.path.join(tempfile.mkdtemp(), "legacy.db")}'
+    engine = create_engine(url)
+    with engine.begin() as conn:
+        for sql in LEGACY_SCHEMA:
+            conn.execute(text(sql))
+        if extra_orders:
+            orders = table('orders', column('user_id'), column('product_id'), column('quantity'), column('created_at'))
+            conn.execute(insert(orders), [{'user_id': 10 + i % 500, 'product_id': 1 + i % 2, 'quantity': 1,
+                                           'created_at': '2025-02-01 00:00:00'} for i in range(extra_orders)])
+    return url, engine
+
+
+@pytest.mark.parametrize('chunk_size', [2, 10000])
+def test_legacy_database_is_upgraded_and_backfilled(monkeypatch, chunk_size):
+    # chunk 로 나눠서 채워도 (chunk_size=2 -> 주문 3개가 두 chunk) 한번에 처리한 것과 결과가 같아야 함
+    monkeypatch.setattr(migrations, 'MIGRATION_CHUNK_SIZE', chunk_size)
+    _, engine = legacy_database()
+
+    assert run_migrations(engine) == [version for version, *_ in MIGRATIONS]
+    assert run_migrations(engine) == []
+
+    columns = {column['name'] for column in inspect(engine).get_columns('orders')}
+    assert {'status', 'unit_price'} <= columns
+    with engine.connect() as conn:
+        assert conn.execute(text('SELECT product_id, quantity FROM cart')).all() == [(1, 3), (2, 1)]
+        assert conn.execute(text('SELECT unit_price FROM orders ORDER BY id')).scalars().all() == [100, 250, 100]
+        rows = conn.execute(text('SELECT day, product_id, order_count, units, revenue FROM product_daily_sales '
+                                 'ORDER BY day, product_id')).all()
+    assert [tuple(row[1:]) for row in rows] == [(1, 1, 2, 200), (2, 1, 1, 250), (1, 1, 3, 300)]
+    assert verify(engine) == (True, (3, 6, 750), (3, 6, 750))
+
+
+def test_migrations_ignore_request_statement_timeout(monkeypatch):
+    # 요청용 timeout 이 아주 짧아도 (큰 DB 에서 5초를 넘는 상황) 마이그레이션은 끝까지 실행되어야 함
+    url, _ = legacy_database(extra_orders=50000)
+    monkeypatch.setattr(database, 'STATEMENT_TIMEOUT', 0.0001)
+    request_engine = database.create_db_engine(url)
+    with pytest.raises(OperationalError, match='interrupted'):
+        with request_engine.begin() as conn:
+            conn.execute(text('CREATE INDEX ix_test ON orders (user_id, created_at)'))
+    request_engine.dispose()
+
+    engine = migration_engine(url)
+    try:
+        assert run_migrations(engine) == [version for version, *_ in MIGRATIONS]
+        assert verify(engine)[0]
+    finally:
+        engine.dispose()
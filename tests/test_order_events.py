@@ -0,0 +1,93 @@
+# 주문 상태 알림(SSE) - 대기중인 구독자 상한 / 이벤트 전달 / 연결이 어떻게 끊기든 구독이 해제되는지
+import asyncio
+
+import pytest
+
+import main
+from order_events import OrderEventBroker, TooManySubscribers, order_events
+
+
+def test_idle_subscribers_are_bounded_and_released():
+    async def run():
+        broker = OrderEventBroker(max_subscribers=1000, queue_size=4)
+        # 절반은 user 1, 나머지는 각각 다른 사용자
+        user_ids = [1 if i % 2 == 0 else 1000 + i for i in range(1000)]
+        queues = [(user_id, broker.subscribe(user_id)) for user_id in user_ids]
+        assert broker.subscriber_count() == 1000
+        with pytest.raises(TooManySubscribers):
+            broker.subscribe(1)
+        # 같은 사용자 구독자 전부에게 전달, 큐가 차면 오래된 이벤트를 버림
+        for n in range(6):
+            broker.publish(1, {'order_id': 1, 'n': n})
+        assert all(queue.qsize() == 4 and queue.get_nowait()['n'] == 2 for user_id, queue in queues if user_id == 1)
+        assert all(queue.empty() for user_id, queue in queues if user_id != 1)
+        for user_id, queue in queues:
+            broker.unsubscribe(user_id, queue)
+        stats = broker.get_stats()
+        assert (stats['subscribers'], stats['users'], stats['rejected']) == (0, 0, 1)
+    asyncio.run(run())
+
+
+def http_scope(user_id, spec_version='2.0'):
+    return {
+        'type': 'http', 'asgi': {'version': '3.0', 'spec_version': spec_version}, 'http_version': '1.1',
+        'method': 'GET', 'scheme': 'http', 'path': '/api/order/events', 'raw_path': b'/api/order/events',
+        'query_string': f'user_id={user_id}'.encode(), 'root_path': '',
+        'headers': [(b'host', b'test'), (b'accept', b'text/event-stream')],
+        'client': ('127.0.0.1', 1234), 'server': ('test', 80),
+    }
+
+
+async def call_app(scope, receive, send):
+    """앱을 호출하고 호출 전후 구독자 수 차이를 반환"""
+    before = order_events.subscriber_count()
+    try:
+        await main.app(scope, receive, send)
+    except Exception:
+        pass  # 연결이 끊긴 경우 서버(uvicorn)가 처리하는 예외
+    return order_events.subscriber_count() - before
+
+
+def test_disconnect_before_first_chunk_releases_subscriber():
+    async def run():
+        async def receive():
+            return {'type': 'http.disconnect'}
+
+        async def send(message):
+            await asyncio.sleep(0.05)  # 헤더를 보내는 동안 연결 끊김이 먼저 처리됨
+
+        return await call_app(http_scope(9201), receive, send)
+    assert asyncio.run(run()) == 0
+
+
+def test_failed_header_send_releases_subscriber():
+    async def run():
+        async def receive():
+            await asyncio.sleep(10)
+
+        async def send(message):
+            raise OSError('connection reset')
+
+        return await call_app(http_scope(9202, spec_version='2.4'), receive, send)
+    assert asyncio.run(run()) == 0
+
+
+def test_streamed_then_disconnected_releases_subscriber():
+    async def run():
+        disconnected = asyncio.Event()
+        chunks = []
+
+        async def receive():
+            await disconnected.wait()
+            return {'type': 'http.disconnect'}
+
+        async def send(message):
+            chunks.append(message)
+            if message['type'] == 'http.response.body':
+                disconnected.set()
+
+        return chunks, await call_app(http_scope(9203), receive, send)
+    chunks, leaked = asyncio.run(run())
+    assert chunks[0]['status'] == 200
+    assert chunks[1]['body'] == b'retry: 3000\n\n'
+    assert leaked == 0
@@ -0,0 +1,49 @@
+# 주문목록 / 주문상세 - 상품이 삭제된 주문도 목록에서 빠지지 않는지
+import json
+
+from sqlalchemy import insert
+
+import main
+from database import SessionLocal, writer_engin
+from model import Cart, Product
+from schemas import OrderRequest, ProductCreate
+
+
+def test_orders_of_deleted_product_stay_in_list(product_ids):
+    user_id = 9401
+    with writer_engin.begin() as conn:
+        product_id = conn.execute(insert(Product).values(name='deleted-later', price=700).returning(Product.id)).scalar()
+        conn.execute(insert(Cart), [
+            {'user_id': user_id, 'product_id': product_ids[0], 'quantity': 1},
+            {'user_id': user_id, 'product_id': product_id, 'quantity': 2},
+        ])
+    db = SessionLocal()
+    try:
+        main.place_order(OrderRequest(user_id=user_id), None, db)
+        main.delete_product(product_id, db)
+        orders = json.loads(main.get_orders(user_id, None, 50, None, None, db).body)
+        detail = main.get_order_detail(orders[1]['id'], db)
+    finally:
+        db.close()
+
+    assert [order['product_id'] for order in orders] == [product_ids[0], product_id]
+    assert orders[0]['product']['id'] == product_ids[0]
+    assert orders[1]['product'] is None
+    assert main.OrderOut.model_validate(detail).product is None
+
+
+def test_order_list_keeps_checkout_price(product_ids):
+    # 주문 후에 상품 가격이 바뀌어도 목록은 주문 시점 가격(unit_price) 을 돌려줌
+    user_id = 9402
+    with writer_engin.begin() as conn:
+        product_id = conn.execute(insert(Product).values(name='repriced-later', price=500).returning(Product.id)).scalar()
+        conn.execute(insert(Cart).values(user_id=user_id, product_id=product_id, quantity=3))
+    db = SessionLocal()
+    try:
+        main.place_order(OrderRequest(user_id=user_id), None, db)
+        main.update_product(product_id, ProductCreate(name='repriced-later', price=900), db)
+        orders = json.loads(main.get_orders(user_id, None, 50, None, None, db).body)
+    finally:
+        db.close()
+
+    assert [(order['unit_price'], order['product']['price']) for order in orders] == [(500, 900)]
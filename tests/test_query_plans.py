@@ -0,0 +1,24 @@
+# 주요 쿼리가 인덱스만으로 처리되는지 - 라우트가 실행하는 statement 를 그대로 컴파일해서 EXPLAIN QUERY PLAN 확인
+import pytest
+
+from migrations import explain, query_plan, uses_index_only
+from queries import cart_query, order_list_query
+
+
+@pytest.mark.parametrize('stmt', [
+    order_list_query(1),
+    order_list_query(1, after_id=100),
+    order_list_query(1, after_id=100, limit=10),
+    cart_query(1),
+], ids=['orders', 'orders_next_page', 'orders_small_page', 'cart'])
+def test_hot_query_has_no_scan_or_sort(engine, stmt):
+    plan = query_plan(engine, stmt)
+    assert 'SCAN' not in plan, plan
+    assert 'TEMP B-TREE' not in plan, plan
+    assert uses_index_only(plan)
+
+
+def test_explain_cli_checks_same_queries(engine):
+    # python migrations.py --explain 도 같은 결과여야 함
+    for name, (indexed, plan) in explain(engine).items():
+        assert indexed, f'{name}: {plan}'
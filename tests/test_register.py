@@ -0,0 +1,48 @@
+# 회원가입 - 같은 아이디 / 이메일로 동시에 가입하면 한명만 성공하고 나머지는 전부 409 인지
+import threading
+import uuid
+
+import pytest
+from fastapi import HTTPException
+
+import main
+from database import SessionLocal
+from schemas import RegisterRequest
+
+
+def register(username, email):
+    db = SessionLocal()
+    try:
+        main.register_user(RegisterRequest(username=username, email=email, password='pw'), db)
+        return 200, None
+    except HTTPException as e:
+        return e.status_code, e.detail
+    finally:
+        db.close()
+
+
+@pytest.mark.parametrize('same_username,same_email', [(True, False), (False, True), (True, True)],
+                         ids=['same_username', 'same_email', 'same_both'])
+def test_concurrent_register_creates_one_user(same_username, same_email):
+    tag, threads = uuid.uuid4().hex[:8], 50
+    barrier = threading.Barrier(threads)
+    results = []
+
+    def worker(n):
+        username = f'race-{tag}' if same_username else f'race-{tag}-{n}'
+        email = f'race-{tag}@example.com' if same_email else f'race-{tag}-{n}@example.com'
+        barrier.wait()
+        results.append(register(username, email))
+
+    workers = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+
+    statuses = [status for status, _ in results]
+    assert statuses.count(200) == 1
+    assert statuses.count(409) == threads - 1
+    # 409 응답에는 겹친 필드가 들어있음
+    expected = {name for name, same in (('username', same_username), ('email', same_email)) if same}
+    assert all(set(detail['conflicts']) == expected for status, detail in results if status == 409)
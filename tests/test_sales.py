@@ -0,0 +1,95 @@
+# 판매 집계(product_daily_sales) - 주문 / 취소 / 취소 해제가 동시에 들어와도 집계가 orders 와 일치하는지
+import threading
+
+from fastapi import HTTPException
+from sqlalchemy import select
+
+import main
+from database import SessionLocal, writer_engin
+from model import Cart, Order, ProductDailySales
+from sales import verify
+from schemas import OrderRequest, ProductCreate
+
+
+def call(func, *args):
+    db = SessionLocal()
+    try:
+        return func(*args, db=db)
+    except HTTPException as e:
+        return e.status_code
+    finally:
+        db.close()
+
+
+def place_order(user_id, product_id, quantity):
+    db = SessionLocal()
+    db.add(Cart(user_id=user_id, product_id=product_id, quantity=quantity))
+    db.commit()
+    db.close()
+    call(main.place_order, OrderRequest(user_id=user_id), None)
+    db = SessionLocal()
+    try:
+        return db.query(Order).filter(Order.user_id == user_id).order_by(Order.id.desc()).first()
+    finally:
+        db.close()
+
+
+def day_row(order):
+    with writer_engin.connect() as conn:
+        row = conn.execute(select(ProductDailySales.order_count, ProductDailySales.units, ProductDailySales.revenue)
+                           .where(ProductDailySales.day == order.created_at.date(),
+                                  ProductDailySales.product_id == order.product_id)).one()
+    return tuple(row)
+
+
+def concurrently(threads, target):
+    barrier = threading.Barrier(threads)
+    results = []
+
+    def worker(n):
+        barrier.wait()
+        results.append(target(n))
+
+    workers = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    return results
+
+
+def test_concurrent_cancels_subtract_once(product_ids):
+    product_id = product_ids[2]
+    order = place_order(9301, product_id, 5)
+    before = day_row(order)
+    results = concurrently(10, lambda n: call(main.update_order_status, order.id, 'cancelled'))
+    assert all(isinstance(result, dict) for result in results)
+    order_count, units, revenue = before
+    assert day_row(order) == (order_count - 1, units - 5, revenue - 5 * 300)
+    assert verify(writer_engin)[0]
+
+
+def test_concurrent_cancel_and_restore_stay_consistent(product_ids):
+    order = place_order(9302, product_ids[3], 2)
+    concurrently(20, lambda n: call(main.update_order_status, order.id, 'cancelled' if n % 2 else 'processing'))
+    ok, aggregated, scanned = verify(writer_engin)
+    assert ok, (aggregated, scanned)
+
+
+def test_missing_order_is_404():
+    assert call(main.update_order_status, 10 ** 9, 'cancelled') == 404
+
+
+def test_price_change_does_not_leave_revenue_residue(product_ids):
+    product_id = product_ids[4]
+    order = place_order(9303, product_id, 4)
+    assert order.unit_price == 500
+    before = day_row(order)
+    # 주문 후 가격이 바뀌어도 취소 / 취소 해제는 주문 시점 가격으로 빼고 더함
+    call(main.update_product, product_id, ProductCreate(name='test-product-4', price=9999))
+    call(main.update_order_status, order.id, 'cancelled')
+    order_count, units, revenue = before
+    assert day_row(order) == (order_count - 1, units - 4, revenue - 4 * 500)
+    call(main.update_order_status, order.id, 'processing')
+    assert day_row(order) == before
+    assert verify(writer_engin)[0]
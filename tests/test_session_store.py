@@ -0,0 +1,42 @@
+# 프론트엔드 SQLite 세션 저장소 - 요청마다 새 쓰레드가 와도 연결이 쌓이지 않고 재사용되는지
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'frontend'))
+from session_store import SqliteSessionStore
+
+
+def run_in_new_threads(count, target):
+    # Werkzeug threaded 서버처럼 요청 하나 = 새 쓰레드 하나
+    threads = [threading.Thread(target=target, args=(n,)) for n in range(count)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+
+def test_connections_are_pooled_across_short_lived_threads():
+    store = SqliteSessionStore(os.path.join(tempfile.mkdtemp(), 'sessions.db'), pool_size=2)
+    expires = time.time() + 60
+    errors = []
+
+    def request(n):
+        try:
+            store.set(f'sid-{n}', {'user_id': n}, expires)
+            assert store.get(f'sid-{n}') == ({'user_id': n}, expires)
+        except Exception as e:
+            errors.append(e)
+
+    run_in_new_threads(50, request)
+    assert errors == []
+    assert len(store) == 50
+    assert len(store._pool) == 2
+
+    # 다른 쓰레드가 돌려놓은 연결을 그대로 꺼내 씀
+    pooled = list(store._pool)
+    run_in_new_threads(1, lambda n: store.delete('sid-0'))
+    assert sorted(map(id, store._pool)) == sorted(map(id, pooled))
+    assert store.get('sid-0') is None